@@ -1,6 +1,11 @@
 import os
 import sys
-import importlib
+
+from .kaiguan_api import register_api_routes
+from .kaiguan_metrics import instrument_node_class, register_metrics
+from .kaiguan_prune import register_prompt_hook
+from .kaiguan_registry import lazy_node_class, resolve_all
+from .kaiguan_release import register_release_hook
 
 python = sys.executable
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -8,29 +13,60 @@ WEB_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__
 NODE_CLASS_MAPPINGS = {}
 NODE_DISPLAY_NAME_MAPPINGS = {}
 
+# 节点清单：节点类名 -> (所在模块, 显示名称)
+# 新增节点时需要同时登记到这里
+NODE_MANIFEST = {
+    "GroupSwitchNodeeee": ("kaiguana", "Universal switch▶️"),
+    "GroupSwitchNode": ("kaiguanb", "All Ignore👁️‍🗨️"),
+    "GroupSwitchNodee": ("kaiguanc", "All Disable🚫"),
+    "GroupSwitchNodeee": ("kaiguand", "Hybrid switch🔃"),
+    "hulue": ("kaiguane", "hulue🔃"),
+    "jinyong": ("kaiguanf", "jin yong🔃"),
+    "ALLty": ("kaiguang", "ALL🚫👁️‍🗨️"),
+    "EGRWGL": ("kaiguanh", "2🐕任务管理器"),
+    "GroupSwitchNodi": ("kaiguani", "2🐕Group"),
+    "EGSEED": ("kaiguanj", "2🐕EGSEED"),
+    "LogicSkipNode": ("kaiguanlogic", "逻辑跳过🔀"),
+    "LogicBatchSkipNode": ("kaiguanlogic", "批量逻辑跳过🔀"),
+    "LogicSkipListNode": ("kaiguanlogic", "列表逻辑跳过🔀"),
+    "BooleanSkipNode": ("kaiguanbool", "逻辑开关🔄"),
+    "BooleanSkipListNode": ("kaiguanbool", "列表逻辑开关🔄"),
+    "EGRYDZQHNode": ("wxqh", "Recursive switching🔀"),
+    "EGRYDZQHListNode": ("wxqh", "Recursive switching (list)🔀"),
+    "EGDLXZNode": ("wxqh", "多路选择🔀"),
+    "GlobalGroupConditionNode": ("kaiguan_global_condition", "全局组条件控制🌐🔀"),
+    "SmartGroupSwitchNode": ("kaiguan_global_condition", "智能组开关🎯"),
+    "AdvancedGroupSwitchNode": ("kaiguan_global_condition", "高级组开关🔧"),
+    "FlowBypassGroupNode": ("kaiguan_global_condition", "流程屏蔽组🚫"),
+    "GroupRuleTableNode": ("kaiguan_global_condition", "组规则表🗂️"),
+}
+
+# 设置 KAIGUAN_EAGER_IMPORT=1 时在启动阶段导入全部节点模块（便于排查模块错误）
+EAGER_IMPORT = os.environ.get("KAIGUAN_EAGER_IMPORT", "").lower() in ("1", "true", "yes")
+
 def load_nodes():
-    for filename in os.listdir(CURRENT_DIR):
-        if filename.endswith(".py") and filename != "__init__.py":
-            module_name = filename[:-3]
-            try:
-                module = importlib.import_module(f".{module_name}", package=__name__)
-                if hasattr(module, "NODE_CLASS_MAPPINGS"):
-                    NODE_CLASS_MAPPINGS.update(module.NODE_CLASS_MAPPINGS)
-                if hasattr(module, "NODE_DISPLAY_NAME_MAPPINGS"):
-                    NODE_DISPLAY_NAME_MAPPINGS.update(module.NODE_DISPLAY_NAME_MAPPINGS)
-                    
-                # 特别输出全局组条件控制节点的加载信息
-                if module_name == "kaiguan_global_condition":
-                    print("🌐 全局组条件控制节点已成功加载！")
-                    print("   - 全局组条件控制🌐🔀 (智能条件判断+组控制)")
-                    print("   - 智能组开关🎯 (简化组开关控制)")
-                    print("   支持ComfyUI节点组的启用/禁用/屏蔽状态控制")
-                    
-            except Exception as e:
-                print(f"Error loading module {module_name}: {e}")
+    for class_name, (module_name, display_name) in NODE_MANIFEST.items():
+        NODE_CLASS_MAPPINGS[class_name] = lazy_node_class(__name__, module_name, class_name, instrument_node_class)
+        NODE_DISPLAY_NAME_MAPPINGS[class_name] = display_name
+
+    if EAGER_IMPORT:
+        for error in resolve_all(NODE_CLASS_MAPPINGS):
+            print(f"Error loading node {error}")
 
 load_nodes()
 
+# 提交提示词时在后端应用组控制动作（API提交同样生效）
+register_prompt_hook()
+
+# 外部调度方批量提交带组覆盖设置的提示词：POST /kaiguan/prompts
+register_api_routes()
+
+# 节点耗时与路由决策指标：GET /kaiguan/metrics（设置 KAIGUAN_METRICS=0 关闭）
+register_metrics()
+
+# 开关节点丢弃分支后提前释放上游输出（需设置 KAIGUAN_EARLY_RELEASE=1）
+register_release_hook()
+
 print(f"二狗子开关套件加载完成！共加载 {len(NODE_CLASS_MAPPINGS)} 个节点")
 
 __all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS", "WEB_DIRECTORY"]
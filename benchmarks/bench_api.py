@@ -0,0 +1,84 @@
+"""
+批量提交接口基准：在本地 aiohttp 替身服务上调用 POST /kaiguan/prompts，测量每秒入队的任务数
+- 共用一个合成工作流（见 bench_workflow.generate_workflow），每个任务随机启用/禁用/屏蔽部分通道组
+- 任务在进程内按 /prompt 的步骤入队：提交钩子（应用组覆盖设置）-> validate_prompt（替身，不做校验）-> 替身队列
+用法：python benchmarks/bench_api.py [--nodes 5000] [--switches 300] [--jobs 200] [--batch 100]
+需要安装 aiohttp（ComfyUI 自带）
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_workflow import SYNTHETIC_NODES, generate_workflow  # noqa: E402
+from comfy_stubs import import_package, install_stubs  # noqa: E402
+
+OVERRIDE_CHOICES = ("enable", "disable", "bypass")
+
+
+def make_jobs(switch_count, job_count, seed=0):
+    rng = random.Random(seed)
+    jobs = []
+    for _ in range(job_count):
+        lanes = rng.sample(range(switch_count), k=min(5, switch_count))
+        jobs.append({"groups": {f"Lane_{lane}": rng.choice(OVERRIDE_CHOICES) for lane in lanes}})
+    return jobs
+
+
+async def run(server, route, body_base, jobs, batch):
+    from aiohttp.test_utils import TestClient, TestServer
+
+    client = TestClient(TestServer(server.make_app()))
+    await client.start_server()
+    try:
+        started = time.perf_counter()
+        results = []
+        for start in range(0, len(jobs), batch):
+            response = await client.post(route, json=dict(body_base, jobs=jobs[start:start + batch]))
+            data = await response.json()
+            results.extend(data.get("results", []))
+        return time.perf_counter() - started, results
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=5000, help="工作流节点数")
+    parser.add_argument("--switches", type=int, default=300, help="开关节点（通道）数量")
+    parser.add_argument("--jobs", type=int, default=200, help="任务总数")
+    parser.add_argument("--batch", type=int, default=100, help="每个请求的任务数")
+    args = parser.parse_args()
+
+    server = install_stubs()
+    if server.routes is None:
+        sys.exit("需要安装 aiohttp")
+    package = import_package()
+    sys.modules["nodes"].NODE_CLASS_MAPPINGS.update(SYNTHETIC_NODES)
+    api = sys.modules[f"{package.__name__}.kaiguan_api"]
+
+    prompt, extra_data = generate_workflow(args.nodes, args.switches)
+    switch_count = len(extra_data["extra_pnginfo"]["workflow"]["groups"])
+    jobs = make_jobs(switch_count, args.jobs)
+
+    # 预热：首次提交会导入控制节点模块（及其可选依赖），不计入测量
+    server.trigger_on_prompt({"prompt": prompt, "extra_data": dict(extra_data, **{api.OVERRIDES_KEY: jobs[0]["groups"]})})
+
+    elapsed, results = asyncio.run(run(server, api.PROMPTS_ROUTE, {"prompt": prompt, "extra_data": extra_data},
+                                       jobs, args.batch))
+    failed = [result for result in results if "error" in result]
+    sizes = [len(queued[2]) for queued in server.queue]
+    print(f"节点 {len(prompt)}  任务 {len(results)}  失败 {len(failed)}  耗时 {elapsed * 1000:.1f} ms  "
+          f"{len(results) / elapsed:.1f} 任务/秒")
+    if sizes:
+        print(f"入队提示词节点数: 最少 {min(sizes)}  最多 {max(sizes)}")
+    for result in failed[:5]:
+        print(f"  任务 {result['index']}: {result['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+表达式条件基准：测量已编译表达式的单次求值耗时，并先核对一组表达式的结果
+核对包含负数常量、正负号、链式比较与类型不兼容的比较，任一结果不符即以非零状态退出
+用法：python benchmarks/bench_expr.py [--number 20000]
+"""
+import argparse
+import importlib
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comfy_stubs import import_package, install_stubs  # noqa: E402
+
+# (表达式, 输入, 期望结果)
+CHECKS = [
+    ("x > -1", 0, True),
+    ("x > -1", -2, False),
+    ("-x < 0", 5, True),
+    ("+x == 5", 5, True),
+    ("x >= -0.5 and x < 2", "1.5", True),
+    ("-1 < x < 1", 0, True),
+    ("abs(-x) == 3", -3, True),
+    ("x > -1", "portrait", False),
+    ("'portrait' in s and len(s) > 3", "a portrait photo", True),
+    ("s.startswith('a') or x > 10", "b", False),
+]
+
+
+def check(expr_module):
+    failures = []
+    for text, value, expected in CHECKS:
+        try:
+            result = expr_module.compile_expression(text)(value)
+        except Exception as e:
+            result = f"{type(e).__name__}: {e}"
+        if result != expected:
+            failures.append((text, value, expected, result))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000, help="每个表达式计时的调用次数")
+    args = parser.parse_args()
+
+    install_stubs()
+    package = import_package()
+    expr_module = importlib.import_module(f"{package.__name__}.kaiguan_expr")
+
+    failures = check(expr_module)
+    for text, value, expected, result in failures:
+        print(f"⚠️ 结果不符: {text!r} 输入 {value!r} 期望 {expected!r} 实际 {result!r}")
+    if failures:
+        sys.exit(1)
+    print(f"{len(CHECKS)} 个表达式结果全部正确")
+
+    print(f"{'表达式':<36}{'us/次':>10}")
+    for text, value, _ in CHECKS:
+        predicate = expr_module.compile_expression(text)
+        elapsed = timeit.timeit(lambda: predicate(value), number=args.number) / args.number * 1e6
+        print(f"{text:<36}{elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+组名解析微基准：对比旧的四种解析实现与共享分词器 kaiguan_groups
+计时前先核对分词结果（含带空格的组名），结果不符时以非零状态退出
+用法：python benchmarks/bench_group_parse.py [--groups 300] [--number 2000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kaiguan_groups  # noqa: E402
+
+
+# ---- 旧实现（原样保留，仅用于对比） ----
+
+def legacy_parse_target_groups(target_groups):
+    """GlobalGroupConditionNode._parse_target_groups"""
+    if not target_groups or not target_groups.strip():
+        return []
+    return [group.strip() for group in target_groups.split('\n') if group.strip()]
+
+
+def legacy_parse_dynamic_input(dynamic_input):
+    """SmartGroupSwitchNode._parse_dynamic_input（字符串分支）"""
+    if dynamic_input.strip():
+        if '\n' in dynamic_input:
+            return [g.strip() for g in dynamic_input.split('\n') if g.strip()]
+        elif ',' in dynamic_input:
+            return [g.strip() for g in dynamic_input.split(',') if g.strip()]
+        elif ';' in dynamic_input:
+            return [g.strip() for g in dynamic_input.split(';') if g.strip()]
+        else:
+            return [dynamic_input.strip()]
+    return []
+
+
+def legacy_parse_group_list(group_list):
+    """AdvancedGroupSwitchNode._parse_group_list（字符串分支）"""
+    if ',' in group_list:
+        return [g.strip() for g in group_list.split(',') if g.strip()]
+    elif '\n' in group_list:
+        return [g.strip() for g in group_list.split('\n') if g.strip()]
+    else:
+        return [group_list.strip()] if group_list.strip() else []
+
+
+def legacy_parse_groups_flexible(groups_input):
+    """FlowBypassGroupNode._parse_groups_flexible"""
+    if not groups_input or not groups_input.strip():
+        return []
+    groups_list = []
+    for line in groups_input.strip().split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if ',' in line:
+            groups_list.extend(part.strip() for part in line.split(',') if part.strip())
+        elif ';' in line:
+            groups_list.extend(part.strip() for part in line.split(';') if part.strip())
+        elif '|' in line:
+            groups_list.extend(part.strip() for part in line.split('|') if part.strip())
+        elif ' ' in line and len(line.split()) > 1:
+            words = line.split()
+            if any(len(word) > 2 for word in words):
+                groups_list.extend(word.strip() for word in words if word.strip())
+            else:
+                groups_list.append(line)
+        else:
+            groups_list.append(line)
+    seen = set()
+    unique_groups = []
+    for group in groups_list:
+        if group and group not in seen:
+            seen.add(group)
+            unique_groups.append(group)
+    return unique_groups
+
+
+LEGACY_PARSERS = {
+    "_parse_target_groups": legacy_parse_target_groups,
+    "_parse_dynamic_input": legacy_parse_dynamic_input,
+    "_parse_group_list": legacy_parse_group_list,
+    "_parse_groups_flexible": legacy_parse_groups_flexible,
+}
+
+
+# (输入, 期望的组名)
+CHECKS = [
+    ("Upscale Pass, Face Fix", ["Upscale Pass", "Face Fix"]),
+    ("Upscale Pass\nFace Fix", ["Upscale Pass", "Face Fix"]),
+    ("Upscale Pass;Face Fix|Hi Res", ["Upscale Pass", "Face Fix", "Hi Res"]),
+    ("Sampler Upscale Refiner", ["Sampler", "Upscale", "Refiner"]),
+    ("SD 1.5", ["SD 1.5"]),
+    ("Sampler\nUpscale|Refiner, Sampler", ["Sampler", "Upscale", "Refiner"]),
+    ("", []),
+]
+
+
+def check():
+    failures = []
+    for text, expected in CHECKS:
+        result = kaiguan_groups.parse_group_names(text)
+        if result != expected:
+            failures.append((text, expected, result))
+    return failures
+
+
+def build_inputs(group_count):
+    names = [f"Group_{i:04d}" for i in range(group_count)]
+    return {
+        "short": "Sampler\nUpscale",
+        "newline": "\n".join(names),
+        "comma": ", ".join(names),
+        "mixed": "\n".join(
+            ";".join(names[i:i + 4]) if i % 8 else "|".join(names[i:i + 4])
+            for i in range(0, group_count, 4)
+        ),
+    }
+
+
+def time_call(func, arg, number, repeat=5):
+    # 取多轮中的最小值，减少机器抖动对新旧实现对比的影响
+    return min(timeit.repeat(lambda: func(arg), number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--groups", type=int, default=300, help="每个输入包含的组名数量")
+    parser.add_argument("--number", type=int, default=2000, help="每项计时的调用次数")
+    args = parser.parse_args()
+
+    failures = check()
+    for text, expected, result in failures:
+        print(f"⚠️ 分词结果不符: {text!r} 期望 {expected} 实际 {result}")
+    if failures:
+        sys.exit(1)
+
+    inputs = build_inputs(args.groups)
+
+    # 绕过LRU缓存，测量单次完整分词的开销
+    tokenizer_cold = kaiguan_groups.split_group_names.__wrapped__
+
+    print(f"{'输入':<10}{'实现':<26}{'us/次':>12}")
+    for input_name, text in inputs.items():
+        for parser_name, func in LEGACY_PARSERS.items():
+            print(f"{input_name:<10}{'legacy' + parser_name:<26}{time_call(func, text, args.number):>12.2f}")
+        print(f"{input_name:<10}{'tokenizer(未命中缓存)':<26}{time_call(tokenizer_cold, text, args.number):>12.2f}")
+        kaiguan_groups.parse_group_names(text)
+        print(f"{input_name:<10}{'tokenizer(命中缓存)':<26}"
+              f"{time_call(kaiguan_groups.parse_group_names, text, args.number):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
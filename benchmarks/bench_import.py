@@ -0,0 +1,85 @@
+"""
+启动耗时基准：基于 python -X importtime 测量套件的冷启动导入开销
+分别测量延迟导入（默认）与全部导入（KAIGUAN_EAGER_IMPORT=1）两种模式
+用法：python benchmarks/bench_import.py [--runs 5] [--json import_baseline.json]
+注意：通过 importlib.import_module 导入的节点模块不会单独出现在 importtime 记录中，
+但其耗时计入套件包的累计时间（median_cumulative_us）
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "ergouzi_kaiguan_bench"
+
+IMPORTTIME_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_once(parent_dir, eager):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = parent_dir
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    if eager:
+        env["KAIGUAN_EAGER_IMPORT"] = "1"
+    else:
+        env.pop("KAIGUAN_EAGER_IMPORT", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {PACKAGE_NAME}"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        if name == PACKAGE_NAME or name.startswith(PACKAGE_NAME + "."):
+            modules[name] = {"self_us": int(self_us), "cumulative_us": int(cumulative_us)}
+    return modules
+
+
+def measure(parent_dir, eager, runs):
+    samples = [run_once(parent_dir, eager) for _ in range(runs)]
+    totals = [sample[PACKAGE_NAME]["cumulative_us"] for sample in samples]
+    last = samples[-1]
+    return {
+        "runs": runs,
+        "median_cumulative_us": int(statistics.median(totals)),
+        "min_cumulative_us": min(totals),
+        "modules_logged": len(last),
+        "modules": {name: data["self_us"] for name, data in sorted(last.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="每种模式的测量次数")
+    parser.add_argument("--json", help="将结果写入JSON文件，便于跟踪启动耗时变化")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as parent_dir:
+        # 仓库目录名可能包含连字符，通过符号链接以合法的包名导入
+        os.symlink(REPO_DIR, os.path.join(parent_dir, PACKAGE_NAME))
+        results = {
+            "lazy": measure(parent_dir, eager=False, runs=args.runs),
+            "eager": measure(parent_dir, eager=True, runs=args.runs),
+        }
+
+    for mode, data in results.items():
+        print(f"{mode:<6} 中位数 {data['median_cumulative_us'] / 1000:8.2f} ms  "
+              f"最小 {data['min_cumulative_us'] / 1000:8.2f} ms  记录模块数 {data['modules_logged']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
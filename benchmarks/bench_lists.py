@@ -0,0 +1,147 @@
+"""
+列表执行基准：1000 个元素逐个调用开关节点（ComfyUI 对普通节点的列表执行方式）与列表节点一次调用的耗时对比
+- 逐个调用走节点的 FUNCTION（含运行指标包装），与 ComfyUI 每个元素调用一次相同
+- 列表节点一次收到整个列表，输出通过/未通过两组列表及原始序号
+- 最后用迷你执行器执行一个连线的工作流：列表源 -> 任意切换（普通/列表版）-> 输出，
+  检查列表版只在第一路有空元素时才计算第二路，且结果与逐个调用一致
+用法：python benchmarks/bench_lists.py [--items 1000] [--rounds 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comfy_stubs import import_package, install_stubs  # noqa: E402
+from mini_executor import MiniExecutor  # noqa: E402
+
+
+class BenchListSource:
+    """输出 count 个字符串的列表，gap_every > 0 时每 gap_every 个元素有一个空字符串"""
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {"count": ("INT", {"default": 1000}), "gap_every": ("INT", {"default": 0}),
+                             "label": ("STRING", {"default": "item"})}}
+
+    RETURN_TYPES = ("STRING",)
+    OUTPUT_IS_LIST = (True,)
+    FUNCTION = "run"
+
+    def run(self, count, gap_every, label):
+        return ([("" if gap_every and i % gap_every == 0 else f"{label} {i}") for i in range(count)],)
+
+
+class BenchListSink:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {}, "optional": {"value": ("*",)}}
+
+    INPUT_IS_LIST = True
+    RETURN_TYPES = ()
+    FUNCTION = "run"
+    OUTPUT_NODE = True
+
+    def run(self, value=None):
+        return ()
+
+
+SYNTHETIC_NODES = {"BenchListSource": BenchListSource, "BenchListSink": BenchListSink}
+
+
+def best_of(func, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def make_cases(mappings, items):
+    captions = [f"a photo of item {i}" if i % 3 else "" for i in range(items)]
+    numbers = list(range(items))
+    conditions = [i % 2 == 0 for i in range(items)]
+
+    def node(name):
+        node_class = mappings[name].resolve()
+        return node_class(), getattr(node_class, node_class.FUNCTION)
+
+    logic, logic_fn = node("LogicSkipNode")
+    logic_list, logic_list_fn = node("LogicSkipListNode")
+    boolean, boolean_fn = node("BooleanSkipNode")
+    boolean_list, boolean_list_fn = node("BooleanSkipListNode")
+    switch, switch_fn = node("EGRYDZQHNode")
+    switch_list, switch_list_fn = node("EGRYDZQHListNode")
+    fallback = [f"caption {i}" for i in range(items)]
+
+    return {
+        "LogicSkipNode 大于": (
+            lambda: [logic_fn(logic, condition=True, input=v, comparison_type="大于", comparison_value="500")
+                     for v in numbers],
+            lambda: logic_list_fn(logic_list, condition=[True], input=numbers, comparison_type=["大于"],
+                                  comparison_value=["500"]),
+        ),
+        "LogicSkipNode 包含": (
+            lambda: [logic_fn(logic, condition=True, input=v, comparison_type="包含", comparison_value="item 1")
+                     for v in captions],
+            lambda: logic_list_fn(logic_list, condition=[True], input=captions, comparison_type=["包含"],
+                                  comparison_value=["item 1"]),
+        ),
+        "BooleanSkipNode": (
+            lambda: [boolean_fn(boolean, condition=c, input=v, invert=False, control_type="跳过节点")
+                     for c, v in zip(conditions, captions)],
+            lambda: boolean_list_fn(boolean_list, condition=conditions, input=captions, invert=[False]),
+        ),
+        "EGRYDZQHNode": (
+            lambda: [switch_fn(switch, input1=a, input2=b) for a, b in zip(captions, fallback)],
+            lambda: switch_list_fn(switch_list, input1=captions, input2=fallback),
+        ),
+    }
+
+
+def routed_prompt(switch_type, items, gap_every):
+    return {
+        "1": {"class_type": "BenchListSource", "inputs": {"count": items, "gap_every": gap_every, "label": "a"}},
+        "2": {"class_type": "BenchListSource", "inputs": {"count": items, "gap_every": 0, "label": "b"}},
+        "3": {"class_type": switch_type, "inputs": {"input1": ["1", 0], "input2": ["2", 0]}},
+        "4": {"class_type": "BenchListSink", "inputs": {"value": ["3", 0]}},
+    }
+
+
+def run_routed(executor, items, rounds):
+    """连线执行：第一路无空元素时列表版不应计算第二路；有空元素时结果应与逐个调用一致"""
+    for gap_every, label in ((0, "无空元素"), (3, "每3个空1个")):
+        reports = {}
+        for switch_type in ("EGRYDZQHNode", "EGRYDZQHListNode"):
+            prompt = routed_prompt(switch_type, items, gap_every)
+            reports[switch_type] = (best_of(lambda: executor.run(prompt), rounds), executor.run(prompt))
+
+        per_item_s, per_item = reports["EGRYDZQHNode"]
+        list_s, as_list = reports["EGRYDZQHListNode"]
+        assert as_list["outputs"]["3"][0] == per_item["outputs"]["3"][0], "列表版任意切换的输出与逐个调用不一致"
+        assert ("2" in as_list["outputs"]) == bool(gap_every), "列表版任意切换的第二路计算情况不符"
+        print(f"{'连线执行 ' + label:<20} 逐个调用 {per_item_s * 1000:8.2f} ms  列表节点 {list_s * 1000:8.2f} ms  "
+              f"加速 {per_item_s / list_s:5.1f}x  （列表版执行 {as_list['executed']} 个节点）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000, help="列表元素个数")
+    parser.add_argument("--rounds", type=int, default=20, help="每种方式测量的轮数（取最快）")
+    args = parser.parse_args()
+
+    install_stubs()
+    package = import_package()
+    for name, (per_item, as_list) in make_cases(package.NODE_CLASS_MAPPINGS, args.items).items():
+        per_item_ms = best_of(per_item, args.rounds) * 1000
+        list_ms = best_of(as_list, args.rounds) * 1000
+        print(f"{name:<20} 逐个调用 {per_item_ms:8.2f} ms  列表节点 {list_ms:8.2f} ms  "
+              f"加速 {per_item_ms / list_ms:5.1f}x")
+
+    executor = MiniExecutor({**package.NODE_CLASS_MAPPINGS, **SYNTHETIC_NODES})
+    run_routed(executor, args.items, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
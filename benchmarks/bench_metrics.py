@@ -0,0 +1,67 @@
+"""
+运行指标基准：测量 FUNCTION 包装带来的额外耗时，并通过本地 aiohttp 服务抓取一次 /kaiguan/metrics
+- 同一个节点分别调用原始方法与包装后的方法，比较单次调用耗时
+- 路由注册在 PromptServer 替身的 routes 上，与在 ComfyUI 中注册的方式相同
+用法：python benchmarks/bench_metrics.py [--number 20000] [--show]
+需要安装 aiohttp（ComfyUI 自带）
+"""
+import argparse
+import asyncio
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comfy_stubs import import_package, install_stubs  # noqa: E402
+
+
+def measure_overhead(package, number):
+    """返回 (原始调用微秒, 包装后调用微秒)"""
+    node_class = package.NODE_CLASS_MAPPINGS["LogicSkipNode"].resolve()
+    wrapped = getattr(node_class, node_class.FUNCTION)
+    raw = wrapped.__wrapped__
+    node = node_class()
+    kwargs = {"condition": True, "input": 5, "comparison_type": "大于", "comparison_value": "3"}
+    raw_us = min(timeit.repeat(lambda: raw(node, **kwargs), number=number, repeat=5)) / number * 1e6
+    wrapped_us = min(timeit.repeat(lambda: wrapped(node, **kwargs), number=number, repeat=5)) / number * 1e6
+    return raw_us, wrapped_us
+
+
+async def fetch_metrics(server, path):
+    from aiohttp.test_utils import TestClient, TestServer
+
+    client = TestClient(TestServer(server.make_app()))
+    await client.start_server()
+    try:
+        response = await client.get(path)
+        return response.status, response.headers.get("Content-Type"), await response.text()
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000, help="每轮调用次数")
+    parser.add_argument("--show", action="store_true", help="输出完整的指标文本")
+    args = parser.parse_args()
+
+    server = install_stubs()
+    if server.routes is None:
+        sys.exit("需要安装 aiohttp")
+    package = import_package()
+    metrics_module = sys.modules[f"{package.__name__}.kaiguan_metrics"]
+
+    raw_us, wrapped_us = measure_overhead(package, args.number)
+    print(f"LogicSkipNode 单次调用: 原始 {raw_us:.2f} µs  包装后 {wrapped_us:.2f} µs  "
+          f"额外 {wrapped_us - raw_us:.2f} µs")
+
+    status, content_type, text = asyncio.run(fetch_metrics(server, metrics_module.METRICS_ROUTE))
+    samples = [line for line in text.splitlines() if line and not line.startswith("#")]
+    print(f"GET {metrics_module.METRICS_ROUTE}: {status} {content_type}  共 {len(samples)} 条样本")
+    if args.show:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+节点执行微基准：不依赖 ComfyUI，使用 server / nodes 替身逐个计时 NODE_CLASS_MAPPINGS 中各节点的 FUNCTION
+输入覆盖短字符串、1MB 提示词、大整数/浮点数、CPU 张量以及含 model/clip 的上下文字典；
+INPUT_IS_LIST 的列表节点按 ComfyUI 的调用方式传入列表（控件值也包装成单元素列表）
+用法：
+    python benchmarks/bench_nodes.py [--number 200] [--repeat 5] [--json nodes_baseline.json]
+    python benchmarks/bench_nodes.py --compare nodes_baseline.json [--threshold 1.5]
+对比基线时任一用例的中位耗时超过 基线 × threshold，或有节点缺少用例、用例出错、基线中的用例缺失，即以非零状态退出
+没有 FUNCTION 的纯前端节点不参与计时
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comfy_stubs import import_package, install_stubs  # noqa: E402
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# 低于该耗时（微秒）的用例不参与回归判断，避免计时抖动造成误报
+MIN_COMPARE_US = 1.0
+
+# 列表节点用例的列表长度
+LIST_LENGTH = 1000
+
+
+def build_values():
+    """各节点共用的输入值"""
+    values = {
+        "short_str": "hello",
+        "prompt_1mb": "masterpiece, best quality, " * (1024 * 1024 // 27),
+        "big_int": 2 ** 62,
+        "big_float": 1.7976931348623157e308,
+        "context": {"model": object(), "clip": object(), "vae": None, "positive": None},
+    }
+    if torch is not None:
+        values["tensor"] = torch.rand(1, 512, 512, 3)
+    return values
+
+
+def build_workflow(node_count, seed_id):
+    nodes = [{"id": i, "type": "KSampler", "widgets_values": [0, "fixed", 20]} for i in range(1, node_count + 1)]
+    nodes[seed_id - 1] = {"id": seed_id, "type": "EGSEED", "widgets_values": [-1]}
+    return {"workflow": {"nodes": nodes, "groups": []}}
+
+
+def build_rules(count):
+    """组规则表：count 条等值规则与区间规则交替"""
+    lines = []
+    for i in range(count):
+        if i % 2:
+            lines.append(f"[{i * 10}, {i * 10 + 10}) => 屏蔽组 : Group_{i}")
+        else:
+            lines.append(f"value_{i} => 启用组 : Group_{i}")
+    lines.append("* => 不变")
+    return "\n".join(lines)
+
+
+def build_cases(values):
+    """节点类名 -> {用例名: 调用参数}；每次调用前复制参数，避免节点修改输入影响后续计时"""
+    per_value = lambda make: {name: make(value) for name, value in values.items()}  # noqa: E731
+    seed_id = 1000
+    prompts = [f"masterpiece, portrait {i}" for i in range(LIST_LENGTH)]
+    sparse = [None if i % 3 == 0 else f"first {i}" for i in range(LIST_LENGTH)]
+    return {
+        "GroupSwitchNode": {"bool": {"smooth_edge_switch": True}},
+        "GroupSwitchNodee": {"bool": {"smooth_edge_switch": True}},
+        "GroupSwitchNodeee": {"bool": {"smooth_edge_switch": True}},
+        "hulue": per_value(lambda v: {"any_type": v}),
+        "jinyong": per_value(lambda v: {"any_type": v}),
+        "ALLty": per_value(lambda v: {"any_type": v}),
+        "EGRWGL": {"int": {"运行次数": 1}},
+        "EGSEED": {
+            "fixed": {"seed": 123456},
+            "random_2000_nodes": {
+                "seed": -1,
+                "prompt": {str(seed_id): {"inputs": {"seed": -1}}},
+                "extra_pnginfo": build_workflow(2000, seed_id),
+                "unique_id": str(seed_id),
+            },
+        },
+        "LogicSkipNode": per_value(lambda v: {
+            "condition": True, "input": v, "comparison_type": "等于", "comparison_value": "hello"}),
+        "LogicBatchSkipNode": per_value(lambda v: {
+            "condition": True, "input": v, "comparison_type": "大于", "comparison_value": "0.5"}),
+        "LogicSkipListNode": {
+            "contains_1000": {"condition": [True], "input": prompts, "comparison_type": ["包含"],
+                              "comparison_value": ["7"]},
+            "ints_1000": {"condition": [True], "input": list(range(LIST_LENGTH)), "comparison_type": ["大于"],
+                          "comparison_value": [str(LIST_LENGTH // 2)]},
+        },
+        "BooleanSkipNode": per_value(lambda v: {
+            "condition": True, "input": v, "invert": False, "control_type": "跳过节点"}),
+        "BooleanSkipListNode": {
+            "single_1000": {"condition": [True], "input": prompts, "invert": [False]},
+            "per_item_1000": {"condition": [i % 2 == 0 for i in range(LIST_LENGTH)], "input": prompts,
+                              "invert": [False]},
+            "all_false": {"condition": [False], "input": [None], "invert": [False]},
+        },
+        "EGRYDZQHNode": per_value(lambda v: {"input1": None, "input2": v}),
+        "EGRYDZQHListNode": {
+            "gaps_1000": {"input1": sparse, "input2": prompts},
+            "full_1000": {"input1": prompts, "input2": [None]},
+        },
+        "EGDLXZNode": {
+            "index": {"mode": "序号选择", "index": 3, "priority": "", "input_count": 4,
+                      "input3": values["short_str"]},
+            "first_non_empty": {"mode": "第一个非空", "index": 1, "priority": "", "input_count": 64,
+                                "input1": None, "input2": "", "input40": values["short_str"]},
+            "priority": {"mode": "优先级列表", "index": 1, "priority": "4, 2, 1", "input_count": 4,
+                         "input4": None, "input2": values["short_str"]},
+        },
+        "GlobalGroupConditionNode": per_value(lambda v: {
+            "enable": True, "input_value": v, "comparison_type": "包含", "comparison_value": "quality",
+            "when_true": "启用组", "when_false": "禁用组", "target_groups": "Sampler\nUpscale",
+            "reverse_condition": False, "unique_id": "1"}),
+        "SmartGroupSwitchNode": {
+            "short_str": {"enable_group": True, "switch_mode": "开启", "group_names": "Sampler, Upscale",
+                          "unique_id": "2"},
+            "dynamic_list": {"enable_group": True, "switch_mode": "屏蔽", "group_names": "",
+                             "dynamic_group_names": [f"Group_{i}" for i in range(200)], "unique_id": "2"},
+        },
+        "AdvancedGroupSwitchNode": {
+            "single": {"enable": True, "control_mode": "单组控制", "group_name": "Sampler", "unique_id": "3"},
+            "multi": {"enable": True, "control_mode": "多组控制",
+                      "group_list": ", ".join(f"Group_{i}" for i in range(200)), "unique_id": "3"},
+        },
+        "GroupRuleTableNode": {
+            "equal_200": {"enable": True, "input_value": "value_100", "rules": build_rules(200), "unique_id": "5"},
+            "interval_200": {"enable": True, "input_value": 995, "rules": build_rules(200), "unique_id": "5"},
+        },
+        "FlowBypassGroupNode": per_value(lambda v: {
+            "flow_input": v, "groups_to_bypass": "Sampler\nUpscale|Refiner", "unique_id": "4"}),
+    }
+
+
+def add_tensor_cases(cases, values):
+    """需要张量输入的用例：没有 torch 时不添加"""
+    if "tensor" in values:
+        cases["GroupRuleTableNode"]["tensor"] = {
+            "enable": True, "input_value": values["tensor"], "rules": build_rules(200), "unique_id": "5"}
+    return cases
+
+
+def copy_kwargs(kwargs):
+    # 只复制会被节点原地修改的容器（prompt / workflow），大对象按引用传递
+    copied = dict(kwargs)
+    if "prompt" in copied:
+        copied["prompt"] = json.loads(json.dumps(copied["prompt"]))
+    return copied
+
+
+def time_case(node, function_name, kwargs, number, repeat):
+    """返回计时结果；节点对该输入抛出异常时记录错误，不中断其余用例"""
+    func = getattr(node, function_name)
+    try:
+        func(**copy_kwargs(kwargs))
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    timings = timeit.repeat(lambda: func(**copy_kwargs(kwargs)), number=number, repeat=repeat)
+    per_call = [t / number * 1e6 for t in timings]
+    return {"median_us": round(statistics.median(per_call), 3), "min_us": round(min(per_call), 3)}
+
+
+def run(number, repeat, only=None):
+    server = install_stubs()
+    package = import_package()
+    values = build_values()
+    cases = add_tensor_cases(build_cases(values), values)
+
+    results = {}
+    skipped = {}
+    frontend_only = []
+    for class_name, node_class in package.NODE_CLASS_MAPPINGS.items():
+        if only and class_name not in only:
+            continue
+        function_name = getattr(node_class, "FUNCTION", None)
+        node = node_class()
+        if function_name is None or not hasattr(node, function_name):
+            frontend_only.append(class_name)
+            continue
+        if class_name not in cases:
+            skipped[class_name] = "没有基准用例"
+            continue
+        results[class_name] = {
+            case_name: time_case(node, function_name, kwargs, number, repeat)
+            for case_name, kwargs in cases[class_name].items()
+        }
+        # 替身只用于计时，推送记录无需保留
+        server.messages.clear()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "torch": getattr(torch, "__version__", None),
+            "number": number,
+            "repeat": repeat,
+        },
+        "results": results,
+        "skipped": skipped,
+        "frontend_only": frontend_only,
+    }
+
+
+def compare(report, baseline, threshold):
+    """返回超过阈值的用例 [(节点, 用例, 基线us, 当前us)]"""
+    regressions = []
+    for class_name, cases in report["results"].items():
+        for case_name, data in cases.items():
+            base = baseline.get("results", {}).get(class_name, {}).get(case_name)
+            if base is None or "error" in base or "error" in data or base["median_us"] < MIN_COMPARE_US:
+                continue
+            if data["median_us"] > base["median_us"] * threshold:
+                regressions.append((class_name, case_name, base["median_us"], data["median_us"]))
+    return regressions
+
+
+def coverage_gaps(report, baseline):
+    """返回覆盖不足的问题描述：缺少用例的节点、出错的用例、基线中有而本次没有的用例"""
+    gaps = [f"{class_name} {reason}" for class_name, reason in report["skipped"].items()]
+    for class_name, cases in report["results"].items():
+        gaps.extend(f"{class_name}/{case_name} 出错：{data['error']}"
+                    for case_name, data in cases.items() if "error" in data)
+    measured = set(report["results"]) | set(report["skipped"])
+    for class_name, cases in baseline.get("results", {}).items():
+        if class_name not in measured:
+            # --node 只测量了部分节点
+            continue
+        gaps.extend(f"{class_name}/{case_name} 基线中有，本次缺失"
+                    for case_name in cases if case_name not in report["results"].get(class_name, {}))
+    return gaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200, help="每轮计时的调用次数")
+    parser.add_argument("--repeat", type=int, default=5, help="计时轮数，取中位数")
+    parser.add_argument("--node", action="append", help="只测量指定节点，可重复")
+    parser.add_argument("--json", help="将结果写入JSON基线文件")
+    parser.add_argument("--compare", help="与已有基线对比")
+    parser.add_argument("--threshold", type=float, default=1.5, help="判定为回归的耗时倍数")
+    args = parser.parse_args()
+
+    report = run(args.number, args.repeat, set(args.node) if args.node else None)
+
+    print(f"{'节点':<28}{'用例':<20}{'中位 us/次':>14}{'最小 us/次':>14}")
+    for class_name, cases in report["results"].items():
+        for case_name, data in cases.items():
+            if "error" in data:
+                print(f"{class_name:<28}{case_name:<20}  出错：{data['error']}")
+                continue
+            print(f"{class_name:<28}{case_name:<20}{data['median_us']:>14.2f}{data['min_us']:>14.2f}")
+    for class_name, reason in report["skipped"].items():
+        print(f"{class_name:<28}跳过：{reason}")
+    for class_name in report["frontend_only"]:
+        print(f"{class_name:<28}纯前端节点，不计时")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.json}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for class_name, case_name, base_us, current_us in regressions:
+            print(f"⚠️ 回归: {class_name}/{case_name} {base_us:.2f} us -> {current_us:.2f} us")
+        gaps = coverage_gaps(report, baseline)
+        for gap in gaps:
+            print(f"⚠️ 覆盖不足: {gap}")
+        if regressions or gaps:
+            sys.exit(1)
+        print("未发现超过阈值的回归，所有节点均有用例")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+种子流基准：比较逐个生成随机种子与种子流一次生成整批的耗时，并检查不同 worker 之间没有重复
+- 逐个：generate_unique_seed()（EGSEED 原有的随机模式）
+- 种子流：SeedStreams.draw（预留位置 + 向量化 Philox），以及不使用 numpy 的逐个计算
+- 最后用迷你执行器按 ComfyUI 的顺序（先 IS_CHANGED 后执行）运行 EGSEED，
+  检查输出的种子与 IS_CHANGED 预留的一致，且种子流每次执行只前移 batch_size 个位置
+- journal 写在临时目录中，测量结束后删除
+用法：python benchmarks/bench_seed.py [--batch 4096] [--workers 8] [--rounds 20]
+"""
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_workflow import SYNTHETIC_NODES  # noqa: E402
+from comfy_stubs import import_package, install_stubs  # noqa: E402
+from mini_executor import MiniExecutor  # noqa: E402
+
+
+def best_of(func, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def check_executor(package, seed_module, batch_size, runs=3):
+    """IS_CHANGED -> main 的完整顺序：返回发现的问题列表"""
+    executor = MiniExecutor({**package.NODE_CLASS_MAPPINGS, **SYNTHETIC_NODES})
+    streams = seed_module.seed_streams()
+    problems = []
+    for stream in (False, True):
+        prompt = {
+            "1": {"class_type": "EGSEED", "inputs": {"seed": -1, "stream": stream, "batch_size": batch_size}},
+            "2": {"class_type": "BenchSink", "inputs": {"value": ["1", 0]}},
+        }
+        seen = set()
+        for _ in range(runs):
+            before = streams.reserve("1", 0)
+            result = executor.run(json_copy(prompt))
+            seed, seeds = result["outputs"]["1"][0][0], result["outputs"]["1"][1]
+            reserved = result["is_changed"]["1"]
+            expected = streams.seeds_at("1", reserved, 1)[0] if stream else reserved
+            if seed != expected:
+                problems.append(f"stream={stream}: 输出种子 {seed} 与 IS_CHANGED 预留的 {expected} 不一致")
+            if stream and streams.reserve("1", 0) - before != batch_size:
+                problems.append(f"stream=True: 一次执行前移了 {streams.reserve('1', 0) - before} 个位置，"
+                                f"应为 {batch_size}")
+            if len(seeds) != batch_size or seen.intersection(seeds):
+                problems.append(f"stream={stream}: 种子个数不符或与之前的执行重复")
+            seen.update(seeds)
+
+    # 接近范围上限的固定种子：批量种子循环回范围内，不重复
+    egseed = package.NODE_CLASS_MAPPINGS["EGSEED"].resolve()()
+    seed_max = seed_module.SEED_MAX
+    _, seeds = egseed.main(seed=seed_max - 1, batch_size=4)
+    if seeds != [seed_max - 1, seed_max, 0, 1]:
+        problems.append(f"stream=False: 种子 {seed_max - 1} 起的批量种子超出范围或未循环: {seeds}")
+    return problems
+
+
+def json_copy(prompt):
+    return {node_id: {"class_type": node["class_type"], "inputs": dict(node["inputs"])}
+            for node_id, node in prompt.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch", type=int, default=4096, help="每批种子数")
+    parser.add_argument("--workers", type=int, default=8, help="检查重复时模拟的 worker 数")
+    parser.add_argument("--rounds", type=int, default=20, help="每种方式测量的轮数（取最快）")
+    args = parser.parse_args()
+
+    install_stubs()
+    package = import_package()
+    # 节点模块按需导入，这里直接导入
+    seed_module = importlib.import_module(f"{package.__name__}.kaiguan_seed")
+    egseed_module = importlib.import_module(f"{package.__name__}.kaiguanj")
+
+    with tempfile.TemporaryDirectory() as journal_dir:
+        streams = seed_module.SeedStreams("bench-worker", journal_dir)
+        per_seed = best_of(lambda: [egseed_module.generate_unique_seed() for _ in range(args.batch)], args.rounds)
+        batched = best_of(lambda: streams.draw("1", args.batch), args.rounds)
+        scalar = best_of(lambda: [seed_module.philox4x32((i, 0, 1, 0), streams.key) for i in range(args.batch)],
+                         max(1, args.rounds // 4))
+        for name, elapsed in (("逐个随机", per_seed), ("种子流（向量化）", batched), ("种子流（逐个计算）", scalar)):
+            print(f"{name:<12} {args.batch} 个种子 {elapsed * 1000:8.2f} ms  "
+                  f"{elapsed / args.batch * 1e9:8.1f} ns/个")
+
+        # 相同的节点id、相同的起始时刻：不同 worker 的种子互不重复
+        seeds = set()
+        total = 0
+        for worker in range(args.workers):
+            _, batch = seed_module.SeedStreams(f"worker-{worker}", journal_dir).draw("1", args.batch)
+            seeds.update(batch)
+            total += len(batch)
+        print(f"{args.workers} 个 worker × {args.batch} 个种子: 重复 {total - len(seeds)} 个")
+
+        # 重新打开 journal：位置从上次结束处继续
+        position = seed_module.SeedStreams("bench-worker", journal_dir).reserve("1", 0)
+        print(f"重启后 bench-worker 节点1 的下一个位置: {position}")
+
+        os.environ["KAIGUAN_SEED_JOURNAL_DIR"] = journal_dir
+        problems = check_executor(package, seed_module, min(args.batch, 16))
+        for problem in problems:
+            print(f"⚠️ {problem}")
+        if problems:
+            sys.exit(1)
+        print("IS_CHANGED -> 执行: 种子与预留一致，种子流每次执行只前移 batch_size 个位置")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+组合展开基准：在合成工作流上按开关设置展开笛卡尔积，统计去重后的任务数与展开耗时
+- 轴：若干 BooleanSkipNode 的 condition / invert、LogicSkipNode 的 condition，以及部分通道组的状态
+- 组状态 enable 与 unchanged、disable 与 bypass（整条通道被移除）剪枝后等效，会被合并
+- 先在小工作流上核对增量签名：每个组合的图签名都要与完整剪枝后重新计算的结果一致，不一致即以非零状态退出
+- 加 --submit 时通过本地 aiohttp 替身服务调用 POST /kaiguan/sweep，确认只有去重后的任务入队
+用法：python benchmarks/bench_sweep.py [--nodes 2000] [--switches 100] [--bools 3] [--groups 2] [--submit]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_workflow import SYNTHETIC_NODES, generate_workflow  # noqa: E402
+from comfy_stubs import import_package, install_stubs  # noqa: E402
+
+GROUP_VALUES = ["enable", "unchanged", "disable", "bypass"]
+
+
+def make_axes(prompt, bool_count, group_count):
+    bools = [node_id for node_id, node in prompt.items() if node["class_type"] == "BooleanSkipNode"]
+    logic = [node_id for node_id, node in prompt.items() if node["class_type"] == "LogicSkipNode"]
+    axes = []
+    for node_id in bools[:bool_count]:
+        axes.append({"node": node_id, "input": "condition", "values": [True, False]})
+        axes.append({"node": node_id, "input": "invert", "values": [True, False]})
+    for node_id in logic[:1]:
+        axes.append({"node": node_id, "input": "condition", "values": [False, True]})
+    # 选择 LogicSkipNode 所在的通道，禁用后其 condition 轴不再影响结果
+    for lane in range(1, 3 * group_count, 3):
+        axes.append({"group": f"Lane_{lane}", "values": GROUP_VALUES})
+    return axes
+
+
+def check(sweep, prune, controller_classes, node_types, bool_count, group_count):
+    """增量签名与逐个组合完整剪枝、重新计算的签名逐一比较，返回不一致的组合数"""
+    prompt, extra_data = generate_workflow(300, 20)
+    workflow = extra_data["extra_pnginfo"]["workflow"]
+    axes = make_axes(prompt, bool_count, group_count)
+    _, combinations = sweep.expand_sweep(prompt, workflow, axes, controller_classes, node_types)
+    ordered = sweep.order_axes(prompt, [sweep.Axis(spec) for spec in axes])
+    index = prune.WorkflowGroupIndex.from_workflow(workflow)
+    mismatches = 0
+    for entry in combinations:
+        combination = [entry["settings"][axis.label] for axis in ordered]
+        combo_prompt, overrides, _ = sweep._apply_settings(prompt, ordered, combination)
+        pruned, _ = prune.prune_prompt(combo_prompt, index, controller_classes, node_types, overrides)
+        if sweep.graph_hash(pruned, node_types)[0] != entry["graph_hash"]:
+            mismatches += 1
+    return mismatches, len(combinations)
+
+
+async def submit(server, route, body):
+    from aiohttp.test_utils import TestClient, TestServer
+
+    client = TestClient(TestServer(server.make_app()))
+    await client.start_server()
+    try:
+        started = time.perf_counter()
+        response = await client.post(route, json=body)
+        return time.perf_counter() - started, response.status, await response.json()
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=2000, help="工作流节点数")
+    parser.add_argument("--switches", type=int, default=100, help="开关节点（通道）数量")
+    parser.add_argument("--bools", type=int, default=3, help="参与展开的 BooleanSkipNode 数")
+    parser.add_argument("--groups", type=int, default=2, help="参与展开的通道组数")
+    parser.add_argument("--submit", action="store_true", help="通过 /kaiguan/sweep 提交")
+    args = parser.parse_args()
+
+    server = install_stubs()
+    package = import_package()
+    node_types = sys.modules["nodes"].NODE_CLASS_MAPPINGS
+    node_types.update(SYNTHETIC_NODES)
+    sweep = sys.modules[f"{package.__name__}.kaiguan_sweep"]
+    prune = sys.modules[f"{package.__name__}.kaiguan_prune"]
+
+    prompt, extra_data = generate_workflow(args.nodes, args.switches)
+    workflow = extra_data["extra_pnginfo"]["workflow"]
+    axes = make_axes(prompt, args.bools, args.groups)
+
+    # 控制节点模块（及其可选依赖）的导入不计入测量
+    controller_classes = prune._controller_classes()
+    mismatches, checked = check(sweep, prune, controller_classes, node_types, args.bools, args.groups)
+    if mismatches:
+        sys.exit(f"⚠️ {mismatches} / {checked} 个组合的增量签名与完整计算不一致")
+    print(f"{checked} 个组合的增量签名与完整计算一致")
+
+    started = time.perf_counter()
+    unique, combinations = sweep.expand_sweep(prompt, workflow, axes, controller_classes, node_types)
+    elapsed = time.perf_counter() - started
+    reused = [entry["reused_nodes"] for entry in unique[1:]]
+    print(f"节点 {len(prompt)}  轴 {len(axes)}  组合 {len(combinations)}  去重后 {len(unique)}  "
+          f"（减少 {1 - len(unique) / len(combinations):.0%}）  展开 {elapsed * 1000:.1f} ms  "
+          f"{elapsed / len(combinations) * 1e6:.0f} µs/组合")
+    if reused:
+        print(f"相邻任务共用节点数: 平均 {sum(reused) / len(reused):.0f} / {len(prompt)}")
+
+    if args.submit:
+        if server.routes is None:
+            sys.exit("需要安装 aiohttp")
+        api = sys.modules[f"{package.__name__}.kaiguan_api"]
+        body = {"prompt": prompt, "extra_data": extra_data, "axes": axes}
+        elapsed, status, data = asyncio.run(submit(server, api.SWEEP_ROUTE, body))
+        print(f"POST {api.SWEEP_ROUTE}: {status}  入队 {data.get('queued')}  失败 {data.get('failed')}  "
+              f"替身队列 {len(server.queue)}  耗时 {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
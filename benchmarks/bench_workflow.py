@@ -0,0 +1,285 @@
+"""
+大规模工作流路由开销基准：生成含大量开关节点的合成工作流，用迷你执行器在 CPU 上执行
+每条"通道"由 源节点 -> 直通链 -> 开关节点 -> 直通链 -> 输出节点 组成，
+开关节点轮流使用 BooleanSkipNode / LogicSkipNode / EGRYDZQHNode，
+可选地在通道外放置 SmartGroupSwitchNode，通过提交钩子在后端禁用部分通道所在的组
+用法：python benchmarks/bench_workflow.py [--nodes 1000 --nodes 50000] [--switches 300]
+                                          [--controllers 10] [--runs 3] [--json workflow_baseline.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from comfy_stubs import import_package, install_stubs  # noqa: E402
+from mini_executor import MiniExecutor  # noqa: E402
+
+SWITCH_TYPES = ("BooleanSkipNode", "LogicSkipNode", "EGRYDZQHNode")
+
+# 合成工作流的画布布局
+NODE_WIDTH = 200
+NODE_HEIGHT = 80
+COLUMN_SPACING = 250
+LANE_SPACING = 200
+
+
+# ---- 合成节点 ----
+
+class BenchSource:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {"value": ("INT", {"default": 0})}}
+
+    RETURN_TYPES = ("*",)
+    FUNCTION = "run"
+
+    def run(self, value):
+        return (value,)
+
+
+class BenchPassThrough:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {"drop": ("BOOLEAN", {"default": False})},
+            "optional": {"value": ("*",)},
+        }
+
+    RETURN_TYPES = ("*",)
+    FUNCTION = "run"
+
+    def run(self, drop, value=None):
+        return (None if drop else value,)
+
+
+class BenchSink:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {}, "optional": {"value": ("*",)}}
+
+    RETURN_TYPES = ()
+    FUNCTION = "run"
+    OUTPUT_NODE = True
+
+    def run(self, value=None):
+        return ()
+
+
+SYNTHETIC_NODES = {
+    "BenchSource": BenchSource,
+    "BenchPassThrough": BenchPassThrough,
+    "BenchSink": BenchSink,
+}
+
+
+# ---- 工作流生成 ----
+
+class WorkflowBuilder:
+    """同时生成 API 格式的提示词与带组信息的工作流（extra_pnginfo）"""
+    def __init__(self):
+        self.prompt = {}
+        self.nodes = []
+        self.groups = []
+        self._next_id = 1
+
+    def add(self, class_type, inputs, lane, column):
+        node_id = str(self._next_id)
+        self._next_id += 1
+        self.prompt[node_id] = {"class_type": class_type, "inputs": inputs}
+        self.nodes.append({
+            "id": int(node_id),
+            "type": class_type,
+            "pos": [column * COLUMN_SPACING, lane * LANE_SPACING],
+            "size": [NODE_WIDTH, NODE_HEIGHT],
+        })
+        return node_id
+
+    def chain(self, source, length, lane, column, drop_last=False):
+        """在 source 之后追加 length 个直通节点，返回 (末端节点id, 下一列)"""
+        for i in range(length):
+            drop = drop_last and i == length - 1
+            source = self.add("BenchPassThrough", {"drop": drop, "value": [source, 0]}, lane, column)
+            column += 1
+        return source, column
+
+    def add_group(self, title, lane, columns):
+        top = lane * LANE_SPACING - 60
+        self.groups.append({"title": title, "bounding": [-50, top, columns * COLUMN_SPACING + 100, LANE_SPACING - 20]})
+
+    def extra_data(self):
+        return {"extra_pnginfo": {"workflow": {"nodes": self.nodes, "groups": self.groups}}}
+
+
+def generate_workflow(node_count, switch_count, controller_count=0, seed=0):
+    """
+    生成约 node_count 个节点、switch_count 个开关节点的工作流
+    返回 (prompt, extra_data)
+    """
+    rng = random.Random(seed)
+    builder = WorkflowBuilder()
+    # 每条通道至少需要 4 个节点，节点数较少时相应减少开关数量
+    switch_count = max(min(switch_count, node_count // 4), 1)
+    per_lane = node_count // switch_count
+    # 每条通道：源节点 + 开关节点 + 输出节点，其余为直通链
+    chain_budget = per_lane - 3
+
+    for lane in range(switch_count):
+        switch_type = SWITCH_TYPES[lane % len(SWITCH_TYPES)]
+        before = chain_budget // 2
+        after = chain_budget - before
+        source = builder.add("BenchSource", {"value": lane}, lane, 0)
+
+        if switch_type == "EGRYDZQHNode":
+            # 两条候选分支：一半通道的第一分支输出为空，触发惰性计算第二分支
+            first_len = max(before // 2, 1)
+            first, column = builder.chain(source, first_len, lane, 1, drop_last=lane % 2 == 0)
+            second, column = builder.chain(source, max(before - first_len, 1), lane, column)
+            switch = builder.add(switch_type, {"input1": [first, 0], "input2": [second, 0]}, lane, column)
+        else:
+            tail, column = builder.chain(source, before, lane, 1)
+            if switch_type == "BooleanSkipNode":
+                inputs = {"condition": rng.random() < 0.5, "input": [tail, 0], "invert": False,
+                          "control_type": "跳过节点"}
+            else:
+                inputs = {"condition": True, "input": [tail, 0], "comparison_type": "大于",
+                          "comparison_value": str(switch_count // 2)}
+            switch = builder.add(switch_type, inputs, lane, column)
+
+        tail, column = builder.chain(switch, after, lane, column + 1)
+        builder.add("BenchSink", {"value": [tail, 0]}, lane, column)
+        builder.add_group(f"Lane_{lane}", lane, column + 1)
+
+    # 控制节点放在所有组之外
+    for i in range(controller_count):
+        targets = rng.sample(range(switch_count), k=min(3, switch_count))
+        builder.add("SmartGroupSwitchNode", {
+            "enable_group": True,
+            "switch_mode": "关闭",
+            "group_names": ", ".join(f"Lane_{t}" for t in targets),
+        }, -2 - i, -4)
+
+    return builder.prompt, builder.extra_data()
+
+
+def flow_bypass_workflow(condition):
+    """
+    流程屏蔽组核对用的小工作流：通道0为组 Target，通道1中 FlowBypassGroupNode 位于 BooleanSkipNode 的输入分支上
+    返回 (prompt, extra_data, 组内直通节点id)
+    """
+    builder = WorkflowBuilder()
+    source = builder.add("BenchSource", {"value": 0}, 0, 0)
+    target = builder.add("BenchPassThrough", {"drop": False, "value": [source, 0]}, 0, 1)
+    builder.add("BenchSink", {"value": [target, 0]}, 0, 2)
+    builder.add_group("Target", 0, 3)
+
+    source = builder.add("BenchSource", {"value": 1}, 2, 0)
+    bypass = builder.add("FlowBypassGroupNode", {"flow_input": [source, 0], "groups_to_bypass": "Target"}, 2, 1)
+    switch = builder.add("BooleanSkipNode", {"condition": condition, "input": [bypass, 0], "invert": False,
+                                             "control_type": "跳过节点"}, 2, 2)
+    builder.add("BenchSink", {"value": [switch, 0]}, 2, 3)
+    return builder.prompt, builder.extra_data(), target
+
+
+def check_flow_bypass(server):
+    """开关条件为False时流程屏蔽组不会被执行，提交时不应屏蔽；返回不符的条件列表"""
+    failures = []
+    for condition in (True, False):
+        prompt, extra_data, target = flow_bypass_workflow(condition)
+        json_data = server.trigger_on_prompt({"prompt": prompt, "extra_data": extra_data})
+        if (target not in json_data["prompt"]) != condition:
+            failures.append(condition)
+    return failures
+
+
+# ---- 执行与统计 ----
+
+def summarize(prompt, result):
+    per_class = {}
+    for node_id, us in result["node_us"].items():
+        class_type = prompt[node_id]["class_type"]
+        entry = per_class.setdefault(class_type, {"count": 0, "total_us": 0.0})
+        entry["count"] += 1
+        entry["total_us"] += us
+    for entry in per_class.values():
+        entry["mean_us"] = round(entry["total_us"] / entry["count"], 3)
+        entry["total_us"] = round(entry["total_us"], 1)
+    routing_us = sum(per_class.get(name, {}).get("total_us", 0.0) for name in SWITCH_TYPES)
+    return per_class, routing_us
+
+
+def measure(executor, server, node_count, switch_count, controller_count, runs):
+    prompt, extra_data = generate_workflow(node_count, switch_count, controller_count)
+    switch_count = sum(1 for node in prompt.values() if node["class_type"] in SWITCH_TYPES)
+    totals, prune_times, routing = [], [], []
+    last = None
+    for _ in range(runs):
+        json_data = {"prompt": json.loads(json.dumps(prompt)), "extra_data": extra_data}
+        started = time.perf_counter()
+        json_data = server.trigger_on_prompt(json_data)
+        prune_times.append((time.perf_counter() - started) * 1e3)
+
+        run_prompt = json_data["prompt"]
+        result = executor.run(run_prompt, extra_data)
+        per_class, routing_us = summarize(run_prompt, result)
+        totals.append(result["total_ms"])
+        routing.append(routing_us / 1e3)
+        last = (run_prompt, result, per_class)
+
+    run_prompt, result, per_class = last
+    return {
+        "nodes": len(prompt),
+        "switches": switch_count,
+        "controllers": controller_count,
+        "nodes_after_prune": len(run_prompt),
+        "executed": result["executed"],
+        "skipped": result["skipped"],
+        "median_total_ms": round(statistics.median(totals), 3),
+        "median_prune_ms": round(statistics.median(prune_times), 3),
+        "median_routing_ms": round(statistics.median(routing), 3),
+        "per_class": per_class,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, action="append", help="工作流节点数，可重复（默认 1000/5000/20000/50000）")
+    parser.add_argument("--switches", type=int, default=300, help="开关节点数量")
+    parser.add_argument("--controllers", type=int, default=0, help="后端组控制节点数量")
+    parser.add_argument("--runs", type=int, default=3, help="每种规模的执行次数，取中位数")
+    parser.add_argument("--json", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    server = install_stubs()
+    package = import_package()
+    sys.modules["nodes"].NODE_CLASS_MAPPINGS.update(SYNTHETIC_NODES)
+    executor = MiniExecutor({**package.NODE_CLASS_MAPPINGS, **SYNTHETIC_NODES})
+
+    # 预热：首次提交会导入控制节点模块（及其可选依赖），不计入测量
+    warmup_prompt, warmup_extra = generate_workflow(40, 10, 1)
+    server.trigger_on_prompt({"prompt": warmup_prompt, "extra_data": warmup_extra})
+
+    failures = check_flow_bypass(server)
+    if failures:
+        sys.exit(f"⚠️ 流程屏蔽组的提交时处理不符，开关条件: {failures}")
+
+    results = []
+    for node_count in args.nodes or [1000, 5000, 20000, 50000]:
+        data = measure(executor, server, node_count, args.switches, args.controllers, args.runs)
+        results.append(data)
+        print(f"节点 {data['nodes']:>6}  开关 {data['switches']:>4}  执行 {data['executed']:>6}  "
+              f"跳过 {data['skipped']:>5}  端到端 {data['median_total_ms']:9.2f} ms  "
+              f"路由 {data['median_routing_ms']:8.2f} ms  提交钩子 {data['median_prune_ms']:8.2f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
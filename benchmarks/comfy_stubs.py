@@ -0,0 +1,112 @@
+"""
+离线运行用的 ComfyUI 替身模块
+在没有 ComfyUI 的环境中提供最小的 server / nodes / execution 模块，并以合法包名导入本套件
+"""
+import atexit
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import types
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "ergouzi_kaiguan_bench"
+
+
+class StubPromptQueue:
+    """记录入队的任务元组"""
+    def __init__(self):
+        self.items = []
+
+    def put(self, item):
+        self.items.append(item)
+
+
+class StubPromptServer:
+    """
+    记录 send_sync 推送与 on_prompt 处理函数，不做任何网络操作
+    安装了 aiohttp 时提供 routes（RouteTableDef），可用 make_app() 在本地启动注册的路由
+    prompt_queue 记录入队的任务（number, prompt_id, prompt, extra_data, outputs_to_execute, sensitive）
+    """
+    instance = None
+
+    def __init__(self):
+        self.messages = []
+        self.on_prompt_handlers = []
+        self.prompt_queue = StubPromptQueue()
+        self.number = 0
+        try:
+            from aiohttp import web
+        except ImportError:
+            self.routes = None
+        else:
+            self.routes = web.RouteTableDef()
+
+    @property
+    def queue(self):
+        return self.prompt_queue.items
+
+    def make_app(self):
+        from aiohttp import web
+        app = web.Application()
+        app.add_routes(self.routes)
+        return app
+
+    def send_sync(self, event, data, sid=None):
+        self.messages.append((event, data))
+
+    def add_on_prompt_handler(self, handler):
+        self.on_prompt_handlers.append(handler)
+
+    def trigger_on_prompt(self, json_data):
+        for handler in self.on_prompt_handlers:
+            json_data = handler(json_data)
+        return json_data
+
+
+async def stub_validate_prompt(prompt_id, prompt, partial_execution_targets=None):
+    """不做校验：所有输出节点都要执行"""
+    nodes = sys.modules["nodes"]
+    outputs = [node_id for node_id, node in prompt.items()
+               if getattr(nodes.NODE_CLASS_MAPPINGS.get(node.get("class_type")), "OUTPUT_NODE", False)]
+    return True, None, outputs, {}
+
+
+def install_stubs():
+    """在 sys.modules 中登记 server / nodes / execution 替身，返回 PromptServer 实例"""
+    server = types.ModuleType("server")
+    server.PromptServer = StubPromptServer
+    StubPromptServer.instance = StubPromptServer()
+    sys.modules["server"] = server
+
+    nodes = types.ModuleType("nodes")
+    nodes.NODE_CLASS_MAPPINGS = {}
+    nodes.NODE_DISPLAY_NAME_MAPPINGS = {}
+    sys.modules["nodes"] = nodes
+
+    execution = types.ModuleType("execution")
+    execution.validate_prompt = stub_validate_prompt
+    execution.SENSITIVE_EXTRA_DATA_KEYS = ("auth_token_comfy_org", "api_key_comfy_org")
+    sys.modules["execution"] = execution
+    return StubPromptServer.instance
+
+
+def import_package():
+    """
+    仓库目录名可能包含连字符，通过临时目录中的符号链接以合法的包名导入
+    返回导入后的包模块
+    """
+    if PACKAGE_NAME in sys.modules:
+        return sys.modules[PACKAGE_NAME]
+    parent_dir = tempfile.mkdtemp(prefix="kaiguan_bench_")
+    atexit.register(shutil.rmtree, parent_dir, True)
+    os.symlink(REPO_DIR, os.path.join(parent_dir, PACKAGE_NAME))
+    sys.path.insert(0, parent_dir)
+    package = importlib.import_module(PACKAGE_NAME)
+    # 套件中的节点登记到 nodes 替身，供依赖 nodes.NODE_CLASS_MAPPINGS 的逻辑使用
+    nodes = sys.modules.get("nodes")
+    if nodes is not None:
+        nodes.NODE_CLASS_MAPPINGS.update(package.NODE_CLASS_MAPPINGS)
+        nodes.NODE_DISPLAY_NAME_MAPPINGS.update(package.NODE_DISPLAY_NAME_MAPPINGS)
+    return package
@@ -0,0 +1,181 @@
+"""
+进程内的迷你执行器：按 ComfyUI 的规则执行 API 格式的提示词，用于离线测量路由开销
+- 只执行输出节点（OUTPUT_NODE）依赖的节点
+- 支持 lazy 输入与 check_lazy_status，未请求的分支不会执行
+- 支持隐藏输入 PROMPT / UNIQUE_ID / EXTRA_PNGINFO
+- 支持列表执行：INPUT_IS_LIST 的节点一次收到整个列表，普通节点对列表输入逐个元素调用，
+  OUTPUT_IS_LIST 的输出展开为列表（与 ComfyUI 一样，节点输出在内部都以列表保存）
+- 执行前与 ComfyUI 计算缓存键时一样，对提示词中所有定义了 IS_CHANGED 的节点调用一次
+  （PROMPT 为空字典，连线输入为 None）
+- 不做缓存与校验，每次 run 都是一次完整的冷执行
+"""
+import time
+
+
+def _is_link(value):
+    return isinstance(value, list) and len(value) == 2 and isinstance(value[0], str) and isinstance(value[1], int)
+
+
+class NodeSpec:
+    """节点类的输入声明（按类缓存）"""
+    __slots__ = ("lazy", "hidden")
+
+    def __init__(self, node_class):
+        declared = node_class.INPUT_TYPES()
+        self.lazy = set()
+        for section in ("required", "optional"):
+            for name, spec in (declared.get(section) or {}).items():
+                if isinstance(spec, (list, tuple)) and len(spec) > 1 and isinstance(spec[1], dict) \
+                        and spec[1].get("lazy"):
+                    self.lazy.add(name)
+        self.hidden = dict(declared.get("hidden") or {})
+
+
+class MiniExecutor:
+    def __init__(self, node_class_mappings):
+        self.node_class_mappings = node_class_mappings
+        self._specs = {}
+
+    def _spec(self, class_type):
+        spec = self._specs.get(class_type)
+        if spec is None:
+            spec = self._specs[class_type] = NodeSpec(self.node_class_mappings[class_type])
+        return spec
+
+    def run(self, prompt, extra_data=None):
+        """
+        执行提示词，返回执行报告：
+        total_ms（端到端）、executed（已执行节点数）、skipped（未执行节点数）、
+        node_us（节点id -> 耗时微秒）、outputs（节点id -> 各输出的值列表组成的元组）、
+        is_changed（节点id -> IS_CHANGED 的返回值）
+        """
+        extra_pnginfo = (extra_data or {}).get("extra_pnginfo")
+        started = time.perf_counter()
+        is_changed = self._is_changed(prompt, extra_pnginfo)
+
+        instances = {}
+        outputs = {}
+        node_us = {}
+        output_nodes = [
+            node_id for node_id, node in prompt.items()
+            if getattr(self.node_class_mappings[node["class_type"]], "OUTPUT_NODE", False)
+        ]
+
+        for output_id in output_nodes:
+            stack = [output_id]
+            while stack:
+                node_id = stack[-1]
+                if node_id in outputs:
+                    stack.pop()
+                    continue
+                node = prompt[node_id]
+                class_type = node["class_type"]
+                spec = self._spec(class_type)
+                inputs = node.get("inputs") or {}
+
+                # 非惰性输入必须先计算
+                pending = [
+                    value[0] for name, value in inputs.items()
+                    if _is_link(value) and name not in spec.lazy and value[0] not in outputs and value[0] in prompt
+                ]
+                if pending:
+                    stack.extend(pending)
+                    continue
+
+                node_class = self.node_class_mappings[class_type]
+                instance = instances.get(node_id)
+                if instance is None:
+                    instance = instances[node_id] = node_class()
+                kwargs = self._build_kwargs(node_id, inputs, spec, outputs, prompt, extra_pnginfo)
+
+                # 惰性输入：按 check_lazy_status 的请求逐步计算
+                if spec.lazy and hasattr(instance, "check_lazy_status"):
+                    requested = [
+                        inputs[name][0] for name in self._lazy_requests(node_class, instance, kwargs)
+                        if _is_link(inputs.get(name)) and inputs[name][0] not in outputs and inputs[name][0] in prompt
+                    ]
+                    if requested:
+                        stack.extend(requested)
+                        continue
+
+                function = getattr(instance, node_class.FUNCTION)
+                call_started = time.perf_counter()
+                outputs[node_id] = self._call(node_class, function, kwargs)
+                node_us[node_id] = (time.perf_counter() - call_started) * 1e6
+                stack.pop()
+
+        total_ms = (time.perf_counter() - started) * 1e3
+        return {
+            "total_ms": total_ms,
+            "executed": len(outputs),
+            "skipped": len(prompt) - len(outputs),
+            "node_us": node_us,
+            "outputs": outputs,
+            "is_changed": is_changed,
+        }
+
+    def _is_changed(self, prompt, extra_pnginfo):
+        results = {}
+        for node_id, node in prompt.items():
+            node_class = self.node_class_mappings[node["class_type"]]
+            method = getattr(node_class, "IS_CHANGED", None)
+            if method is None:
+                continue
+            kwargs = self._build_kwargs(node_id, node.get("inputs") or {}, self._spec(node["class_type"]), {}, {},
+                                        extra_pnginfo)
+            values = [method(**call) for call in self._split_calls(node_class, kwargs)]
+            results[node_id] = values[0] if len(values) == 1 else values
+        return results
+
+    def _build_kwargs(self, node_id, inputs, spec, outputs, prompt, extra_pnginfo):
+        """与 ComfyUI 的 get_input_data 相同，每个输入都是值的列表"""
+        kwargs = {}
+        for name, value in inputs.items():
+            if _is_link(value):
+                source = outputs.get(value[0])
+                # 未计算的惰性输入与 ComfyUI 一样以 (None,) 传入
+                kwargs[name] = source[value[1]] if source is not None and value[1] < len(source) else (None,)
+            else:
+                kwargs[name] = [value]
+        for name, kind in spec.hidden.items():
+            if kind == "PROMPT":
+                kwargs[name] = [prompt]
+            elif kind == "UNIQUE_ID":
+                kwargs[name] = [node_id]
+            elif kind == "EXTRA_PNGINFO":
+                kwargs[name] = [extra_pnginfo]
+        return kwargs
+
+    @staticmethod
+    def _split_calls(node_class, kwargs):
+        """INPUT_IS_LIST 的节点调用一次，普通节点按最长的输入逐个元素调用（较短的输入重复最后一个值）"""
+        if getattr(node_class, "INPUT_IS_LIST", False):
+            return [kwargs]
+        length = max((len(values) for values in kwargs.values()), default=1)
+        return [{name: values[min(i, len(values) - 1)] for name, values in kwargs.items()}
+                for i in range(length)]
+
+    def _lazy_requests(self, node_class, instance, kwargs):
+        requested = []
+        for call in self._split_calls(node_class, kwargs):
+            for name in instance.check_lazy_status(**call) or ():
+                if name not in requested:
+                    requested.append(name)
+        return requested
+
+    def _call(self, node_class, function, kwargs):
+        """按 ComfyUI 的列表规则调用节点，返回各输出的值列表"""
+        calls = self._split_calls(node_class, kwargs)
+        output_is_list = getattr(node_class, "OUTPUT_IS_LIST", None) or ()
+        results = None
+        for call in calls:
+            result = function(**call)
+            result = tuple(result) if result is not None else ()
+            if results is None:
+                results = tuple([] for _ in result)
+            for slot, value in enumerate(result):
+                if slot < len(output_is_list) and output_is_list[slot]:
+                    results[slot].extend(value)
+                else:
+                    results[slot].append(value)
+        return results or ()
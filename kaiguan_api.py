@@ -0,0 +1,301 @@
+"""
+批量提交接口：外部调度方一次提交多个提示词，每个提示词附带 {组名: 动作} 的组覆盖设置，无需经过浏览器
+POST /kaiguan/prompts
+    {
+        "prompt": {...},            共用的API格式提示词（任务中也可以单独给出 "prompt"）
+        "extra_data": {...},        共用的 extra_data，需包含 extra_pnginfo.workflow（组的范围）
+        "client_id": "...",         可选
+        "jobs": [
+            {"groups": {"人像": "enable", "放大": "bypass", "预览": "disable"}},
+            {"groups": {"*": "disable", "人像": "enable"}, "front": true},
+            ...
+        ]
+    }
+- 动作可写 enable / disable / bypass，也可写 启用组 / 禁用组 / 屏蔽组；组名 "*" 表示所有组，后写的组覆盖先写的
+- 覆盖设置随 extra_data 提交，由提交钩子（kaiguan_prune.on_prompt）在所有控制节点之后应用
+- 任务在进程内按 ComfyUI /prompt 接口的步骤入队（提交钩子 -> validate_prompt -> prompt_queue.put），
+  校验与排队规则与普通提交一致，但不经过本机 HTTP 往返
+返回每个任务的 prompt_id / number，或错误信息
+
+POST /kaiguan/sweep
+    {
+        "prompt": {...}, "extra_data": {...}, "client_id": "...",
+        "axes": [
+            {"node": "12", "input": "condition", "values": [true, false]},
+            {"node": "7", "input": "comparison_value", "values": ["3", "5", "8"]},
+            {"group": "放大", "values": ["enable", "bypass"]}
+        ],
+        "dry_run": false
+    }
+- 按轴的笛卡尔积展开，剪枝后等效的组合只提交一次（见 kaiguan_sweep）
+- 返回 jobs（实际提交的任务）与 combinations（每个组合对应的任务下标及其 prompt_id）
+- dry_run 为 true 时只展开与去重，不提交
+"""
+import asyncio
+import inspect
+import pickle
+import time
+import uuid
+
+from .kaiguan_log import logger
+from .kaiguan_prune import (BACKEND_PRUNE, OVERRIDES_KEY, _comfy_node_types, _controller_classes,
+                            override_actions, unknown_groups)
+from .kaiguan_sweep import expand_sweep
+
+PROMPTS_ROUTE = "/kaiguan/prompts"
+SWEEP_ROUTE = "/kaiguan/sweep"
+
+# 单次请求的任务数上限
+MAX_JOBS = 1000
+
+# 原样转交给 /prompt 的任务字段
+PASSTHROUGH_KEYS = ("client_id", "front", "number", "prompt_id", "partial_execution_targets")
+
+
+class JobError(ValueError):
+    """任务内容无效"""
+
+
+def build_job_payload(body, job):
+    """生成单个任务提交给 /prompt 的请求体；内容无效时抛出 JobError"""
+    if not isinstance(job, dict):
+        raise JobError("任务必须是对象")
+    prompt = job.get("prompt", body.get("prompt"))
+    if not isinstance(prompt, dict) or not prompt:
+        raise JobError("缺少 prompt")
+    overrides = job.get("groups") or {}
+    if not isinstance(overrides, dict):
+        raise JobError("groups 必须是 {组名: 动作} 对象")
+    try:
+        override_actions(overrides)
+    except ValueError as e:
+        raise JobError(str(e)) from None
+
+    extra_data = dict(body.get("extra_data") or {})
+    extra_data.update(job.get("extra_data") or {})
+    if overrides:
+        extra_data[OVERRIDES_KEY] = overrides
+
+    payload = {"prompt": prompt, "extra_data": extra_data}
+    for key in PASSTHROUGH_KEYS:
+        if key in job:
+            payload[key] = job[key]
+        elif key == "client_id" and key in body:
+            payload[key] = body[key]
+    return payload
+
+
+def _job_warnings(payload):
+    overrides = payload["extra_data"].get(OVERRIDES_KEY)
+    if not overrides:
+        return None
+    workflow = (payload["extra_data"].get("extra_pnginfo") or {}).get("workflow")
+    if not workflow:
+        return "extra_data 中没有 extra_pnginfo.workflow，组覆盖设置不会生效"
+    missing = unknown_groups(workflow, overrides)
+    if missing:
+        return f"工作流中没有这些组: {', '.join(missing)}"
+    return None
+
+
+async def submit_jobs(body, submit):
+    """
+    逐个提交任务，返回每个任务的结果列表
+    submit(payload) -> (HTTP状态码, 响应JSON)，通常为 prompt_submitter 的进程内入队
+    """
+    results = []
+    for index, job in enumerate(body.get("jobs") or ()):
+        result = {"index": index}
+        try:
+            payload = build_job_payload(body, job)
+        except JobError as e:
+            result["error"] = str(e)
+            results.append(result)
+            continue
+
+        warning = _job_warnings(payload)
+        if warning:
+            result["warning"] = warning
+        try:
+            status, data = await submit(payload)
+        except Exception as e:
+            logger.warning("🛰️ 任务 %d 提交失败: %s", index, e)
+            result["error"] = f"提交失败: {e}"
+            results.append(result)
+            continue
+
+        data = data if isinstance(data, dict) else {}
+        if status == 200:
+            result.update({key: data[key] for key in ("prompt_id", "number", "node_errors") if key in data})
+        else:
+            result["error"] = data.get("error") or f"HTTP {status}"
+            if data.get("node_errors"):
+                result["node_errors"] = data["node_errors"]
+        results.append(result)
+    return results
+
+
+async def submit_sweep(body, submit, node_types=None):
+    """
+    展开组合并提交去重后的任务，返回响应内容；轴定义无效时抛出 ValueError
+    重复的组合共用对应任务的 prompt_id，结果从同一个任务的输出中读取
+    """
+    prompt = body.get("prompt")
+    if not isinstance(prompt, dict) or not prompt:
+        raise ValueError("缺少 prompt")
+    axes = body.get("axes")
+    if not isinstance(axes, list) or not axes:
+        raise ValueError("缺少 axes 列表")
+    workflow = ((body.get("extra_data") or {}).get("extra_pnginfo") or {}).get("workflow")
+
+    loop = asyncio.get_running_loop()
+    unique, combinations = await loop.run_in_executor(
+        None, expand_sweep, prompt, workflow, axes, _controller_classes(),
+        _comfy_node_types() if node_types is None else node_types)
+
+    jobs = [{key: entry[key] for key in ("settings", "graph_hash", "reused_nodes", "duplicates")}
+            for entry in unique]
+    if not body.get("dry_run"):
+        submitted = await submit_jobs(
+            dict(body, jobs=[{"prompt": entry["prompt"], "groups": entry["groups"]} for entry in unique]), submit)
+        for job, result in zip(jobs, submitted):
+            job.update({key: value for key, value in result.items() if key != "index"})
+    for combination in combinations:
+        job = jobs[combination["job"]]
+        if "prompt_id" in job:
+            combination["prompt_id"] = job["prompt_id"]
+
+    failed = sum(1 for job in jobs if "error" in job)
+    return {
+        "combinations": len(combinations),
+        "unique": len(jobs),
+        "queued": 0 if body.get("dry_run") else len(jobs) - failed,
+        "failed": failed,
+        "jobs": jobs,
+        "results": combinations,
+    }
+
+
+async def _validate_prompt(execution, prompt_id, prompt, partial_execution_targets):
+    """调用 execution.validate_prompt，兼容不同 ComfyUI 版本的参数与同步/异步实现"""
+    parameters = inspect.signature(execution.validate_prompt).parameters
+    if len(parameters) >= 3:
+        valid = execution.validate_prompt(prompt_id, prompt, partial_execution_targets)
+    elif len(parameters) == 2:
+        valid = execution.validate_prompt(prompt_id, prompt)
+    else:
+        valid = execution.validate_prompt(prompt)
+    if inspect.isawaitable(valid):
+        valid = await valid
+    return valid
+
+
+async def enqueue_prompt(server, execution, json_data):
+    """
+    与 ComfyUI 的 POST /prompt 相同的入队步骤，返回 (HTTP状态码, 响应JSON)
+    提交钩子 -> 分配序号 -> validate_prompt -> prompt_queue.put
+    """
+    json_data = server.trigger_on_prompt(json_data)
+    if "number" in json_data:
+        number = float(json_data["number"])
+    else:
+        number = server.number
+        if json_data.get("front"):
+            number = -number
+        server.number += 1
+
+    prompt = json_data.get("prompt")
+    if not isinstance(prompt, dict):
+        return 400, {"error": {"type": "no_prompt", "message": "No prompt provided", "details": "No prompt provided",
+                               "extra_info": {}}, "node_errors": {}}
+    prompt_id = str(json_data.get("prompt_id") or uuid.uuid4())
+    valid = await _validate_prompt(execution, prompt_id, prompt, json_data.get("partial_execution_targets"))
+    extra_data = json_data.get("extra_data") or {}
+    if "client_id" in json_data:
+        extra_data["client_id"] = json_data["client_id"]
+    if not valid[0]:
+        logger.warning("🛰️ 任务校验未通过: %s", valid[1])
+        return 400, {"error": valid[1], "node_errors": valid[3]}
+
+    outputs_to_execute = valid[2]
+    sensitive_keys = getattr(execution, "SENSITIVE_EXTRA_DATA_KEYS", None)
+    extra_data["create_time"] = int(time.time() * 1000)
+    if sensitive_keys is None:
+        server.prompt_queue.put((number, prompt_id, prompt, extra_data, outputs_to_execute))
+    else:
+        sensitive = {key: extra_data.pop(key) for key in sensitive_keys if key in extra_data}
+        server.prompt_queue.put((number, prompt_id, prompt, extra_data, outputs_to_execute, sensitive))
+    return 200, {"prompt_id": prompt_id, "number": number, "node_errors": valid[3]}
+
+
+def prompt_submitter(server, execution=None):
+    """在进程内按 /prompt 的步骤入队（与前端、API 提交走同一套钩子、校验与队列）"""
+    if execution is None:
+        import execution
+
+    async def submit(payload):
+        # 任务之间共用同一个 prompt / extra_data，而提交钩子与执行（如 EGSEED 写回种子）会原地修改它们，
+        # 因此与 /prompt 解析请求体一样，每个任务使用独立的副本（pickle 往返比 JSON 往返快约2倍）
+        return await enqueue_prompt(server, execution, pickle.loads(pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)))
+    return submit
+
+
+def add_api_routes(routes, server):
+    """在 aiohttp 的 RouteTableDef 上注册批量提交与组合展开路由；server 为 PromptServer 实例"""
+    from aiohttp import web
+
+    @routes.post(PROMPTS_ROUTE)
+    async def kaiguan_prompts(request):
+        if not BACKEND_PRUNE:
+            return web.json_response(
+                {"error": "后端组控制已关闭（KAIGUAN_BACKEND_PRUNE=0），组覆盖设置不会生效"}, status=503)
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({"error": "请求体不是有效的JSON"}, status=400)
+        jobs = body.get("jobs") if isinstance(body, dict) else None
+        if not isinstance(jobs, list) or not jobs:
+            return web.json_response({"error": "缺少 jobs 列表"}, status=400)
+        if len(jobs) > MAX_JOBS:
+            return web.json_response({"error": f"单次最多提交 {MAX_JOBS} 个任务"}, status=413)
+
+        results = await submit_jobs(body, prompt_submitter(server))
+        failed = sum(1 for result in results if "error" in result)
+        logger.info("🛰️ 批量提交: 入队 %d 个任务, 失败 %d 个", len(results) - failed, failed)
+        return web.json_response({"queued": len(results) - failed, "failed": failed, "results": results})
+
+    @routes.post(SWEEP_ROUTE)
+    async def kaiguan_sweep(request):
+        if not BACKEND_PRUNE:
+            return web.json_response(
+                {"error": "后端组控制已关闭（KAIGUAN_BACKEND_PRUNE=0），组合无法按剪枝结果去重"}, status=503)
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({"error": "请求体不是有效的JSON"}, status=400)
+        if not isinstance(body, dict):
+            return web.json_response({"error": "请求体必须是对象"}, status=400)
+
+        try:
+            response = await submit_sweep(body, prompt_submitter(server))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        logger.info("🛰️ 组合展开: %d 个组合, 去重后 %d 个, 入队 %d 个",
+                    response["combinations"], response["unique"], response["queued"])
+        return web.json_response(response)
+
+    return kaiguan_prompts
+
+
+def register_api_routes():
+    """在 PromptServer 上注册批量提交与组合展开接口；不在 ComfyUI 环境中运行时跳过"""
+    try:
+        from server import PromptServer
+    except ImportError:
+        return False
+    try:
+        add_api_routes(PromptServer.instance.routes, PromptServer.instance)
+    except Exception as e:
+        logger.warning("🛰️ 批量提交接口注册失败，%s 与 %s 不可用: %s", PROMPTS_ROUTE, SWEEP_ROUTE, e)
+        return False
+    return True
@@ -0,0 +1,258 @@
+"""
+比较引擎：将 (比较类型, 比较值) 一次性编译为谓词函数，供逻辑跳过节点与全局组条件控制节点共用
+- 比较值只在编译时解析一次（整数/浮点数/字符串）
+- 编译结果保存在有界LRU缓存中
+- 通过比较类型查表分发，不再逐个 if/elif 判断
+- 支持对列表、NumPy数组、张量进行批量（逐元素）比较
+"""
+import operator
+from functools import lru_cache
+
+from .kaiguan_core import convert_to_float, convert_to_int
+from .kaiguan_values import LIGHT_KINDS, comparable_text, summarize, value_kind
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+COMPARISON_TYPES = ["等于", "不等于", "大于", "小于", "大于等于", "小于等于", "包含", "不包含"]
+
+# 数值/字符串比较的分发表
+ORDER_OPERATORS = {
+    "等于": operator.eq,
+    "不等于": operator.ne,
+    "大于": operator.gt,
+    "小于": operator.lt,
+    "大于等于": operator.ge,
+    "小于等于": operator.le,
+}
+
+# 包含类比较的分发表（参数顺序：输入字符串, 比较字符串）
+CONTAINS_OPERATORS = {
+    "包含": lambda input_str, comp_str: comp_str in input_str,
+    "不包含": lambda input_str, comp_str: comp_str not in input_str,
+}
+
+COMPILE_CACHE_SIZE = 1024
+
+
+def _parse_input(value):
+    """
+    将输入值解析为 (整数, 浮点数, 字符串)
+    与原先 convert_to_int/convert_to_float(str(value)) 的结果保持一致，
+    但对 int/float 直接走快速路径，字符串表示只在真正需要时才生成
+    """
+    if isinstance(value, str):
+        return convert_to_int(value), convert_to_float(value), value
+    if value is None:
+        return None, None, None
+    value_type = type(value)
+    if value_type is int:
+        try:
+            return value, float(value), None
+        except OverflowError:
+            return value, convert_to_float(str(value)), None
+    if value_type is float:
+        return None, value, None
+    kind = value_kind(value)
+    if kind not in LIGHT_KINDS:
+        # 张量、LATENT、模型等大对象不做 str()，只用摘要参与字符串比较
+        return None, None, summarize(value, kind)
+    value_str = str(value)
+    return convert_to_int(value_str), convert_to_float(value_str), value_str
+
+
+def numeric_value(value):
+    """输入值的数值形式：整数优先，其次浮点数，无法转换时返回None"""
+    input_int, input_float, _ = _parse_input(value)
+    return input_int if input_int is not None else input_float
+
+
+def _as_str(value, value_str):
+    if value_str is not None:
+        return value_str
+    return str(value)
+
+
+class CompiledComparison:
+    """
+    已编译的比较谓词，调用方式：predicate(input_value) -> bool
+    """
+    __slots__ = ("comparison_type", "comparison_value", "comp_int", "comp_float", "_op", "_contains")
+
+    def __init__(self, comparison_type, comparison_value):
+        self.comparison_type = comparison_type
+        self.comparison_value = comparison_value
+        self.comp_int = convert_to_int(comparison_value)
+        self.comp_float = convert_to_float(comparison_value)
+        self._op = ORDER_OPERATORS.get(comparison_type)
+        self._contains = CONTAINS_OPERATORS.get(comparison_type)
+
+    def __call__(self, input_value):
+        if self._contains is not None:
+            input_str = comparable_text(input_value)
+            return self._contains(input_str, self.comparison_value)
+
+        op = self._op
+        if op is None:
+            # 未知比较类型
+            return False
+
+        input_int, input_float, input_str = _parse_input(input_value)
+        if self.comp_int is not None and input_int is not None:
+            return op(input_int, self.comp_int)
+        if self.comp_float is not None and input_float is not None:
+            return op(input_float, self.comp_float)
+        return op(_as_str(input_value, input_str), self.comparison_value)
+
+    def _numeric_operand(self, is_integer):
+        """批量数值比较时使用的比较值，与标量路径的 整数 > 浮点数 优先级一致"""
+        if self.comp_int is not None and is_integer:
+            return self.comp_int
+        return self.comp_float
+
+    def _array_mask(self, values):
+        """NumPy数组逐元素比较，返回与输入同形状的布尔数组"""
+        kind = values.dtype.kind
+        if self._op is not None and kind in "iuf":
+            operand = self._numeric_operand(kind in "iu")
+            if operand is not None:
+                try:
+                    return np.asarray(self._op(values, operand), dtype=bool)
+                except (TypeError, OverflowError):
+                    pass
+        return distinct_mask(self, values)
+
+    def _tensor_mask(self, values):
+        """张量逐元素比较，返回与输入同形状、同设备的布尔张量"""
+        if self._op is not None and values.dtype != torch.bool and not values.is_complex():
+            operand = self._numeric_operand(not values.is_floating_point())
+            if operand is not None:
+                try:
+                    return self._op(values, operand)
+                except (TypeError, RuntimeError, OverflowError):
+                    pass
+        return distinct_mask(self, values)
+
+    def batch(self, values):
+        """
+        批量比较：返回 (布尔掩码, 通过的子集)
+        - 张量/NumPy数组：掩码为与输入同形状的布尔张量/数组，子集为 values[mask]；
+          数值比较直接向量化，其余比较（包含、字符串比较等）对每个不同的元素值只比较一次
+        - 列表/元组：掩码为布尔列表，子集为列表（保持原顺序）
+        """
+        if torch is not None and isinstance(values, torch.Tensor):
+            mask = self._tensor_mask(values)
+            return mask, values[mask]
+        if np is not None and isinstance(values, np.ndarray):
+            mask = self._array_mask(values)
+            return mask, values[mask]
+
+        items = list(values)
+        if np is not None and items and all(type(v) is int or type(v) is float for v in items):
+            try:
+                mask = self._array_mask(np.asarray(items)).tolist()
+            except (TypeError, ValueError, OverflowError):
+                mask = [self(v) for v in items]
+        else:
+            mask = [self(v) for v in items]
+        return mask, [v for v, passed in zip(items, mask) if passed]
+
+    def __repr__(self):
+        return f"CompiledComparison({self.comparison_type!r}, {self.comparison_value!r})"
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _compile_cached(comparison_type, comparison_value):
+    return CompiledComparison(comparison_type, comparison_value)
+
+
+def compile_comparison(comparison_type, comparison_value):
+    """获取 (比较类型, 比较值) 对应的已编译谓词，优先从LRU缓存中取"""
+    try:
+        return _compile_cached(comparison_type, comparison_value)
+    except TypeError:
+        # 比较值不可哈希时不缓存
+        return CompiledComparison(comparison_type, comparison_value)
+
+
+def evaluate_comparison(input_value, comparison_type, comparison_value):
+    """便捷函数：编译（或命中缓存）后立即求值"""
+    return compile_comparison(comparison_type, comparison_value)(input_value)
+
+
+def is_array_value(value):
+    """判断输入是否为NumPy数组或张量"""
+    if np is not None and isinstance(value, np.ndarray):
+        return True
+    return torch is not None and isinstance(value, torch.Tensor)
+
+
+def is_batch_value(value):
+    """判断输入是否应按批量处理（列表、元组、NumPy数组、张量）"""
+    return isinstance(value, (list, tuple)) or is_array_value(value)
+
+
+def evaluate_batch(values, comparison_type, comparison_value):
+    """批量比较便捷函数，返回 (布尔掩码, 通过的子集)"""
+    return compile_comparison(comparison_type, comparison_value).batch(values)
+
+
+def distinct_mask(predicate, values):
+    """
+    对NumPy数组/张量逐元素调用标量谓词，返回与输入同形状（张量同设备）的布尔掩码
+    每个不同的元素值只求值一次，再按位置散回
+    """
+    if torch is not None and isinstance(values, torch.Tensor):
+        try:
+            distinct, inverse = torch.unique(values, return_inverse=True)
+        except RuntimeError:
+            # 复数等不支持去重的类型，逐元素求值
+            flat = [predicate(v) for v in values.flatten().tolist()]
+            return torch.tensor(flat, dtype=torch.bool, device=values.device).reshape(values.shape)
+        table = torch.tensor([predicate(v) for v in distinct.tolist()], dtype=torch.bool, device=values.device)
+        return table[inverse].reshape(values.shape)
+    try:
+        distinct, inverse = np.unique(values, return_inverse=True)
+    except TypeError:
+        # 混合类型的对象数组无法排序去重，逐元素求值
+        return np.array([predicate(v) for v in values.ravel().tolist()], dtype=bool).reshape(values.shape)
+    table = np.array([predicate(v) for v in distinct.tolist()], dtype=bool)
+    return table[inverse].reshape(values.shape)
+
+
+def full_mask(values):
+    """生成与批量输入对应的全True掩码"""
+    if torch is not None and isinstance(values, torch.Tensor):
+        return torch.ones_like(values, dtype=torch.bool)
+    if np is not None and isinstance(values, np.ndarray):
+        return np.ones(values.shape, dtype=bool)
+    return [True] * len(values)
+
+
+def count_passed(mask):
+    """统计掩码中为True的元素个数"""
+    if isinstance(mask, list):
+        return sum(1 for passed in mask if passed)
+    return int(mask.sum())
+
+
+def reduce_mask(mask, mode):
+    """将批量掩码归约为单个布尔值，mode 取 any（任一满足）或 all（全部满足）"""
+    if isinstance(mask, list):
+        return any(mask) if mode == "any" else all(mask)
+    return bool(mask.any()) if mode == "any" else bool(mask.all())
+
+
+def clear_comparison_cache():
+    _compile_cached.cache_clear()
+
+
+def comparison_cache_info():
+    return _compile_cached.cache_info()
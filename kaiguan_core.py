@@ -0,0 +1,71 @@
+"""
+公共基础：各节点模块共用的类型与工具函数
+"""
+import functools
+
+from .kaiguan_empty import is_context_empty, is_empty
+
+
+def get_name(name):
+    return '{}'.format(name)
+
+
+class AnyType(str):
+    def __ne__(self, __value: object) -> bool:
+        return False
+
+
+any_type = AnyType("*")
+
+
+# 兼容旧名称：空值判断统一由 kaiguan_empty 提供
+is_none = is_empty
+
+
+def is_link(value):
+    """API格式prompt中的连线输入：[来源节点id, 输出序号]"""
+    return isinstance(value, list) and len(value) == 2 and isinstance(value[0], str) and isinstance(value[1], int)
+
+
+def convert_to_int(value):
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def convert_to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def convert_to_str(value):
+    return str(value)
+
+
+_INPUT_TYPES_CACHE = {}
+
+
+def cached_input_types(func):
+    """
+    缓存 INPUT_TYPES 的返回结果，/object_info 等重复调用时不再重建字典
+    用法（放在 @classmethod 之下）：
+        @classmethod
+        @cached_input_types
+        def INPUT_TYPES(cls): ...
+    """
+    @functools.wraps(func)
+    def wrapper(cls):
+        key = (cls, func)
+        try:
+            return _INPUT_TYPES_CACHE[key]
+        except KeyError:
+            result = _INPUT_TYPES_CACHE[key] = func(cls)
+            return result
+    return wrapper
+
+
+def clear_input_types_cache():
+    _INPUT_TYPES_CACHE.clear()
@@ -0,0 +1,119 @@
+"""
+空值/真值判断：各开关模块共用的协议，按类型查表分发，不扫描、不复制大对象
+- is_empty: 输入是否"没有内容"（None、空字符串、空批次张量、空LATENT、空CONDITIONING、全空的上下文）
+- is_truthy: 开关类节点的真假判断；数字与布尔按值判断，张量等大对象按"是否有内容"判断，
+  不会对多元素张量调用 bool()（会报错，且GPU张量需要同步）
+新类型可通过 register_emptiness 注册
+张量/数组的判断在第一次遇到未登记的类型时才注册，导入本模块不会导入 torch / numpy
+"""
+import sys
+
+# 精确类型 -> (is_empty, is_truthy)
+_HANDLERS = {}
+
+# 允许子类继承的类型（按注册顺序用 isinstance 匹配，命中后按精确类型缓存）
+_BASE_TYPES = []
+
+
+def register_emptiness(value_type, empty, truthy=None):
+    """
+    注册类型的判断函数；truthy 省略时为"非空即真"
+    子类第一次出现时按 isinstance 匹配到已注册的类型，之后按精确类型直接查表
+    """
+    if truthy is None:
+        def truthy(value):
+            return not empty(value)
+    _HANDLERS[value_type] = (empty, truthy)
+    if value_type not in _BASE_TYPES:
+        _BASE_TYPES.append(value_type)
+    # 之前按 isinstance 缓存的子类可能匹配到新注册的类型，重新匹配
+    for cached in [t for t in _HANDLERS if t not in _BASE_TYPES]:
+        del _HANDLERS[cached]
+
+
+def _never_empty(value):
+    return False
+
+
+def _always_truthy(value):
+    return True
+
+
+# 未注册的对象（模型、VAE等）只要不是None就视为有内容，不调用其 __len__/__bool__
+_OBJECT_HANDLERS = (_never_empty, _always_truthy)
+
+
+_array_types_registered = set()
+
+
+def _register_array_types():
+    """torch / numpy 已被其他模块导入时注册其张量类型（出现张量说明对应的库已导入）"""
+    torch = sys.modules.get("torch")
+    if torch is not None and "torch" not in _array_types_registered:
+        _array_types_registered.add("torch")
+        # numel 由形状计算，不访问数据；零长度批次即为空
+        register_emptiness(torch.Tensor, lambda value: value.numel() == 0)
+    np = sys.modules.get("numpy")
+    if np is not None and "numpy" not in _array_types_registered:
+        _array_types_registered.add("numpy")
+        register_emptiness(np.ndarray, lambda value: value.size == 0)
+        register_emptiness(np.generic, _never_empty, bool)
+
+
+def _handlers_for(value_type):
+    handlers = _HANDLERS.get(value_type)
+    if handlers is not None:
+        return handlers
+    _register_array_types()
+    for base in _BASE_TYPES:
+        if issubclass(value_type, base):
+            handlers = _HANDLERS[base]
+            break
+    else:
+        handlers = _OBJECT_HANDLERS
+    _HANDLERS[value_type] = handlers
+    return handlers
+
+
+def is_empty(value):
+    """输入是否没有内容"""
+    return _handlers_for(type(value))[0](value)
+
+
+def is_truthy(value):
+    """开关判断用的真假值"""
+    return _handlers_for(type(value))[1](value)
+
+
+def is_context_empty(ctx):
+    """上下文（含 model/clip 的字典）中所有值都为None时视为空"""
+    return not ctx or not any(v is not None for v in ctx.values())
+
+
+def _dict_empty(value):
+    if not value:
+        return True
+    # LATENT：看 samples 的批次
+    samples = value.get("samples")
+    if samples is not None:
+        return is_empty(samples)
+    # 上下文
+    if "model" in value and "clip" in value:
+        return is_context_empty(value)
+    return False
+
+
+def _sized_empty(value):
+    return len(value) == 0
+
+
+register_emptiness(type(None), lambda value: True, lambda value: False)
+register_emptiness(bool, _never_empty, bool)
+register_emptiness(int, _never_empty, bool)
+register_emptiness(float, _never_empty, bool)
+register_emptiness(str, _sized_empty)
+register_emptiness(bytes, _sized_empty)
+register_emptiness(dict, _dict_empty)
+# CONDITIONING 为 [[张量, 字典], ...]，只看条目数
+register_emptiness(list, _sized_empty)
+register_emptiness(tuple, _sized_empty)
@@ -0,0 +1,276 @@
+"""
+表达式条件：将 `x >= 3 and 'portrait' in s` 这样的表达式一次性编译为闭包
+- 只接受白名单内的语法节点（比较、布尔运算、算术、常量、白名单函数），其余一律拒绝
+- 编译结果按表达式文本缓存，运行时不调用 eval
+可用变量：
+    x  输入的数值形式（整数优先，其次浮点数，无法转换时为 None）
+    s  输入的字符串形式（大对象为摘要，与"包含"比较一致）
+    v  输入的原始值（str(v) 与 s 相同，大对象为摘要）
+"""
+import ast
+import operator
+from functools import lru_cache
+
+from .kaiguan_compare import distinct_mask, is_array_value, numeric_value
+from .kaiguan_values import comparable_text, summarize
+
+# 比较类型下拉框中的表达式选项，选中后 comparison_value 作为表达式
+EXPRESSION_TYPE = "表达式"
+
+EXPRESSION_CACHE_SIZE = 512
+MAX_EXPRESSION_LENGTH = 2000
+
+VARIABLES = {"x": 0, "s": 1, "v": 2}
+
+
+def _safe(op):
+    """类型不可比较时（如 x 为 None、数字与文本比较）结果为False，而不是报错"""
+    def apply(a, b):
+        try:
+            return op(a, b)
+        except TypeError:
+            return False
+    return apply
+
+
+COMPARE_OPERATORS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Gt: _safe(operator.gt),
+    ast.Lt: _safe(operator.lt),
+    ast.GtE: _safe(operator.ge),
+    ast.LtE: _safe(operator.le),
+    ast.In: _safe(lambda a, b: a in b),
+    ast.NotIn: _safe(lambda a, b: a not in b),
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+}
+
+NUMBER_TYPES = (int, float)
+
+
+def _numeric(op):
+    """算术只作用于数字，避免 'a' * 10**9 这类超大结果"""
+    def apply(a, b):
+        if not isinstance(a, NUMBER_TYPES) or not isinstance(b, NUMBER_TYPES):
+            raise TypeError("算术运算只支持数字")
+        return op(a, b)
+    return apply
+
+
+def _numeric_unary(op):
+    """一元运算（正负号）同样只作用于数字"""
+    def apply(a):
+        if not isinstance(a, NUMBER_TYPES):
+            raise TypeError("算术运算只支持数字")
+        return op(a)
+    return apply
+
+
+def _add(a, b):
+    if isinstance(a, str) and isinstance(b, str):
+        return a + b
+    return _numeric(operator.add)(a, b)
+
+
+BINARY_OPERATORS = {
+    ast.Add: _add,
+    ast.Sub: _numeric(operator.sub),
+    ast.Mult: _numeric(operator.mul),
+    ast.Div: _numeric(operator.truediv),
+    ast.FloorDiv: _numeric(operator.floordiv),
+    ast.Mod: _numeric(operator.mod),
+}
+
+UNARY_OPERATORS = {
+    ast.Not: operator.not_,
+    ast.USub: _numeric_unary(operator.neg),
+    ast.UAdd: _numeric_unary(operator.pos),
+}
+
+FUNCTIONS = {
+    "len": len,
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "int": int,
+    "float": float,
+    # 大对象转为摘要，与变量 s 一致，不对张量等调用 str()
+    "str": comparable_text,
+    "bool": bool,
+    "round": round,
+}
+
+STRING_METHODS = {"startswith", "endswith", "lower", "upper", "strip"}
+
+
+class ExpressionError(ValueError):
+    """表达式包含不支持的语法"""
+
+
+def _compile_node(node):
+    """把一个语法节点编译为 fn(env) 闭包；env 为 (x, s, v)"""
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (str, int, float, bool, type(None))):
+            raise ExpressionError(f"不支持的常量: {node.value!r}")
+        value = node.value
+        return lambda env: value
+
+    if isinstance(node, ast.Name):
+        if node.id not in VARIABLES:
+            raise ExpressionError(f"未知变量: {node.id}（可用变量: x, s, v）")
+        index = VARIABLES[node.id]
+        return lambda env: env[index]
+
+    if isinstance(node, (ast.Tuple, ast.List)):
+        items = [_compile_node(item) for item in node.elts]
+        return lambda env: tuple(item(env) for item in items)
+
+    if isinstance(node, ast.BoolOp):
+        values = [_compile_node(value) for value in node.values]
+        if isinstance(node.op, ast.And):
+            def and_(env):
+                result = True
+                for value in values:
+                    result = value(env)
+                    if not result:
+                        return result
+                return result
+            return and_
+
+        def or_(env):
+            result = False
+            for value in values:
+                result = value(env)
+                if result:
+                    return result
+            return result
+        return or_
+
+    if isinstance(node, ast.UnaryOp):
+        op = UNARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"不支持的运算符: {type(node.op).__name__}")
+        operand = _compile_node(node.operand)
+        if isinstance(node.op, ast.Not):
+            return lambda env: not operand(env)
+        return lambda env: op(operand(env))
+
+    if isinstance(node, ast.BinOp):
+        op = BINARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"不支持的运算符: {type(node.op).__name__}")
+        left = _compile_node(node.left)
+        right = _compile_node(node.right)
+        return lambda env: op(left(env), right(env))
+
+    if isinstance(node, ast.Compare):
+        left = _compile_node(node.left)
+        ops = []
+        for op_node in node.ops:
+            op = COMPARE_OPERATORS.get(type(op_node))
+            if op is None:
+                raise ExpressionError(f"不支持的比较: {type(op_node).__name__}")
+            ops.append(op)
+        comparators = [_compile_node(comparator) for comparator in node.comparators]
+        if len(ops) == 1:
+            op, right = ops[0], comparators[0]
+            return lambda env: op(left(env), right(env))
+        pairs = list(zip(ops, comparators))
+
+        def chained(env):
+            current = left(env)
+            for op, comparator in pairs:
+                following = comparator(env)
+                if not op(current, following):
+                    return False
+                current = following
+            return True
+        return chained
+
+    if isinstance(node, ast.IfExp):
+        test = _compile_node(node.test)
+        body = _compile_node(node.body)
+        orelse = _compile_node(node.orelse)
+        return lambda env: body(env) if test(env) else orelse(env)
+
+    if isinstance(node, ast.Call):
+        if node.keywords:
+            raise ExpressionError("函数调用不支持关键字参数")
+        args = [_compile_node(arg) for arg in node.args]
+        if isinstance(node.func, ast.Name):
+            func = FUNCTIONS.get(node.func.id)
+            if func is None:
+                raise ExpressionError(f"不支持的函数: {node.func.id}")
+            return lambda env: func(*(arg(env) for arg in args))
+        if isinstance(node.func, ast.Attribute) and node.func.attr in STRING_METHODS:
+            receiver = _compile_node(node.func.value)
+            method_name = node.func.attr
+
+            def call_method(env):
+                target = receiver(env)
+                if not isinstance(target, str):
+                    raise TypeError(f"{method_name} 只能用于字符串")
+                return getattr(target, method_name)(*(arg(env) for arg in args))
+            return call_method
+        raise ExpressionError("不支持的函数调用")
+
+    raise ExpressionError(f"不支持的语法: {type(node).__name__}")
+
+
+class CompiledExpression:
+    """
+    已编译的表达式条件，调用方式与 CompiledComparison 相同：predicate(input_value) -> bool
+    """
+    __slots__ = ("text", "_fn", "uses_number", "uses_text")
+
+    def __init__(self, text):
+        if len(text) > MAX_EXPRESSION_LENGTH:
+            raise ExpressionError(f"表达式过长（超过 {MAX_EXPRESSION_LENGTH} 个字符）")
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ExpressionError(f"表达式语法错误: {e.msg}") from None
+        self.text = text
+        self._fn = _compile_node(tree.body)
+        # 只在表达式用到时才计算数值/字符串形式
+        names = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+        self.uses_number = "x" in names
+        self.uses_text = "s" in names
+
+    def __call__(self, input_value):
+        env = (
+            numeric_value(input_value) if self.uses_number else None,
+            comparable_text(input_value) if self.uses_text else None,
+            input_value,
+        )
+        return bool(self._fn(env))
+
+    def batch(self, values):
+        """
+        批量求值：返回 (布尔掩码, 通过的子集)，掩码形式与 CompiledComparison.batch 一致
+        - 一维NumPy数组/张量：同形状布尔数组/张量，每个不同的元素值只求值一次，子集为 values[mask]
+        - 多维数组/张量（图像、潜空间等）不支持，逐像素调用表达式开销过大
+        - 列表/元组：布尔列表与通过元素的列表
+        """
+        if is_array_value(values):
+            if values.ndim > 1:
+                raise ExpressionError(f"表达式不支持多维输入的批量求值: {summarize(values)}")
+            mask = distinct_mask(self, values)
+            return mask, values[mask]
+        items = list(values)
+        mask = [self(item) for item in items]
+        return mask, [item for item, passed in zip(items, mask) if passed]
+
+    def __repr__(self):
+        return f"CompiledExpression({self.text!r})"
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(text):
+    """获取表达式文本对应的已编译条件（LRU缓存）；语法不受支持时抛出 ExpressionError"""
+    return CompiledExpression(text)
+
+
+def clear_expression_cache():
+    compile_expression.cache_clear()
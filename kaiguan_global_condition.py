@@ -1,35 +1,11 @@
-def is_context_empty(ctx):
-    return not ctx or all(v is None for v in ctx.values())
-
-def get_name(name):
-    return '{}'.format(name)
-
-class AnyType(str):
-    def __ne__(self, __value: object) -> bool:
-        return False
-
-any_type = AnyType("*")
-
-def is_none(value):
-    if value is not None:
-        if isinstance(value, dict) and 'model' in value and 'clip' in value:
-            return is_context_empty(value)
-    return value is None
-
-def convert_to_int(value):
-    try:
-        return int(value)
-    except ValueError:
-        return None
-
-def convert_to_float(value):
-    try:
-        return float(value)
-    except ValueError:
-        return None
-
-def convert_to_str(value):
-    return str(value)
+from .kaiguan_core import any_type, cached_input_types, is_link
+from .kaiguan_compare import COMPARISON_TYPES, compile_comparison, is_batch_value, reduce_mask
+from .kaiguan_expr import EXPRESSION_TYPE, compile_expression
+from .kaiguan_groups import parse_group_names
+from .kaiguan_log import logger
+from .kaiguan_rules import compile_rules, describe_actions, merge_actions
+from .kaiguan_state import group_state
+from .kaiguan_values import brief
 
 class GlobalGroupConditionNode:
     """
@@ -37,24 +13,29 @@ class GlobalGroupConditionNode:
     - 支持复杂条件判断
     - 智能控制节点组的启用/禁用/屏蔽状态
     - 可同时控制多个组或所有组
+    - 比较类型选择"表达式"时，比较值按表达式解析，如 x >= 3 and 'portrait' in s
     """
     def __init__(self):
         pass
     
     @classmethod
+    @cached_input_types
     def INPUT_TYPES(cls):
         return {
             "required": {
                 "enable": ("BOOLEAN", {"default": True}),
                 "input_value": (any_type,),
-                "comparison_type": (["等于", "不等于", "大于", "小于", "大于等于", "小于等于", "包含", "不包含"], {"default": "等于"}),
-                "comparison_value": ("STRING", {"default": ""}),
+                "comparison_type": (COMPARISON_TYPES + [EXPRESSION_TYPE], {"default": "等于"}),
+                "comparison_value": ("STRING", {"default": "", "tooltip": "比较值；比较类型为表达式时填写表达式，可用变量 x（数值）、s（文本）、v（原始值）"}),
                 "when_true": (["启用组", "禁用组", "屏蔽组", "不变"], {"default": "启用组"}),
                 "when_false": (["启用组", "禁用组", "屏蔽组", "不变"], {"default": "禁用组"}),
                 "target_groups": ("STRING", {"default": "", "multiline": True, "placeholder": "留空=控制所有组\n多个组名用换行分隔"}),
                 "reverse_condition": ("BOOLEAN", {"default": False}),
             },
-            "optional": {},
+            "optional": {
+                "batch_mode": (["关闭", "任一满足", "全部满足"], {"default": "关闭", "tooltip": "输入为列表/数组/张量时逐元素比较并归约为一个结果"}),
+            },
+            "hidden": {"unique_id": "UNIQUE_ID"},
         }
 
     RETURN_TYPES = (any_type, "BOOLEAN", "STRING", "STRING")
@@ -63,126 +44,89 @@ class GlobalGroupConditionNode:
     CATEGORY = "2🐕kaiguan"
 
     def execute(self, enable, input_value, comparison_type, comparison_value, 
-                when_true, when_false, target_groups, reverse_condition):
+                when_true, when_false, target_groups, reverse_condition, batch_mode="关闭", unique_id=None):
         
         # 如果节点被禁用，直接传递输入
         if not enable:
             return (input_value, False, "节点已禁用", "无")
         
-        # 执行条件判断
-        condition_result = self._evaluate_condition(input_value, comparison_type, comparison_value)
-        
-        # 是否反转条件
-        if reverse_condition:
-            condition_result = not condition_result
-        
-        # 根据条件结果选择动作
-        action = when_true if condition_result else when_false
-        
-        # 解析目标组
-        target_group_list = self._parse_target_groups(target_groups)
+        condition_result, action, target_group_list = self._decide(
+            input_value, comparison_type, comparison_value, when_true, when_false,
+            target_groups, reverse_condition, batch_mode)
         
-        # 执行组控制（这里只是返回控制信息，实际控制在前端JavaScript中完成）
-        control_info = {
-            'action': action,
-            'groups': target_group_list,
-            'condition_result': condition_result
-        }
+        # 记录组控制状态并推送给前端（实际的节点模式切换在前端完成）
+        group_state.publish(unique_id, "GlobalGroupConditionNode", action, target_group_list, condition_result)
         
         # 生成受控组列表描述
         groups_desc = "所有组" if not target_group_list else ", ".join(target_group_list)
         
         # 调试输出
-        print(f"🌐 全局组条件控制: 输入={input_value}, 条件={condition_result}, 动作={action}, 目标={groups_desc}")
+        logger.debug("🌐 全局组条件控制: 输入=%s, 条件=%s, 动作=%s, 目标=%s", brief(input_value), condition_result, action, brief(groups_desc))
         
         return (input_value, condition_result, action, groups_desc)
     
-    def _evaluate_condition(self, input_value, comparison_type, comparison_value):
-        """条件判断核心逻辑"""
-        
-        # 数据类型智能转换
-        if isinstance(input_value, str):
-            input_str = input_value
-            input_int = convert_to_int(input_value)
-            input_float = convert_to_float(input_value)
+    @classmethod
+    def resolve_group_action(cls, inputs):
+        """
+        提交前在后端解析控制动作（API格式的输入字典）
+        返回 (动作, 组列表)；节点被禁用时返回None；判断依赖连线输入时无法提前解析，也返回None
+        """
+        names = ("enable", "input_value", "comparison_type", "comparison_value",
+                 "when_true", "when_false", "target_groups", "reverse_condition", "batch_mode")
+        if "input_value" not in inputs or any(is_link(inputs.get(name)) for name in names):
+            return None
+        if not inputs.get("enable", True):
+            return None
+        _, action, target_group_list = cls()._decide(
+            inputs["input_value"], inputs.get("comparison_type", "等于"), inputs.get("comparison_value", ""),
+            inputs.get("when_true", "启用组"), inputs.get("when_false", "禁用组"), inputs.get("target_groups", ""),
+            inputs.get("reverse_condition", False), inputs.get("batch_mode", "关闭"))
+        return action, target_group_list
+    
+    def _decide(self, input_value, comparison_type, comparison_value, when_true, when_false,
+                target_groups, reverse_condition, batch_mode):
+        """返回 (条件结果, 动作, 目标组列表)"""
+        # 执行条件判断
+        if batch_mode != "关闭" and is_batch_value(input_value):
+            condition_result = self._evaluate_batch_condition(input_value, comparison_type, comparison_value, batch_mode)
         else:
-            input_str = convert_to_str(input_value)
-            input_int = convert_to_int(input_str) if input_value is not None else None
-            input_float = convert_to_float(input_str) if input_value is not None else None
+            condition_result = self._evaluate_condition(input_value, comparison_type, comparison_value)
         
-        # 比较值转换
-        comp_str = comparison_value
-        comp_int = convert_to_int(comparison_value)
-        comp_float = convert_to_float(comparison_value)
+        # 是否反转条件
+        if reverse_condition:
+            condition_result = not condition_result
         
-        # 执行比较操作
+        # 根据条件结果选择动作
+        action = when_true if condition_result else when_false
+        
+        # 解析目标组
+        return condition_result, action, self._parse_target_groups(target_groups)
+    
+    def _compile_predicate(self, comparison_type, comparison_value):
+        if comparison_type == EXPRESSION_TYPE:
+            return compile_expression(comparison_value)
+        return compile_comparison(comparison_type, comparison_value)
+    
+    def _evaluate_condition(self, input_value, comparison_type, comparison_value):
+        """条件判断核心逻辑：使用已编译（并缓存）的比较谓词或表达式"""
         try:
-            if comparison_type == "等于":
-                if comp_int is not None and input_int is not None:
-                    return input_int == comp_int
-                elif comp_float is not None and input_float is not None:
-                    return input_float == comp_float
-                else:
-                    return input_str == comp_str
-            
-            elif comparison_type == "不等于":
-                if comp_int is not None and input_int is not None:
-                    return input_int != comp_int
-                elif comp_float is not None and input_float is not None:
-                    return input_float != comp_float
-                else:
-                    return input_str != comp_str
-            
-            elif comparison_type == "大于":
-                if comp_int is not None and input_int is not None:
-                    return input_int > comp_int
-                elif comp_float is not None and input_float is not None:
-                    return input_float > comp_float
-                else:
-                    return input_str > comp_str
-            
-            elif comparison_type == "小于":
-                if comp_int is not None and input_int is not None:
-                    return input_int < comp_int
-                elif comp_float is not None and input_float is not None:
-                    return input_float < comp_float
-                else:
-                    return input_str < comp_str
-            
-            elif comparison_type == "大于等于":
-                if comp_int is not None and input_int is not None:
-                    return input_int >= comp_int
-                elif comp_float is not None and input_float is not None:
-                    return input_float >= comp_float
-                else:
-                    return input_str >= comp_str
-            
-            elif comparison_type == "小于等于":
-                if comp_int is not None and input_int is not None:
-                    return input_int <= comp_int
-                elif comp_float is not None and input_float is not None:
-                    return input_float <= comp_float
-                else:
-                    return input_str <= comp_str
-            
-            elif comparison_type == "包含":
-                return comp_str in input_str
-            
-            elif comparison_type == "不包含":
-                return comp_str not in input_str
-            
+            return self._compile_predicate(comparison_type, comparison_value)(input_value)
         except Exception as e:
-            print(f"🌐 条件判断错误: {e}")
+            logger.warning("🌐 条件判断错误: %s", e)
+            return False
+    
+    def _evaluate_batch_condition(self, input_value, comparison_type, comparison_value, batch_mode):
+        """批量条件判断：逐元素比较后按任一/全部满足归约"""
+        try:
+            mask, _ = self._compile_predicate(comparison_type, comparison_value).batch(input_value)
+            return reduce_mask(mask, "any" if batch_mode == "任一满足" else "all")
+        except Exception as e:
+            logger.warning("🌐 批量条件判断错误: %s", e)
             return False
-        
-        return False
     
     def _parse_target_groups(self, target_groups):
-        """解析目标组列表"""
-        if not target_groups or not target_groups.strip():
-            return []  # 空列表表示控制所有组
-        
-        return [group.strip() for group in target_groups.split('\n') if group.strip()]
+        """解析目标组列表（空列表表示控制所有组）"""
+        return parse_group_names(target_groups)
 
 
 class SmartGroupSwitchNode:
@@ -194,6 +138,7 @@ class SmartGroupSwitchNode:
         pass
     
     @classmethod
+    @cached_input_types
     def INPUT_TYPES(cls):
         return {
             "required": {
@@ -204,6 +149,7 @@ class SmartGroupSwitchNode:
             "optional": {
                 "dynamic_group_names": (any_type, {"tooltip": "动态输入组名，支持字符串或列表格式"}),
             },
+            "hidden": {"unique_id": "UNIQUE_ID"},
         }
 
     RETURN_TYPES = ("BOOLEAN", "STRING", "STRING")
@@ -211,7 +157,14 @@ class SmartGroupSwitchNode:
     FUNCTION = "execute"
     CATEGORY = "2🐕kaiguan"
 
-    def execute(self, enable_group, switch_mode, group_names, dynamic_group_names=None):
+    # 开关模式 -> 组控制动作
+    ACTION_MAP = {
+        "开启": "启用组",
+        "关闭": "禁用组",
+        "屏蔽": "屏蔽组"
+    }
+
+    def execute(self, enable_group, switch_mode, group_names, dynamic_group_names=None, unique_id=None):
         
         if not enable_group:
             return (False, "节点已禁用", "无")
@@ -220,12 +173,7 @@ class SmartGroupSwitchNode:
         final_groups = self._parse_group_names(group_names, dynamic_group_names)
         
         # 根据模式确定操作
-        action_map = {
-            "开启": "启用组",
-            "关闭": "禁用组", 
-            "屏蔽": "屏蔽组"
-        }
-        action = action_map[switch_mode]
+        action = self.ACTION_MAP[switch_mode]
         
         # 生成组列表描述
         if final_groups:
@@ -237,11 +185,24 @@ class SmartGroupSwitchNode:
         
         result = f"{action}: {groups_desc}"
         
-        print(f"🎯 智能组开关: {result}")
-        print(f"   受控组详情: {groups_list_desc}")
+        group_state.publish(unique_id, "SmartGroupSwitchNode", action, final_groups)
+        
+        logger.debug("🎯 智能组开关: %s", brief(result))
+        logger.debug("   受控组详情: %s", brief(groups_list_desc))
         
         return (enable_group, result, groups_list_desc)
     
+    @classmethod
+    def resolve_group_action(cls, inputs):
+        """提交前在后端解析控制动作，返回 (动作, 组列表)；无法提前解析时返回None"""
+        names = ("enable_group", "switch_mode", "group_names", "dynamic_group_names")
+        if any(is_link(inputs.get(name)) for name in names):
+            return None
+        if not inputs.get("enable_group", True):
+            return None
+        groups = cls()._parse_group_names(inputs.get("group_names", ""), inputs.get("dynamic_group_names"))
+        return cls.ACTION_MAP[inputs.get("switch_mode", "开启")], groups
+    
     def _parse_group_names(self, manual_groups, dynamic_groups):
         """解析组名，支持多种输入格式"""
         
@@ -252,13 +213,13 @@ class SmartGroupSwitchNode:
             dynamic_parsed = self._parse_dynamic_input(dynamic_groups)
             if dynamic_parsed:
                 final_groups.extend(dynamic_parsed)
-                print(f"🎯 使用动态组名: {dynamic_parsed}")
+                logger.debug("🎯 使用动态组名: %s", brief(dynamic_parsed))
         
         # 2. 如果没有动态输入，使用手动输入
         if not final_groups and manual_groups and manual_groups.strip():
-            manual_parsed = [g.strip() for g in manual_groups.split('\n') if g.strip()]
+            manual_parsed = parse_group_names(manual_groups)
             final_groups.extend(manual_parsed)
-            print(f"🎯 使用手动组名: {manual_parsed}")
+            logger.debug("🎯 使用手动组名: %s", brief(manual_parsed))
         
         return final_groups
     
@@ -269,31 +230,10 @@ class SmartGroupSwitchNode:
             return []
         
         try:
-            # 1. 如果是列表格式
-            if isinstance(dynamic_input, (list, tuple)):
-                return [str(item).strip() for item in dynamic_input if str(item).strip()]
-            
-            # 2. 如果是字符串格式
-            elif isinstance(dynamic_input, str):
-                if dynamic_input.strip():
-                    # 支持多种分隔符：换行、逗号、分号
-                    if '\n' in dynamic_input:
-                        return [g.strip() for g in dynamic_input.split('\n') if g.strip()]
-                    elif ',' in dynamic_input:
-                        return [g.strip() for g in dynamic_input.split(',') if g.strip()]
-                    elif ';' in dynamic_input:
-                        return [g.strip() for g in dynamic_input.split(';') if g.strip()]
-                    else:
-                        return [dynamic_input.strip()]
-            
-            # 3. 其他类型转字符串处理
-            else:
-                str_input = str(dynamic_input).strip()
-                if str_input:
-                    return [str_input]
-        
+            # 支持列表、字符串（换行/逗号/分号/竖线/空格分隔）以及其他类型
+            return parse_group_names(dynamic_input)
         except Exception as e:
-            print(f"🎯 动态组名解析错误: {e}")
+            logger.warning("🎯 动态组名解析错误: %s", e)
         
         return []
 
@@ -306,6 +246,7 @@ class AdvancedGroupSwitchNode:
         pass
     
     @classmethod
+    @cached_input_types
     def INPUT_TYPES(cls):
         return {
             "required": {
@@ -319,6 +260,7 @@ class AdvancedGroupSwitchNode:
                 "disable_action": (["启用", "禁用", "屏蔽"], {"default": "禁用"}),
                 "apply_enable": ("BOOLEAN", {"default": True}),
             },
+            "hidden": {"unique_id": "UNIQUE_ID"},
         }
 
     RETURN_TYPES = ("STRING", "STRING", "BOOLEAN")
@@ -327,11 +269,45 @@ class AdvancedGroupSwitchNode:
     CATEGORY = "2🐕kaiguan"
 
     def execute(self, enable, control_mode, group_name="", group_list=None, 
-                enable_action="启用", disable_action="禁用", apply_enable=True):
+                enable_action="启用", disable_action="禁用", apply_enable=True, unique_id=None):
         
         if not enable:
             return ("节点已禁用", "无", False)
         
+        action, target_groups = self._decide(control_mode, group_name, group_list,
+                                             enable_action, disable_action, apply_enable)
+        
+        # 生成结果描述
+        if target_groups:
+            groups_desc = ", ".join(target_groups)
+            result = f"{action}: {groups_desc}"
+        else:
+            groups_desc = "所有组"
+            result = f"{action}: 所有组"
+        
+        group_state.publish(unique_id, "AdvancedGroupSwitchNode", action, target_groups)
+        
+        logger.debug("🔧 高级组开关: %s", brief(result))
+        
+        return (result, groups_desc, True)
+    
+    @classmethod
+    def resolve_group_action(cls, inputs):
+        """提交前在后端解析控制动作，返回 (动作, 组列表)；无法提前解析时返回None"""
+        control_mode = inputs.get("control_mode", "单组控制")
+        names = ["enable", "control_mode", "group_name", "enable_action", "disable_action", "apply_enable"]
+        if control_mode == "多组控制":
+            names.append("group_list")
+        if any(is_link(inputs.get(name)) for name in names):
+            return None
+        if not inputs.get("enable", True):
+            return None
+        return cls()._decide(control_mode, inputs.get("group_name", ""), inputs.get("group_list"),
+                             inputs.get("enable_action", "启用"), inputs.get("disable_action", "禁用"),
+                             inputs.get("apply_enable", True))
+    
+    def _decide(self, control_mode, group_name, group_list, enable_action, disable_action, apply_enable):
+        """返回 (动作, 目标组列表)"""
         # 根据控制模式确定目标组
         target_groups = []
         
@@ -345,18 +321,7 @@ class AdvancedGroupSwitchNode:
         
         # 确定执行的动作
         action = f"{enable_action}组" if apply_enable else f"{disable_action}组"
-        
-        # 生成结果描述
-        if target_groups:
-            groups_desc = ", ".join(target_groups)
-            result = f"{action}: {groups_desc}"
-        else:
-            groups_desc = "所有组"
-            result = f"{action}: 所有组"
-        
-        print(f"🔧 高级组开关: {result}")
-        
-        return (result, groups_desc, True)
+        return action, target_groups
     
     def _parse_group_list(self, group_list):
         """解析组列表"""
@@ -364,21 +329,73 @@ class AdvancedGroupSwitchNode:
             return []
         
         try:
-            if isinstance(group_list, (list, tuple)):
-                return [str(item).strip() for item in group_list if str(item).strip()]
-            elif isinstance(group_list, str):
-                if ',' in group_list:
-                    return [g.strip() for g in group_list.split(',') if g.strip()]
-                elif '\n' in group_list:
-                    return [g.strip() for g in group_list.split('\n') if g.strip()]
-                else:
-                    return [group_list.strip()] if group_list.strip() else []
-        except:
+            return parse_group_names(group_list)
+        except Exception:
             pass
         
         return []
 
 
+class GroupRuleTableNode:
+    """
+    组规则表节点：一个节点承载多条 条件 => 动作 : 组 规则，替代串联的多个条件控制节点
+    - 等值规则哈希查找，区间规则二分查找，规则再多也只需一次执行
+    - 命中的规则合并为一组动作后统一推送
+    """
+    def __init__(self):
+        pass
+    
+    @classmethod
+    @cached_input_types
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "enable": ("BOOLEAN", {"default": True}),
+                "input_value": (any_type,),
+                "rules": ("STRING", {"default": "", "multiline": True, "placeholder": "每行一条规则：条件 => 动作 : 组名\nportrait => 启用组 : 人像, 高清\n[512, 1024) => 屏蔽组 : 放大\n>= 2048 => 禁用组 : 预览\n* => 不变"}),
+            },
+            "hidden": {"unique_id": "UNIQUE_ID"},
+        }
+
+    RETURN_TYPES = (any_type, "INT", "STRING")
+    RETURN_NAMES = ("输出", "命中规则数", "执行动作")
+    FUNCTION = "execute"
+    CATEGORY = "2🐕kaiguan"
+
+    def execute(self, enable, input_value, rules, unique_id=None):
+        if not enable:
+            return (input_value, 0, "节点已禁用")
+        
+        matched, merged = self._match(input_value, rules)
+        
+        # 全部动作放在同一条消息里推送，前端在同一帧内按顺序应用
+        if merged:
+            group_state.publish_actions(unique_id, "GroupRuleTableNode", merged, bool(matched))
+        
+        summary = describe_actions(merged)
+        logger.debug("🌐 组规则表: 输入=%s, 命中=%d, 动作=%s", brief(input_value), len(matched), summary)
+        return (input_value, len(matched), summary)
+    
+    @classmethod
+    def resolve_group_action(cls, inputs):
+        """提交前在后端解析控制动作，返回按应用顺序排列的 [(动作, 组列表)]；无法提前解析时返回None"""
+        if "input_value" not in inputs or any(is_link(inputs.get(name)) for name in ("enable", "input_value", "rules")):
+            return None
+        if not inputs.get("enable", True):
+            return None
+        _, merged = cls()._match(inputs["input_value"], inputs.get("rules", ""))
+        return merged
+    
+    def _match(self, input_value, rules):
+        """返回 (命中规则列表, 合并后的动作列表)；规则有误时记录警告并视为未命中"""
+        try:
+            matched = compile_rules(rules).match(input_value)
+        except Exception as e:
+            logger.warning("🌐 规则表错误: %s", e)
+            return [], []
+        return matched, merge_actions(matched)
+
+
 class FlowBypassGroupNode:
     """
     流程屏蔽组节点：接收流程输入，屏蔽指定的组
@@ -388,6 +405,7 @@ class FlowBypassGroupNode:
         pass
     
     @classmethod
+    @cached_input_types
     def INPUT_TYPES(cls):
         return {
             "required": {
@@ -395,14 +413,17 @@ class FlowBypassGroupNode:
                 "groups_to_bypass": ("STRING", {"multiline": True, "placeholder": "要屏蔽的组名，支持多种分割方式：\n• 换行：组1\\n组2\n• 逗号：组1,组2\n• 分号：组1;组2\n• 竖线：组1|组2\n• 空格：组1 组2\n• 混合：自动识别"}),
             },
             "optional": {},
+            "hidden": {"unique_id": "UNIQUE_ID"},
         }
 
     RETURN_TYPES = (any_type,)
     RETURN_NAMES = ("输出",)
     FUNCTION = "execute"
     CATEGORY = "2🐕kaiguan"
+    # 屏蔽只在流程经过本节点时生效：提交时只解析一定会被执行的节点（见 kaiguan_prune.resolve_actions）
+    FLOW_GATED = True
 
-    def execute(self, flow_input, groups_to_bypass):
+    def execute(self, flow_input, groups_to_bypass, unique_id=None):
         """
         核心功能：屏蔽指定组，然后传递流程数据
         """
@@ -412,112 +433,54 @@ class FlowBypassGroupNode:
         
         # 输出调试信息
         if groups_list:
-            print(f"🚫 流程屏蔽组: {', '.join(groups_list)}")
-            print(f"   共屏蔽 {len(groups_list)} 个组")
+            logger.debug("🚫 流程屏蔽组: %s", brief(groups_list))
+            logger.debug("   共屏蔽 %d 个组", len(groups_list))
             
             # 在后端直接执行屏蔽逻辑
-            self._execute_bypass_in_backend(groups_list)
+            self._execute_bypass_in_backend(groups_list, unique_id)
         else:
-            print("🚫 流程屏蔽组: 未指定组名，跳过屏蔽")
+            logger.debug("🚫 流程屏蔽组: 未指定组名，跳过屏蔽")
         
         # 直接传递流程输入到输出
         return (flow_input,)
     
-    def _execute_bypass_in_backend(self, groups_list):
+    @classmethod
+    def resolve_group_action(cls, inputs):
+        """提交前在后端解析控制动作，返回 (动作, 组列表)；未指定组名或无法提前解析时返回None"""
+        groups_to_bypass = inputs.get("groups_to_bypass", "")
+        if is_link(groups_to_bypass):
+            return None
+        groups_list = cls()._parse_groups_flexible(groups_to_bypass)
+        if not groups_list:
+            return None
+        return "屏蔽组", groups_list
+    
+    def _execute_bypass_in_backend(self, groups_list, unique_id=None):
         """
-        在后端直接执行屏蔽逻辑
-        这是关键修复：确保在流程执行时屏蔽操作生效
+        在后端记录屏蔽状态，并立即推送给前端
         """
         try:
-            # 获取当前ComfyUI的执行环境
-            import server
-            from nodes import NODE_CLASS_MAPPINGS
-            
-            # 通过server向前端发送屏蔽指令
-            # 这样可以确保屏蔽操作在流程执行时生效
-            bypass_data = {
-                "type": "bypass_groups",
-                "groups": groups_list,
-                "action": "屏蔽组"
-            }
-            
-            # 直接调用前端的屏蔽逻辑
-            self._apply_bypass_directly(groups_list)
-            
-            print(f"🚫 后端屏蔽执行: 已屏蔽组 {groups_list}")
-            
+            group_state.publish(unique_id, "FlowBypassGroupNode", "屏蔽组", groups_list)
+            logger.debug("🚫 后端屏蔽执行: 已屏蔽组 %s", brief(groups_list))
         except Exception as e:
-            print(f"🚫 后端屏蔽执行出错: {e}")
-            print("🚫 尝试备用屏蔽方案...")
-            
-            # 备用方案：直接设置全局状态
-            try:
-                self._set_global_bypass_state(groups_list)
-            except Exception as e2:
-                print(f"🚫 备用方案也失败: {e2}")
-    
-    def _apply_bypass_directly(self, groups_list):
-        """
-        直接应用屏蔽逻辑，不依赖前端
-        """
-        # 这里我们需要模拟前端的屏蔽逻辑
-        # 但由于后端无法直接访问前端的graph对象，我们需要其他方案
-        
-        # 设置环境变量或全局状态，供前端读取
-        import os
-        
-        # 将屏蔽信息写入环境变量
-        bypass_groups_str = ",".join(groups_list)
-        os.environ['COMFYUI_BYPASS_GROUPS'] = bypass_groups_str
-        
-        # 设置类级别的状态
-        if not hasattr(self.__class__, '_global_bypass_groups'):
-            self.__class__._global_bypass_groups = set()
-        
-        self.__class__._global_bypass_groups.update(groups_list)
-        
-        print(f"🚫 设置全局屏蔽状态: {bypass_groups_str}")
-    
-    def _set_global_bypass_state(self, groups_list):
-        """
-        设置全局屏蔽状态的备用方案
-        """
-        # 创建一个全局的屏蔽状态管理器
-        if not hasattr(FlowBypassGroupNode, '_active_bypasses'):
-            FlowBypassGroupNode._active_bypasses = {}
-        
-        import time
-        timestamp = time.time()
-        
-        for group in groups_list:
-            FlowBypassGroupNode._active_bypasses[group] = {
-                'timestamp': timestamp,
-                'action': 'bypass'
-            }
-        
-        print(f"🚫 全局状态已设置: {list(FlowBypassGroupNode._active_bypasses.keys())}")
+            logger.warning("🚫 后端屏蔽执行出错: %s", e)
     
     @classmethod
     def get_active_bypasses(cls):
         """
-        获取当前活跃的屏蔽状态
+        获取当前活跃的屏蔽状态：{组名: {'timestamp': 时间戳, 'action': 'bypass'}}
         """
-        if hasattr(cls, '_active_bypasses'):
-            return cls._active_bypasses
-        return {}
+        return {
+            group: {'timestamp': state['timestamp'], 'action': 'bypass'}
+            for group, state in group_state.groups_with_action("屏蔽组").items()
+        }
     
     @classmethod
     def clear_bypasses(cls):
         """
         清除所有屏蔽状态
         """
-        if hasattr(cls, '_active_bypasses'):
-            cls._active_bypasses.clear()
-        if hasattr(cls, '_global_bypass_groups'):
-            cls._global_bypass_groups.clear()
-        import os
-        if 'COMFYUI_BYPASS_GROUPS' in os.environ:
-            del os.environ['COMFYUI_BYPASS_GROUPS']
+        group_state.clear("屏蔽组")
     
     def _parse_groups_flexible(self, groups_input):
         """
@@ -526,75 +489,25 @@ class FlowBypassGroupNode:
         - 逗号分割: group1,group2
         - 分号分割: group1;group2
         - 竖线分割: group1|group2
-        - 空格分割: group1 group2 (多个连续空格视为一个分割符)
+        - 空格分割: group1 group2 (每个词长度都大于2时才分割，多个连续空格视为一个分割符)
         - 混合分割: 自动识别并处理
         """
         
-        if not groups_input or not groups_input.strip():
-            return []
-        
-        groups_text = groups_input.strip()
-        groups_list = []
-        
-        # 1. 首先按换行分割
-        lines = groups_text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 2. 检查该行是否包含其他分割符
-            if ',' in line:
-                # 逗号分割
-                parts = [part.strip() for part in line.split(',') if part.strip()]
-                groups_list.extend(parts)
-            elif ';' in line:
-                # 分号分割
-                parts = [part.strip() for part in line.split(';') if part.strip()]
-                groups_list.extend(parts)
-            elif '|' in line:
-                # 竖线分割
-                parts = [part.strip() for part in line.split('|') if part.strip()]
-                groups_list.extend(parts)
-            elif ' ' in line and len(line.split()) > 1:
-                # 空格分割（多个词的情况）
-                # 但要排除单个组名中间有空格的情况
-                words = line.split()
-                if len(words) > 1:
-                    # 检查是否看起来像多个组名
-                    if any(len(word) > 2 for word in words):  # 每个词长度大于2，可能是组名
-                        groups_list.extend([word.strip() for word in words if word.strip()])
-                    else:
-                        # 可能是一个组名，保持原样
-                        groups_list.append(line)
-                else:
-                    groups_list.append(line)
-            else:
-                # 单个组名
-                groups_list.append(line)
-        
-        # 3. 去重并保持顺序
-        seen = set()
-        unique_groups = []
-        for group in groups_list:
-            if group and group not in seen:
-                seen.add(group)
-                unique_groups.append(group)
-        
-        return unique_groups
+        return parse_group_names(groups_input)
 
 
 NODE_CLASS_MAPPINGS = {
     "GlobalGroupConditionNode": GlobalGroupConditionNode,
     "SmartGroupSwitchNode": SmartGroupSwitchNode,
     "AdvancedGroupSwitchNode": AdvancedGroupSwitchNode,
-    "FlowBypassGroupNode": FlowBypassGroupNode
+    "FlowBypassGroupNode": FlowBypassGroupNode,
+    "GroupRuleTableNode": GroupRuleTableNode
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "GlobalGroupConditionNode": "全局组条件控制🌐🔀",
     "SmartGroupSwitchNode": "智能组开关🎯",
     "AdvancedGroupSwitchNode": "高级组开关🔧",
-    "FlowBypassGroupNode": "流程屏蔽组🚫"
+    "FlowBypassGroupNode": "流程屏蔽组🚫",
+    "GroupRuleTableNode": "组规则表🗂️"
 } 
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+组名解析：所有组控制节点共用的组名分词器
+- 逗号、分号、竖线统一替换为换行后一次分割完成
+- 空格分割规则与前端 parseTargetGroups 一致：只有整个输入没有任何分隔符时才按空格分割，
+  且要求有多个词、每个词长度都大于2；有分隔符时组名中的空格原样保留（如 "Upscale Pass, Face Fix"）
+- 结果去重并保持顺序，按原始字符串缓存
+"""
+from functools import lru_cache
+
+PARSE_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def split_group_names(text):
+    """将组名字符串解析为组名元组（带缓存，返回值不可变）"""
+    # 逗号、分号、竖线、回车先统一替换为换行，再用一次 str.split 分割（比正则分割快）
+    if "," in text or ";" in text or "|" in text or "\r" in text:
+        text = text.replace(",", "\n").replace(";", "\n").replace("|", "\n").replace("\r", "\n")
+    segments = [segment.strip() for segment in text.split("\n")]
+    if len(segments) == 1:
+        # 没有分隔符时才尝试按空格分割
+        words = segments[0].split()
+        if len(words) > 1 and all(len(word) > 2 for word in words):
+            segments = words
+        else:
+            return (segments[0],) if segments[0] else ()
+    # 常见情况没有重复和空段，一次集合检查即可；否则去重并保持顺序，去掉空段
+    unique = set(segments)
+    if len(unique) == len(segments) and "" not in unique:
+        return tuple(segments)
+    groups = dict.fromkeys(segments)
+    groups.pop("", None)
+    return tuple(groups)
+
+
+def parse_group_names(value):
+    """
+    解析组名输入，支持字符串、列表/元组以及其他任意类型
+    - 字符串：按分隔符分割
+    - 列表/元组：每个元素作为一个组名
+    - 其他类型：转为字符串后作为一个组名
+    空输入返回空列表（表示控制所有组）
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return list(split_group_names(value))
+    if isinstance(value, (list, tuple)):
+        groups = []
+        seen = set()
+        for item in value:
+            group = str(item).strip()
+            if group and group not in seen:
+                seen.add(group)
+                groups.append(group)
+        return groups
+    group = str(value).strip()
+    return [group] if group else []
+
+
+def clear_group_cache():
+    split_group_names.cache_clear()
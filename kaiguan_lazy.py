@@ -0,0 +1,45 @@
+"""
+惰性输入辅助：配合 ComfyUI 的 lazy 输入与 check_lazy_status 使用
+ComfyUI 传给 check_lazy_status 的参数中，"尚未计算"与"计算结果为None"都表现为None，
+因此按顺序逐个请求输入时需要记住本次执行中已经请求过哪些输入。
+状态以本次执行的 prompt 对象为标识，节点真正执行后清除。
+"""
+
+
+def lazy_options(options=None):
+    """为输入选项加上 lazy 标记"""
+    merged = dict(options or {})
+    merged["lazy"] = True
+    return merged
+
+
+def next_lazy_input(owner, token, names, values, is_empty):
+    """
+    按 names 的顺序逐个请求惰性输入，直到遇到非空值
+    - owner: 节点实例（用于保存请求状态）
+    - token: 本次执行的标识（通常为隐藏输入 PROMPT）
+    - values: check_lazy_status 收到的参数，未连接的输入不在其中
+    返回需要 ComfyUI 计算的输入名列表（空列表表示可以执行）
+    """
+    state = getattr(owner, "_lazy_probe", None)
+    if state is None or state[0] is not token:
+        state = (token, set())
+        owner._lazy_probe = state
+    requested = state[1]
+
+    for name in names:
+        if name not in values:
+            continue
+        if not is_empty(values[name]):
+            return []
+        if name in requested:
+            # 已经请求过，仍为空说明计算结果本身为空
+            continue
+        requested.add(name)
+        return [name]
+    return []
+
+
+def reset_lazy_probe(owner):
+    """节点执行完毕后清除请求状态"""
+    owner._lazy_probe = None
@@ -0,0 +1,62 @@
+"""
+列表执行辅助：配合 INPUT_IS_LIST / OUTPUT_IS_LIST 的节点使用
+INPUT_IS_LIST 的节点一次收到整个列表（控件值与隐藏输入也包装成列表），
+在一次调用中完成全部元素的路由，输出通过/未通过两组列表并保留原始序号。
+ComfyUI 无法把空列表交给下游逐个执行，空列表输出为占位值：元素为 [None]，序号为 [-1]
+"""
+
+EMPTY_ITEMS = (None,)
+EMPTY_INDICES = (-1,)
+
+
+def as_list(value):
+    """INPUT_IS_LIST 的输入：None（未连接）视为空列表"""
+    if value is None:
+        return []
+    if isinstance(value, tuple):
+        return list(value)
+    return value if isinstance(value, list) else [value]
+
+
+def is_unevaluated(value):
+    """未计算的惰性输入：ComfyUI 以 (None,) 传入（直接调用时为 None 或 [None]）"""
+    return value is None or (isinstance(value, (list, tuple)) and len(value) == 1 and value[0] is None)
+
+
+def first(value, default=None):
+    """控件值与隐藏输入：取列表中的第一个值"""
+    if isinstance(value, list):
+        return value[0] if value else default
+    return default if value is None else value
+
+
+def broadcast(value, length, default=None):
+    """逐元素的参数：长度与输入一致时按元素使用，否则所有元素使用第一个值"""
+    values = as_list(value)
+    if len(values) == length:
+        return values
+    return [first(values, default)] * length
+
+
+def partition(items, mask):
+    """按掩码把元素分为 (通过, 通过序号, 未通过, 未通过序号)，保持原顺序"""
+    passed, passed_indices, failed, failed_indices = [], [], [], []
+    for index, (item, flag) in enumerate(zip(items, mask)):
+        if flag:
+            passed.append(item)
+            passed_indices.append(index)
+        else:
+            failed.append(item)
+            failed_indices.append(index)
+    return passed, passed_indices, failed, failed_indices
+
+
+def list_outputs(passed, passed_indices, failed, failed_indices):
+    """OUTPUT_IS_LIST 的输出元组，末尾附通过数量；空列表换成占位值"""
+    return (
+        passed or list(EMPTY_ITEMS),
+        passed_indices or list(EMPTY_INDICES),
+        failed or list(EMPTY_ITEMS),
+        failed_indices or list(EMPTY_INDICES),
+        len(passed),
+    )
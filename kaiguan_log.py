@@ -0,0 +1,24 @@
+"""
+日志：替代节点执行路径中的无条件 print
+- 每次执行的调试信息使用 DEBUG 级别，默认不输出，也不会格式化参数
+- 可通过环境变量 KAIGUAN_LOG_LEVEL（如 DEBUG / INFO / WARNING）调整级别
+- 参数配合 kaiguan_values.brief 使用，大对象不会被 repr
+"""
+import logging
+import os
+
+LOGGER_NAME = "ergouzi.kaiguan"
+LOG_LEVEL_ENV = "KAIGUAN_LOG_LEVEL"
+
+logger = logging.getLogger(LOGGER_NAME)
+
+_level = os.environ.get(LOG_LEVEL_ENV)
+if _level:
+    try:
+        logger.setLevel(_level.upper())
+    except ValueError:
+        pass
+    if not logging.getLogger().handlers and not logger.handlers:
+        _handler = logging.StreamHandler()
+        _handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(_handler)
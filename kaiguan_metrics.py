@@ -0,0 +1,298 @@
+"""
+运行指标：节点耗时与路由决策计数，以 Prometheus 文本格式通过 PromptServer 的 /kaiguan/metrics 输出
+- instrument_node_class: 包装节点的 FUNCTION，记录调用次数、耗时分布与异常次数
+- 路由类节点额外记录判定结果（true / false）与被跳过的分支数
+- 组控制动作（组状态推送、后端改写提示词）按动作记录受控组数与节点数
+- 提前释放的节点数与字节数来自 kaiguan_release
+设置 KAIGUAN_METRICS=0 可关闭
+"""
+import bisect
+import functools
+import os
+import threading
+import time
+
+from .kaiguan_log import logger
+
+METRICS_ENABLED = os.environ.get("KAIGUAN_METRICS", "1").lower() not in ("0", "false", "no")
+
+METRICS_ROUTE = "/kaiguan/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 节点耗时直方图的桶上限（秒）
+DURATION_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+# 指标名 -> (类型, 说明)
+METRIC_HELP = {
+    "kaiguan_node_duration_seconds": ("histogram", "节点 FUNCTION 的执行耗时"),
+    "kaiguan_node_errors_total": ("counter", "节点 FUNCTION 抛出异常的次数"),
+    "kaiguan_decisions_total": ("counter", "路由节点的判定次数（按结果）"),
+    "kaiguan_skipped_branches_total": ("counter", "路由节点跳过的分支数"),
+    "kaiguan_group_actions_total": ("counter", "组控制节点推送的动作次数"),
+    "kaiguan_controlled_groups_total": ("counter", "组控制动作涉及的组数（所有组计为1）"),
+    "kaiguan_pruned_nodes_total": ("counter", "后端组控制从提示词中移除的节点数"),
+    "kaiguan_released_nodes_total": ("counter", "开关节点提前释放的上游节点输出数"),
+    "kaiguan_released_bytes_total": ("counter", "开关节点提前释放的张量字节数"),
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value) if value != int(value) else str(int(value))
+    return str(value)
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(DURATION_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class MetricsRegistry:
+    """线程安全的计数器与直方图；标签以 ((名称, 值), ...) 元组表示"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, labels=(), amount=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, labels, seconds):
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds)
+
+    def observe_call(self, node, seconds, error=False):
+        labels = (("node", node),)
+        self.observe("kaiguan_node_duration_seconds", labels, seconds)
+        if error:
+            self.inc("kaiguan_node_errors_total", labels)
+
+    def _record_call(self, histogram_key, seconds, decision_key=None, skipped_key=None, skipped=0):
+        """节点包装函数使用：键预先生成，一次加锁完成耗时与判定的记录"""
+        with self._lock:
+            histogram = self._histograms.get(histogram_key)
+            if histogram is None:
+                histogram = self._histograms[histogram_key] = _Histogram()
+            histogram.observe(seconds)
+            if decision_key is not None:
+                self._counters[decision_key] = self._counters.get(decision_key, 0) + 1
+            if skipped:
+                self._counters[skipped_key] = self._counters.get(skipped_key, 0) + skipped
+
+    def record_decision(self, node, passed, skipped=0):
+        if passed is not None:
+            self.inc("kaiguan_decisions_total", (("node", node), ("result", "true" if passed else "false")))
+        if skipped:
+            self.inc("kaiguan_skipped_branches_total", (("node", node),), skipped)
+
+    def record_group_action(self, message):
+        """组状态推送的监听函数"""
+        actions = message.get("actions") or [{"action": message.get("action"), "groups": message.get("groups")}]
+        for entry in actions:
+            action = entry.get("action")
+            if not action or action == "不变":
+                continue
+            labels = (("action", action),)
+            self.inc("kaiguan_group_actions_total", labels)
+            self.inc("kaiguan_controlled_groups_total", labels, len(entry.get("groups") or ()) or 1)
+
+    def record_prune(self, report):
+        for key, action in (("removed", "禁用组"), ("bypassed", "屏蔽组")):
+            if report.get(key):
+                self.inc("kaiguan_pruned_nodes_total", (("action", action),), len(report[key]))
+
+    def value(self, name, labels=()):
+        with self._lock:
+            return self._counters.get((name, labels), 0)
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _release_counters(self):
+        from .kaiguan_release import release_stats
+        stats = release_stats.snapshot()
+        return {
+            ("kaiguan_released_nodes_total", ()): stats["nodes"],
+            ("kaiguan_released_bytes_total", ()): stats["bytes"],
+        }
+
+    def render(self):
+        """生成 Prometheus 文本格式"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(h.counts), h.total, h.count) for key, h in self._histograms.items()}
+        counters.update(self._release_counters())
+
+        by_name = {}
+        for (name, labels), value in counters.items():
+            by_name.setdefault(name, []).append((labels, value))
+        for (name, labels), value in histograms.items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(by_name):
+            metric_type, help_text = METRIC_HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in sorted(by_name[name], key=lambda item: item[0]):
+                if metric_type != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(DURATION_BUCKETS + ("+Inf",), counts):
+                    cumulative += bucket_count
+                    le = bound if bound == "+Inf" else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total!r}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def _linked_inputs(kwargs):
+    return sum(1 for name in kwargs if name.startswith("input") and name[len("input"):].isdigit())
+
+
+def _selected(result, kwargs):
+    passed = result[0] is not None
+    return passed, max(0, _linked_inputs(kwargs) - passed)
+
+
+def _boolean_skip(result, kwargs):
+    passed = bool(kwargs.get("condition")) != bool(kwargs.get("invert"))
+    return passed, int(not passed and kwargs.get("control_type") == "跳过节点")
+
+
+def _passed_first(result, kwargs):
+    passed = result[0] is not None
+    return passed, int(not passed)
+
+
+def _truthy_switch(result, kwargs):
+    from .kaiguan_empty import is_truthy
+    return is_truthy(kwargs.get("any_type")), 0
+
+
+# 路由节点的判定提取：fn(输出元组, 输入) -> (判定结果, 跳过的分支数)
+DECISION_EXTRACTORS = {
+    "LogicSkipNode": _passed_first,
+    "LogicBatchSkipNode": lambda result, kwargs: (result[2] > 0, int(result[2] == 0)),
+    "BooleanSkipNode": _boolean_skip,
+    "EGRYDZQHNode": _selected,
+    "EGDLXZNode": lambda result, kwargs: (result[1] > 0, max(0, _linked_inputs(kwargs) - (result[1] > 0))),
+    "hulue": _truthy_switch,
+    "jinyong": _truthy_switch,
+    "ALLty": _truthy_switch,
+    "LogicSkipListNode": lambda result, kwargs: (result[4] > 0, int(result[4] == 0)),
+    "BooleanSkipListNode": lambda result, kwargs: (result[4] > 0, int(result[4] == 0)),
+    "EGRYDZQHListNode": lambda result, kwargs: (result[1] != [-1], 0),
+    "GlobalGroupConditionNode": lambda result, kwargs: (bool(result[1]), 0),
+    "GroupRuleTableNode": lambda result, kwargs: (result[1] > 0, 0),
+}
+
+
+def _result_tuple(result):
+    if isinstance(result, dict):
+        result = result.get("result", ())
+    return result if isinstance(result, tuple) else ()
+
+
+def instrument_node_class(class_name, node_class):
+    """包装节点类的 FUNCTION（只包装一次），返回节点类本身"""
+    if not METRICS_ENABLED:
+        return node_class
+    function_name = getattr(node_class, "FUNCTION", None)
+    method = getattr(node_class, function_name, None) if function_name else None
+    if method is None or getattr(method, "_kaiguan_metrics", False):
+        return node_class
+
+    extractor = DECISION_EXTRACTORS.get(class_name)
+    clock = time.perf_counter
+    labels = (("node", class_name),)
+    histogram_key = ("kaiguan_node_duration_seconds", labels)
+    decision_keys = {
+        True: ("kaiguan_decisions_total", labels + (("result", "true"),)),
+        False: ("kaiguan_decisions_total", labels + (("result", "false"),)),
+    }
+    skipped_key = ("kaiguan_skipped_branches_total", labels)
+
+    @functools.wraps(method)
+    def timed(self, *args, **kwargs):
+        started = clock()
+        try:
+            result = method(self, *args, **kwargs)
+        except Exception:
+            metrics.observe_call(class_name, clock() - started, error=True)
+            raise
+        elapsed = clock() - started
+        if extractor is None:
+            metrics._record_call(histogram_key, elapsed)
+            return result
+        try:
+            passed, skipped = extractor(_result_tuple(result), kwargs)
+        except Exception as e:
+            logger.debug("📈 节点 %s 的判定结果无法统计: %s", class_name, e)
+            passed, skipped = None, 0
+        decision_key = decision_keys[bool(passed)] if passed is not None else None
+        metrics._record_call(histogram_key, elapsed, decision_key, skipped_key, skipped)
+        return result
+
+    timed._kaiguan_metrics = True
+    setattr(node_class, function_name, timed)
+    return node_class
+
+
+def add_metrics_route(routes, path=METRICS_ROUTE):
+    """在 aiohttp 的 RouteTableDef 上注册指标路由"""
+    from aiohttp import web
+
+    @routes.get(path)
+    async def kaiguan_metrics(request):
+        return web.Response(body=metrics.render().encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
+
+    return kaiguan_metrics
+
+
+def register_metrics():
+    """订阅组状态推送并在 PromptServer 上注册指标路由；不在 ComfyUI 环境中运行时只做订阅"""
+    if not METRICS_ENABLED:
+        return False
+    from .kaiguan_state import group_state
+    group_state.subscribe(metrics.record_group_action)
+    try:
+        from server import PromptServer
+        add_metrics_route(PromptServer.instance.routes)
+    except Exception:
+        return False
+    return True
@@ -0,0 +1,441 @@
+"""
+后端组控制：在提示词进入校验与调度之前解析组控制节点的动作，直接改写提示词
+- 组的几何信息来自 extra_pnginfo['workflow']['groups']，通过网格空间索引判断节点所属的组
+- 禁用组：节点从提示词中移除，指向它的连线一并移除（与前端静音节点的提交结果一致）
+- 屏蔽组：节点从提示词中移除，下游连线按类型改接到该节点的同类型输入（与前端屏蔽节点的提交结果一致）
+- 启用组 / 不变：不做改动（API格式的提示词中不包含已静音的节点，无法在后端恢复）
+设置 KAIGUAN_BACKEND_PRUNE=0 可关闭该功能
+"""
+import os
+
+from .kaiguan_core import is_link
+from .kaiguan_log import logger
+from .kaiguan_metrics import metrics
+from .kaiguan_state import ALL_GROUPS
+
+BACKEND_PRUNE = os.environ.get("KAIGUAN_BACKEND_PRUNE", "1").lower() not in ("0", "false", "no")
+
+# 网格索引的单元格边长（画布坐标）
+GRID_CELL_SIZE = 512
+
+# 节点标题栏高度，与前端 LiteGraph.NODE_TITLE_HEIGHT 一致
+NODE_TITLE_HEIGHT = 30
+
+# 可在后端解析动作的组控制节点
+CONTROLLER_TYPES = (
+    "GlobalGroupConditionNode",
+    "SmartGroupSwitchNode",
+    "AdvancedGroupSwitchNode",
+    "FlowBypassGroupNode",
+    "GroupRuleTableNode",
+)
+
+ACTION_REMOVE = "禁用组"
+ACTION_BYPASS = "屏蔽组"
+
+# 外部调度方随提示词提交的组覆盖设置：extra_data[OVERRIDES_KEY] = {组名: 动作}
+OVERRIDES_KEY = "kaiguan_group_overrides"
+OVERRIDE_SOURCE = "override"
+
+# 组覆盖设置中可用的动作写法
+OVERRIDE_ACTIONS = {
+    "enable": "启用组", "disable": "禁用组", "bypass": "屏蔽组", "mute": "禁用组", "unchanged": "不变",
+    "启用组": "启用组", "启用": "启用组", "开启": "启用组",
+    "禁用组": "禁用组", "禁用": "禁用组", "关闭": "禁用组",
+    "屏蔽组": "屏蔽组", "屏蔽": "屏蔽组", "忽略": "屏蔽组",
+    "不变": "不变",
+}
+
+
+def is_control_node(node_type):
+    """与前端 GroupControlManager.isControlNode 相同的判断：控制节点不受组控制影响"""
+    if not node_type:
+        return False
+    lowered = node_type.lower()
+    return ("GlobalGroupCondition" in node_type or "SmartGroupSwitch" in node_type
+            or "Switch" in node_type or "kaiguan" in node_type
+            or "hulue" in lowered or "jinyong" in lowered)
+
+
+def _pair(value):
+    """工作流中的坐标/尺寸可能是 [x, y] 或 {"0": x, "1": y}"""
+    if isinstance(value, dict):
+        value = (value.get("0"), value.get("1"))
+    try:
+        return float(value[0]), float(value[1])
+    except (TypeError, ValueError, IndexError, KeyError):
+        return None
+
+
+class WorkflowGroupIndex:
+    """
+    工作流组的空间索引
+    组按包围盒登记到均匀网格，节点中心（含标题栏）落在组包围盒内即视为组内节点，
+    与前端 group.recomputeInsideNodes 的判定一致
+    """
+    def __init__(self, groups, nodes, cell_size=GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self._boxes = []
+        self._grid = {}
+        self._members = {}
+
+        for group in groups or ():
+            bounding = group.get("bounding") if isinstance(group, dict) else None
+            if not bounding or len(bounding) < 4:
+                continue
+            try:
+                x, y, w, h = (float(v) for v in bounding[:4])
+            except (TypeError, ValueError):
+                continue
+            self._add_group(str(group.get("title", "")), (x, y, x + w, y + h))
+
+        for node in nodes or ():
+            if isinstance(node, dict):
+                self._add_node(node)
+
+    @classmethod
+    def from_workflow(cls, workflow, cell_size=GRID_CELL_SIZE):
+        if not isinstance(workflow, dict):
+            return cls((), (), cell_size)
+        return cls(workflow.get("groups"), workflow.get("nodes"), cell_size)
+
+    def _cells(self, x1, y1, x2, y2):
+        size = self.cell_size
+        for cx in range(int(x1 // size), int(x2 // size) + 1):
+            for cy in range(int(y1 // size), int(y2 // size) + 1):
+                yield cx, cy
+
+    def _add_group(self, title, box):
+        index = len(self._boxes)
+        self._boxes.append((title, box))
+        for cell in self._cells(*box):
+            self._grid.setdefault(cell, []).append(index)
+
+    def _add_node(self, node):
+        pos = _pair(node.get("pos"))
+        if pos is None:
+            return
+        size = _pair(node.get("size")) or (0.0, 0.0)
+        center_x = pos[0] + size[0] / 2
+        center_y = pos[1] - NODE_TITLE_HEIGHT + (size[1] + NODE_TITLE_HEIGHT) / 2
+        node_id = str(node.get("id"))
+        node_type = node.get("type")
+        for title in self.groups_at(center_x, center_y):
+            self._members.setdefault(title, {})[node_id] = node_type
+
+    def groups_at(self, x, y):
+        """返回包含该坐标的组标题"""
+        size = self.cell_size
+        candidates = self._grid.get((int(x // size), int(y // size)), ())
+        titles = []
+        for index in candidates:
+            title, (x1, y1, x2, y2) = self._boxes[index]
+            if x1 <= x <= x2 and y1 <= y <= y2 and title not in titles:
+                titles.append(title)
+        return titles
+
+    def titles(self):
+        return list(dict.fromkeys(title for title, _ in self._boxes))
+
+    def members(self, title):
+        """组内节点 {节点id: 节点类型}；同名组的节点合并"""
+        return self._members.get(title, {})
+
+    def controlled_nodes(self, groups):
+        """
+        组列表对应的受控节点id（不含控制节点）
+        组列表为空表示所有组，与前端 executeGroupControl 一致
+        """
+        titles = self.titles() if not groups or ALL_GROUPS in groups else groups
+        result = set()
+        for title in titles:
+            for node_id, node_type in self.members(title).items():
+                if not is_control_node(node_type):
+                    result.add(node_id)
+        return result
+
+
+def _node_id_order(node_id):
+    try:
+        return 0, int(node_id), node_id
+    except (TypeError, ValueError):
+        return 1, 0, str(node_id)
+
+
+def _lazy_inputs(node_class):
+    """节点类中声明为惰性的输入名"""
+    try:
+        declared = node_class.INPUT_TYPES() if node_class is not None else {}
+    except Exception:
+        declared = {}
+    names = set()
+    for section in ("required", "optional"):
+        for name, spec in (declared.get(section) or {}).items():
+            if isinstance(spec, (list, tuple)) and len(spec) > 1 and isinstance(spec[1], dict) \
+                    and spec[1].get("lazy"):
+                names.add(name)
+    return names
+
+
+def _requests_lazy_input(node, name):
+    """惰性输入能否确定会被计算：只认得出 BooleanSkipNode 控件为常量时的结果，其余一律视为不确定"""
+    inputs = node.get("inputs") or {}
+    if node.get("class_type") != "BooleanSkipNode" or name != "input":
+        return False
+    values = [inputs.get(key) for key in ("condition", "invert", "control_type")]
+    if any(value is None or is_link(value) for value in values):
+        return False
+    condition, invert, control_type = values
+    return bool(condition) != bool(invert) or control_type in ("忽略组", "禁用组", "混合开关")
+
+
+def flow_reachable(prompt, node_types):
+    """
+    一定会被执行的节点：从输出节点（OUTPUT_NODE）沿连线向上，
+    惰性输入只在能确定会被计算时继续向上；缺少节点类信息时返回空集合
+    """
+    lazy_by_class = {}
+    reached = set()
+    stack = [node_id for node_id, node in prompt.items()
+             if getattr(node_types.get(node.get("class_type")), "OUTPUT_NODE", False)]
+    while stack:
+        node_id = stack.pop()
+        if node_id in reached:
+            continue
+        reached.add(node_id)
+        node = prompt[node_id]
+        class_type = node.get("class_type")
+        lazy = lazy_by_class.get(class_type)
+        if lazy is None:
+            lazy = lazy_by_class[class_type] = _lazy_inputs(node_types.get(class_type))
+        for name, value in (node.get("inputs") or {}).items():
+            if is_link(value) and value[0] in prompt and (name not in lazy or _requests_lazy_input(node, name)):
+                stack.append(value[0])
+    return reached
+
+
+def resolve_actions(prompt, controller_classes, node_types=None):
+    """
+    解析提示词中所有组控制节点的动作
+    返回按节点id升序排列的 [(节点id, 动作, 组列表)]，后执行的控制节点覆盖先执行的
+    resolve_group_action 可以返回单个 (动作, 组列表)，也可以返回按应用顺序排列的列表
+    FLOW_GATED 的控制节点只在流程经过时生效，不一定会被执行（如位于被跳过的分支上）时不在提交时解析，
+    留到执行时由节点自己处理
+    """
+    controllers = sorted((node_id for node_id, node in prompt.items()
+                          if isinstance(node, dict) and node.get("class_type") in controller_classes),
+                         key=_node_id_order)
+    reachable = None
+    actions = []
+    for node_id in controllers:
+        node = prompt[node_id]
+        node_class = controller_classes[node.get("class_type")]
+        if getattr(node_class, "FLOW_GATED", False):
+            if reachable is None:
+                reachable = flow_reachable(prompt, node_types or {})
+            if node_id not in reachable:
+                logger.debug("🌐 节点 %s 不一定会被执行，组动作留到执行时处理", node_id)
+                continue
+        try:
+            resolved = node_class.resolve_group_action(node.get("inputs") or {})
+        except Exception as e:
+            logger.warning("🌐 节点 %s 的组动作无法在后端解析: %s", node_id, e)
+            continue
+        if isinstance(resolved, list):
+            actions.extend((node_id, action, groups) for action, groups in resolved)
+        elif resolved is not None:
+            actions.append((node_id, resolved[0], resolved[1]))
+    return actions
+
+
+def override_actions(overrides):
+    """
+    把 {组名: 动作} 转为动作列表，排在所有控制节点之后（覆盖控制节点的设置）
+    组名为 "*" 表示所有组；动作无法识别时抛出 ValueError
+    """
+    actions = []
+    for title, action in (overrides or {}).items():
+        resolved = OVERRIDE_ACTIONS.get(str(action).strip().lower()) or OVERRIDE_ACTIONS.get(str(action).strip())
+        if resolved is None:
+            raise ValueError(f"组 {title} 的动作无效: {action}")
+        actions.append((OVERRIDE_SOURCE, resolved, [] if title == ALL_GROUPS else [str(title)]))
+    return actions
+
+
+def _slot_types(node_class):
+    """返回 (输入名 -> 类型 的有序字典, 输出类型元组)；缺少类型信息时返回空"""
+    if node_class is None:
+        return {}, ()
+    try:
+        declared = node_class.INPUT_TYPES()
+    except Exception:
+        declared = {}
+    inputs = {}
+    for section in ("required", "optional"):
+        for name, spec in (declared.get(section) or {}).items():
+            slot_type = spec[0] if isinstance(spec, (list, tuple)) and spec else spec
+            inputs[name] = "COMBO" if isinstance(slot_type, (list, tuple)) else str(slot_type)
+    return inputs, tuple(getattr(node_class, "RETURN_TYPES", ()) or ())
+
+
+def _types_match(a, b):
+    return a is None or b is None or a == "*" or b == "*" or a == b
+
+
+class BypassResolver:
+    """把指向屏蔽节点的连线改接到其同类型输入，规则与前端 graphToPrompt 一致：优先尝试同序号输入"""
+    def __init__(self, prompt, bypassed, node_types):
+        self.prompt = prompt
+        self.bypassed = bypassed
+        self.node_types = node_types
+        self._slots = {}
+
+    def _slots_of(self, node_id):
+        slots = self._slots.get(node_id)
+        if slots is None:
+            class_type = self.prompt[node_id].get("class_type")
+            slots = self._slots[node_id] = _slot_types(self.node_types.get(class_type))
+        return slots
+
+    def resolve(self, link):
+        seen = set()
+        while link[0] in self.bypassed:
+            source_id, slot = link
+            if source_id in seen:
+                return None
+            seen.add(source_id)
+            input_types, return_types = self._slots_of(source_id)
+            wanted = return_types[slot] if 0 <= slot < len(return_types) else None
+            inputs = self.prompt[source_id].get("inputs") or {}
+            names = list(input_types) or list(inputs)
+            candidates = ([names[slot]] if 0 <= slot < len(names) else []) + names
+            link = None
+            for name in candidates:
+                value = inputs.get(name)
+                if is_link(value) and _types_match(input_types.get(name), wanted):
+                    link = value
+                    break
+            if link is None:
+                return None
+        return link
+
+
+def group_modes(actions, index):
+    """
+    把动作列表展开到组内节点，返回 ({节点id: 动作}, 已应用的动作)
+    同一节点以最后一个动作为准；"不变" 不改动任何节点
+    """
+    modes = {}
+    applied = []
+    for node_id, action, groups in actions:
+        if action == "不变":
+            continue
+        for target in index.controlled_nodes(groups):
+            modes[target] = action
+        applied.append({"node_id": node_id, "action": action, "groups": list(groups)})
+    return modes, applied
+
+
+def split_modes(prompt, modes):
+    """返回 (被禁用的节点, 被屏蔽的节点)，只含提示词中存在的节点"""
+    removed = {node_id for node_id, action in modes.items() if action == ACTION_REMOVE and node_id in prompt}
+    bypassed = {node_id for node_id, action in modes.items() if action == ACTION_BYPASS and node_id in prompt}
+    return removed, bypassed
+
+
+def pruned_node(prompt, node, resolver, removed):
+    """剪枝后的节点：指向屏蔽节点的连线改接到其上游，指向禁用节点的连线移除"""
+    inputs = {}
+    for name, value in (node.get("inputs") or {}).items():
+        if is_link(value):
+            value = resolver.resolve(value)
+            # 上游节点被禁用或屏蔽后无可用输入时移除该连线
+            if value is None or value[0] in removed or value[0] not in prompt:
+                continue
+        inputs[name] = value
+    return dict(node, inputs=inputs)
+
+
+def prune_prompt(prompt, workflow, controller_classes, node_types=None, overrides=None):
+    """
+    按组控制动作改写API格式的提示词，返回 (新提示词, 报告)
+    overrides 为外部提交的 {组名: 动作}，在所有控制节点之后应用
+    workflow 也可以是已建好的 WorkflowGroupIndex（同一工作流多次剪枝时复用）
+    报告包含 actions（已应用的动作）、removed（被禁用的节点）、bypassed（被屏蔽的节点）
+    """
+    report = {"actions": [], "removed": [], "bypassed": []}
+    actions = resolve_actions(prompt, controller_classes, node_types) + override_actions(overrides)
+    if not actions:
+        return prompt, report
+
+    index = workflow if isinstance(workflow, WorkflowGroupIndex) else WorkflowGroupIndex.from_workflow(workflow)
+    modes, report["actions"] = group_modes(actions, index)
+    removed, bypassed = split_modes(prompt, modes)
+    if not removed and not bypassed:
+        return prompt, report
+
+    resolver = BypassResolver(prompt, bypassed, node_types or {})
+    pruned = {node_id: pruned_node(prompt, node, resolver, removed) for node_id, node in prompt.items()
+              if node_id not in removed and node_id not in bypassed}
+
+    report["removed"] = sorted(removed, key=_node_id_order)
+    report["bypassed"] = sorted(bypassed, key=_node_id_order)
+    return pruned, report
+
+
+def _controller_classes():
+    from . import kaiguan_global_condition
+    return {name: getattr(kaiguan_global_condition, name) for name in CONTROLLER_TYPES}
+
+
+def _comfy_node_types():
+    try:
+        import nodes
+    except ImportError:
+        return {}
+    return getattr(nodes, "NODE_CLASS_MAPPINGS", {})
+
+
+def on_prompt(json_data):
+    """PromptServer 的 on_prompt 处理函数：出错时原样返回，不影响提交"""
+    try:
+        prompt = json_data.get("prompt")
+        if not isinstance(prompt, dict):
+            return json_data
+        extra_data = json_data.get("extra_data") or {}
+        overrides = extra_data.get(OVERRIDES_KEY)
+        if not overrides and not any(isinstance(node, dict) and node.get("class_type") in CONTROLLER_TYPES
+                                     for node in prompt.values()):
+            return json_data
+        workflow = (extra_data.get("extra_pnginfo") or {}).get("workflow")
+        if not workflow:
+            return json_data
+
+        pruned, report = prune_prompt(prompt, workflow, _controller_classes(), _comfy_node_types(), overrides)
+        if pruned is not prompt:
+            json_data["prompt"] = pruned
+            metrics.record_prune(report)
+            logger.info("🌐 后端组控制: 禁用 %d 个节点, 屏蔽 %d 个节点",
+                        len(report["removed"]), len(report["bypassed"]))
+    except Exception as e:
+        logger.warning("🌐 后端组控制失败，提示词保持不变: %s", e)
+    return json_data
+
+
+def unknown_groups(workflow, overrides):
+    """返回覆盖设置中在工作流里找不到的组名"""
+    groups = workflow.get("groups") if isinstance(workflow, dict) else None
+    titles = set(WorkflowGroupIndex(groups, ()).titles())
+    return [title for title in overrides or {} if title != ALL_GROUPS and title not in titles]
+
+
+def register_prompt_hook():
+    """注册到 PromptServer；不在 ComfyUI 环境中运行时静默跳过"""
+    if not BACKEND_PRUNE:
+        return False
+    try:
+        from server import PromptServer
+        PromptServer.instance.add_on_prompt_handler(on_prompt)
+    except Exception:
+        return False
+    return True
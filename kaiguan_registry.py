@@ -0,0 +1,66 @@
+"""
+节点延迟注册：按清单登记节点，首次使用某个节点类时才导入其所在模块
+ComfyUI 只会在 /object_info、校验或执行时访问节点类的属性，
+因此启动时不需要导入任何节点模块；只提交API请求的工作节点也只会导入实际用到的模块。
+"""
+import importlib
+
+
+class LazyNodeMeta(type):
+    """代理类的元类：访问代理上不存在的属性或实例化时，转交给真正的节点类"""
+
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(cls.resolve(), name)
+
+    def __call__(cls, *args, **kwargs):
+        return cls.resolve()(*args, **kwargs)
+
+    def __repr__(cls):
+        return f"<lazy node {cls.__module__}.{cls.__name__}>"
+
+
+def lazy_node_class(package, module_name, class_name, on_resolve=None):
+    """
+    创建节点类的延迟代理
+    on_resolve(class_name, node_class) 在节点类第一次导入时调用，返回值作为最终的节点类
+    """
+    state = {}
+
+    def resolve():
+        node_class = state.get("class")
+        if node_class is None:
+            module = importlib.import_module(f".{module_name}", package=package)
+            node_class = module.NODE_CLASS_MAPPINGS[class_name]
+            if on_resolve is not None:
+                node_class = on_resolve(class_name, node_class)
+            state["class"] = node_class
+        return node_class
+
+    def is_loaded():
+        return "class" in state
+
+    return LazyNodeMeta(class_name, (), {
+        "__module__": f"{package}.{module_name}",
+        "resolve": staticmethod(resolve),
+        "is_loaded": staticmethod(is_loaded),
+    })
+
+
+def resolve_node_class(node_class):
+    """取得真正的节点类（非代理类原样返回）"""
+    if isinstance(node_class, LazyNodeMeta):
+        return node_class.resolve()
+    return node_class
+
+
+def resolve_all(mappings):
+    """导入清单中的所有模块，并检查清单是否与模块内的 NODE_CLASS_MAPPINGS 一致"""
+    errors = []
+    for class_name, node_class in mappings.items():
+        try:
+            resolve_node_class(node_class)
+        except Exception as e:
+            errors.append(f"{class_name}: {e}")
+    return errors
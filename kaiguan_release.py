@@ -0,0 +1,244 @@
+"""
+分支提前释放：开关节点判定某个输入分支不再需要后，把只供该分支使用的上游节点输出从输出缓存中移除，
+不必等到整个提示词执行结束，CPU/小内存机器上不会同时占着两个分支的图像与LATENT
+- dead_upstream: 按提示词的连线找出所有下游都已失效的上游节点
+- release_dead_inputs: 开关节点调用，移除这些节点的缓存输出并统计释放的字节数
+- 缓存的移除由已注册的 evictor 完成；在 ComfyUI 中运行时自动注册输出缓存的 evictor
+设置 KAIGUAN_EARLY_RELEASE=1 开启（默认关闭：被移除的输出在下一次执行时需要重新计算）
+"""
+import inspect
+import os
+import sys
+import threading
+import weakref
+
+from .kaiguan_core import is_link
+from .kaiguan_log import logger
+
+EARLY_RELEASE = os.environ.get("KAIGUAN_EARLY_RELEASE", "").lower() in ("1", "true", "yes")
+
+# 统计字节数时容器递归的深度上限
+MAX_DEPTH = 8
+
+
+def value_nbytes(value):
+    """估算值占用的张量/数组字节数（只读形状与类型，不访问数据）；同一对象只计一次"""
+    # 出现张量说明对应的库已导入，这里不主动导入
+    torch = sys.modules.get("torch")
+    np = sys.modules.get("numpy")
+    total = 0
+    seen = set()
+    stack = [(value, 0)]
+    while stack:
+        current, depth = stack.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        if torch is not None and isinstance(current, torch.Tensor):
+            total += current.numel() * current.element_size()
+        elif np is not None and isinstance(current, np.ndarray):
+            total += current.nbytes
+        elif depth < MAX_DEPTH:
+            if isinstance(current, dict):
+                stack.extend((item, depth + 1) for item in current.values())
+            elif isinstance(current, (list, tuple)):
+                stack.extend((item, depth + 1) for item in current)
+    return total
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.2f}GB"
+
+
+def _consumers(prompt):
+    """来源节点id -> [(下游节点id, 输入名)]"""
+    consumers = {}
+    for node_id, node in prompt.items():
+        if not isinstance(node, dict):
+            continue
+        for name, value in (node.get("inputs") or {}).items():
+            if is_link(value):
+                consumers.setdefault(value[0], []).append((node_id, name))
+    return consumers
+
+
+def dead_upstream(prompt, node_id, dead_inputs, node_types=None):
+    """
+    返回只被失效输入（及其失效的上游）使用的上游节点id
+    - dead_inputs: 开关节点上不再需要的输入名
+    - node_types: 节点类映射，用于排除输出节点；省略时不检查
+    """
+    node_id = str(node_id)
+    node = prompt.get(node_id)
+    if not isinstance(node, dict):
+        return set()
+    inputs = node.get("inputs") or {}
+    consumers = _consumers(prompt)
+
+    dead_edges = {(node_id, name) for name in dead_inputs}
+    dead = set()
+    pending = [inputs[name][0] for name in dead_inputs if is_link(inputs.get(name))]
+    while pending:
+        source_id = pending.pop()
+        if source_id in dead or source_id == node_id or source_id not in prompt:
+            continue
+        if not all(edge in dead_edges for edge in consumers.get(source_id, ())):
+            continue
+        node_class = (node_types or {}).get(prompt[source_id].get("class_type"))
+        if getattr(node_class, "OUTPUT_NODE", False):
+            continue
+        dead.add(source_id)
+        for name, value in (prompt[source_id].get("inputs") or {}).items():
+            if is_link(value):
+                dead_edges.add((source_id, name))
+                pending.append(value[0])
+    return dead
+
+
+class ReleaseStats:
+    """提前释放的累计统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.releases = 0
+        self.nodes = 0
+        self.bytes = 0
+
+    def record(self, nodes, size):
+        with self._lock:
+            self.releases += 1
+            self.nodes += nodes
+            self.bytes += size
+
+    def snapshot(self):
+        with self._lock:
+            return {"releases": self.releases, "nodes": self.nodes, "bytes": self.bytes}
+
+    def clear(self):
+        with self._lock:
+            self.releases = self.nodes = self.bytes = 0
+
+
+release_stats = ReleaseStats()
+
+# evictor(node_id) -> 被移除的缓存值；没有缓存时返回 None
+_evictors = []
+
+
+def register_evictor(evictor):
+    if evictor not in _evictors:
+        _evictors.append(evictor)
+
+
+def unregister_evictor(evictor):
+    if evictor in _evictors:
+        _evictors.remove(evictor)
+
+
+def release_nodes(node_ids):
+    """从所有已注册的缓存中移除节点输出，返回 (移除的节点数, 释放的字节数)"""
+    released = 0
+    size = 0
+    for node_id in node_ids:
+        found = False
+        for evictor in _evictors:
+            try:
+                value = evictor(node_id)
+            except Exception as e:
+                logger.debug("♻️ 移除节点 %s 的缓存失败: %s", node_id, e)
+                continue
+            if value is not None:
+                found = True
+                size += value_nbytes(value)
+        released += found
+    return released, size
+
+
+def release_dead_inputs(prompt, node_id, dead_inputs, force=False):
+    """
+    开关节点确定 dead_inputs 不再需要时调用：移除只供这些输入使用的上游节点输出
+    未开启 KAIGUAN_EARLY_RELEASE 且 force 为 False 时不做任何事；返回释放的字节数
+    """
+    if not (EARLY_RELEASE or force) or not isinstance(prompt, dict) or node_id is None or not _evictors:
+        return 0
+    try:
+        dead = dead_upstream(prompt, node_id, dead_inputs, _comfy_node_types())
+        if not dead:
+            return 0
+        released, size = release_nodes(sorted(dead))
+    except Exception as e:
+        logger.warning("♻️ 提前释放失败: %s", e)
+        return 0
+    if released:
+        release_stats.record(released, size)
+        logger.info("♻️ 节点 %s 提前释放 %d 个上游节点的输出，约 %s", node_id, released, format_bytes(size))
+    return size
+
+
+def _comfy_node_types():
+    try:
+        import nodes
+    except ImportError:
+        return {}
+    return getattr(nodes, "NODE_CLASS_MAPPINGS", {})
+
+
+# ComfyUI 的输出缓存：记录当前正在执行的 PromptExecutor
+_active_executor = None
+
+
+def _set_active_executor(executor):
+    global _active_executor
+    _active_executor = weakref.ref(executor)
+
+
+def _track_executor(method):
+    if inspect.iscoroutinefunction(method):
+        async def wrapper(self, *args, **kwargs):
+            _set_active_executor(self)
+            return await method(self, *args, **kwargs)
+    else:
+        def wrapper(self, *args, **kwargs):
+            _set_active_executor(self)
+            return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    wrapper._kaiguan_tracked = True
+    return wrapper
+
+
+def comfy_output_evictor(node_id):
+    """从 ComfyUI 的输出缓存中移除节点输出（兼容 BasicCache / LRUCache / HierarchicalCache）"""
+    executor = _active_executor() if _active_executor is not None else None
+    outputs = getattr(getattr(executor, "caches", None), "outputs", None)
+    if outputs is None:
+        return None
+    get_cache_for = getattr(outputs, "_get_cache_for", None)
+    cache = get_cache_for(node_id) if get_cache_for is not None else outputs
+    if cache is None:
+        return None
+    key = cache.cache_key_set.get_data_key(node_id)
+    return cache.cache.pop(key, None)
+
+
+def register_release_hook():
+    """在 ComfyUI 环境中注册输出缓存的 evictor；未开启或不在 ComfyUI 中运行时静默跳过"""
+    if not EARLY_RELEASE:
+        return False
+    try:
+        import execution
+    except ImportError:
+        return False
+    executor_class = getattr(execution, "PromptExecutor", None)
+    if executor_class is None:
+        return False
+    for name in ("execute", "execute_async"):
+        method = getattr(executor_class, name, None)
+        if method is not None and not getattr(method, "_kaiguan_tracked", False):
+            setattr(executor_class, name, _track_executor(method))
+    register_evictor(comfy_output_evictor)
+    return True
@@ -0,0 +1,222 @@
+"""
+规则表：一次执行完成 值 -> 组动作 的映射，替代逐条串联的条件节点
+规则写法（每行一条，# 开头为注释）：
+    portrait => 启用组 : 人像, 高清        等值规则（文本或数字）
+    [512, 1024) => 屏蔽组 : 放大           区间规则，支持 [a, b] (a, b] [a, b) (a, b)
+    >= 2048 => 禁用组 : 预览               单边区间，支持 > >= < <=
+    1..10 => 启用组                        闭区间简写；省略组名表示控制所有组
+    * => 不变                              默认规则：没有其他规则命中时生效
+- 等值规则放入哈希表，O(1) 查找
+- 区间规则按端点切分为互不重叠的基本区间，预先算好每段命中的规则，查找时二分，O(log n)
+- 命中的规则按行号顺序合并，同一个组以最后一条规则的动作为准
+"""
+import bisect
+import math
+import re
+from functools import lru_cache
+
+from .kaiguan_compare import numeric_value
+from .kaiguan_groups import parse_group_names
+from .kaiguan_values import comparable_text
+
+RULE_CACHE_SIZE = 64
+
+RULE_ARROW = "=>"
+DEFAULT_CONDITION = "*"
+
+ACTION_ALIASES = {
+    "启用组": "启用组", "启用": "启用组", "开启": "启用组",
+    "禁用组": "禁用组", "禁用": "禁用组", "关闭": "禁用组",
+    "屏蔽组": "屏蔽组", "屏蔽": "屏蔽组", "忽略": "屏蔽组",
+    "不变": "不变",
+}
+
+INTERVAL_PATTERN = re.compile(r"^([\[(])\s*([^,]*?)\s*,\s*([^,]*?)\s*([\])])$")
+BOUND_PATTERN = re.compile(r"^(>=|<=|>|<)\s*(.+)$")
+SPAN_PATTERN = re.compile(r"^(.+?)\s*\.\.\s*(.+)$")
+
+
+class RuleSyntaxError(ValueError):
+    """规则表中某一行无法解析"""
+
+
+class Rule:
+    __slots__ = ("line", "action", "groups", "text")
+
+    def __init__(self, line, action, groups, text):
+        self.line = line
+        self.action = action
+        self.groups = groups
+        self.text = text
+
+
+class _Interval:
+    __slots__ = ("rule", "low", "high", "low_closed", "high_closed")
+
+    def __init__(self, rule, low, high, low_closed, high_closed):
+        self.rule = rule
+        self.low = low
+        self.high = high
+        self.low_closed = low_closed
+        self.high_closed = high_closed
+
+    def contains(self, x):
+        if x < self.low or (x == self.low and not self.low_closed):
+            return False
+        if x > self.high or (x == self.high and not self.high_closed):
+            return False
+        return True
+
+
+def _bound(text, default):
+    text = text.strip()
+    if not text:
+        return default
+    value = numeric_value(text)
+    if value is None:
+        raise RuleSyntaxError(f"区间端点不是数字: {text}")
+    return value
+
+
+def _equality_key(text):
+    """等值规则的键：能转成数字的按数字比较（3 与 3.0 相同），否则按文本比较"""
+    value = numeric_value(text)
+    return value if value is not None else text
+
+
+class RuleTable:
+    """已编译的规则表，调用 match(input_value) 返回按行号排序的命中规则"""
+
+    def __init__(self, text):
+        self.rules = []
+        self.equality = {}
+        self.defaults = []
+        intervals = []
+
+        for line_number, raw in enumerate((text or "").splitlines(), 1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            if RULE_ARROW not in line:
+                raise RuleSyntaxError(f"第{line_number}行缺少 {RULE_ARROW}: {line}")
+            condition, _, target = line.partition(RULE_ARROW)
+            condition = condition.strip()
+            action_text, _, groups_text = target.partition(":")
+            action = ACTION_ALIASES.get(action_text.strip())
+            if action is None:
+                raise RuleSyntaxError(f"第{line_number}行的动作无效: {action_text.strip()}")
+            rule = Rule(line_number, action, tuple(parse_group_names(groups_text)), line)
+            self.rules.append(rule)
+
+            try:
+                interval = self._parse_interval(rule, condition)
+            except RuleSyntaxError as e:
+                raise RuleSyntaxError(f"第{line_number}行: {e}") from None
+            if interval is not None:
+                intervals.append(interval)
+            elif condition == DEFAULT_CONDITION:
+                self.defaults.append(rule)
+            else:
+                if condition.startswith("="):
+                    condition = condition[1:].strip()
+                self.equality.setdefault(_equality_key(condition), []).append(rule)
+
+        self._build_segments(intervals)
+
+    @staticmethod
+    def _parse_interval(rule, condition):
+        match = INTERVAL_PATTERN.match(condition)
+        if match:
+            opening, low, high, closing = match.groups()
+            return _Interval(rule, _bound(low, -math.inf), _bound(high, math.inf), opening == "[", closing == "]")
+        match = BOUND_PATTERN.match(condition)
+        if match:
+            op, value = match.groups()
+            value = _bound(value, None)
+            if op.startswith(">"):
+                return _Interval(rule, value, math.inf, op == ">=", False)
+            return _Interval(rule, -math.inf, value, False, op == "<=")
+        match = SPAN_PATTERN.match(condition)
+        if match and numeric_value(match.group(1)) is not None and numeric_value(match.group(2)) is not None:
+            return _Interval(rule, _bound(match.group(1), None), _bound(match.group(2), None), True, True)
+        return None
+
+    def _build_segments(self, intervals):
+        """
+        以全部端点切分数轴：端点 p0 < p1 < ... 形成 (-inf,p0) [p0] (p0,p1) [p1] ... (pk,+inf) 共 2k+1 段，
+        每段内所有点命中的区间规则相同，预先计算好
+        """
+        points = sorted({bound for interval in intervals for bound in (interval.low, interval.high)
+                         if not math.isinf(bound)})
+        self.points = points
+        samples = []
+        for i, point in enumerate(points):
+            previous = points[i - 1] if i else point - 1
+            samples.append((previous + point) / 2 if i else point - 1)
+            samples.append(point)
+        samples.append(points[-1] + 1 if points else 0)
+        self.segments = [
+            tuple(interval.rule for interval in intervals if interval.contains(sample))
+            for sample in samples
+        ]
+
+    def _range_rules(self, x):
+        if not self.segments:
+            return ()
+        i = bisect.bisect_left(self.points, x)
+        if i < len(self.points) and self.points[i] == x:
+            return self.segments[2 * i + 1]
+        return self.segments[2 * i]
+
+    def match(self, input_value):
+        number = numeric_value(input_value)
+        matched = []
+        if number is not None and not (isinstance(number, float) and math.isnan(number)):
+            matched.extend(self.equality.get(number, ()))
+            matched.extend(self._range_rules(number))
+        if not matched:
+            matched.extend(self.equality.get(comparable_text(input_value), ()))
+        if not matched:
+            return list(self.defaults)
+        matched.sort(key=lambda rule: rule.line)
+        return matched
+
+
+def merge_actions(rules):
+    """
+    合并命中规则的动作：同一个组以最后一条规则为准；控制所有组的规则会覆盖之前的单组设置
+    返回按应用顺序排列的 [(动作, 组列表)]，组列表为空表示所有组
+    """
+    all_groups_action = None
+    per_group = {}
+    for rule in rules:
+        if not rule.groups:
+            all_groups_action = rule.action
+            per_group.clear()
+            continue
+        for group in rule.groups:
+            per_group.pop(group, None)
+            per_group[group] = rule.action
+
+    merged = []
+    if all_groups_action is not None and all_groups_action != "不变":
+        merged.append((all_groups_action, []))
+    by_action = {}
+    for group, action in per_group.items():
+        if action != "不变":
+            by_action.setdefault(action, []).append(group)
+    merged.extend(by_action.items())
+    return merged
+
+
+@lru_cache(maxsize=RULE_CACHE_SIZE)
+def compile_rules(text):
+    """获取规则文本对应的已编译规则表（LRU缓存）；语法错误时抛出 RuleSyntaxError"""
+    return RuleTable(text)
+
+
+def describe_actions(merged):
+    """生成动作摘要，例如：启用组: 人像, 高清; 禁用组: 所有组"""
+    if not merged:
+        return "不变"
+    return "; ".join(f"{action}: {', '.join(groups) if groups else '所有组'}" for action, groups in merged)
@@ -0,0 +1,244 @@
+"""
+种子流：基于计数器的种子生成（Philox4x32-10），供 EGSEED 的种子流模式使用
+- 每个 (worker, 节点id) 是一条独立的流：worker 决定密钥，节点id 与流位置组成计数器
+  不同 worker 的密钥不同，同一 worker 内同一位置只会被发出一次
+- 同一位置总是得到同一个种子：记下起始位置即可复现整批种子
+- seeds_at 一次生成一整批（有 numpy 时向量化计算，否则逐个计算）
+- 各节点的下一个位置记录在内存映射的小文件（journal）中，重启后继续，不会重复发出
+worker id 取 KAIGUAN_WORKER_ID，未设置时为 主机名:ComfyUI端口
+journal 目录取 KAIGUAN_SEED_JOURNAL_DIR，未设置时为 ComfyUI 的 user 目录（不在 ComfyUI 中时为用户缓存目录）
+"""
+import atexit
+import hashlib
+import mmap
+import os
+import socket
+import struct
+import tempfile
+import threading
+
+from .kaiguan_log import logger
+
+# 与 EGSEED 的种子范围一致：种子取值 1..SEED_MAX
+SEED_MAX = 1125899906842624
+SEED_MASK = SEED_MAX - 1
+
+MASK32 = 0xFFFFFFFF
+PHILOX_M0 = 0xD2511F53
+PHILOX_M1 = 0xCD9E8D57
+PHILOX_W0 = 0x9E3779B9
+PHILOX_W1 = 0xBB67AE85
+PHILOX_ROUNDS = 10
+
+# journal 格式：文件头（魔数 + 槽位数）后接固定数量的槽位，每个槽位为 (流标识, 下一个位置)
+JOURNAL_MAGIC = b"KGSEED01"
+JOURNAL_HEADER = struct.Struct("<8sII")
+JOURNAL_SLOT = struct.Struct("<QQ")
+JOURNAL_SLOTS = 4096
+
+
+def philox4x32(counter, key, rounds=PHILOX_ROUNDS):
+    """单个分组的 Philox4x32：counter 为4个32位整数，key 为2个32位整数，返回4个32位整数"""
+    c0, c1, c2, c3 = counter
+    k0, k1 = key
+    for _ in range(rounds):
+        p0 = PHILOX_M0 * c0
+        p1 = PHILOX_M1 * c2
+        c0, c1, c2, c3 = ((p1 >> 32) ^ c1 ^ k0, p1 & MASK32, (p0 >> 32) ^ c3 ^ k1, p0 & MASK32)
+        k0 = (k0 + PHILOX_W0) & MASK32
+        k1 = (k1 + PHILOX_W1) & MASK32
+    return c0, c1, c2, c3
+
+
+def _philox4x32_numpy(np, c0, c1, c2, c3, key, rounds=PHILOX_ROUNDS):
+    """向量化的 Philox4x32：c0..c3 为 uint64 数组（取值在32位内）"""
+    m0 = np.uint64(PHILOX_M0)
+    m1 = np.uint64(PHILOX_M1)
+    mask = np.uint64(MASK32)
+    shift = np.uint64(32)
+    k0, k1 = key
+    for _ in range(rounds):
+        p0 = m0 * c0
+        p1 = m1 * c2
+        c0, c1, c2, c3 = ((p1 >> shift) ^ c1 ^ np.uint64(k0), p1 & mask,
+                          (p0 >> shift) ^ c3 ^ np.uint64(k1), p0 & mask)
+        k0 = (k0 + PHILOX_W0) & MASK32
+        k1 = (k1 + PHILOX_W1) & MASK32
+    return c0, c1
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _split64(value):
+    return value & MASK32, value >> 32
+
+
+def stream_id(node_id):
+    """节点的流标识（64位，非0）"""
+    return _hash64(f"node:{node_id}") or 1
+
+
+def seeds_at(worker_key, node_id, start, count):
+    """返回流中 start 起 count 个位置的种子（1..SEED_MAX）"""
+    if count <= 0:
+        return []
+    low, high = _split64(stream_id(node_id))
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    if np is None or count == 1:
+        seeds = []
+        for position in range(start, start + count):
+            out = philox4x32((position & MASK32, (position >> 32) & MASK32, low, high), worker_key)
+            seeds.append((((out[0] << 32) | out[1]) & SEED_MASK) + 1)
+        return seeds
+
+    positions = np.arange(start, start + count, dtype=np.uint64)
+    c0 = positions & np.uint64(MASK32)
+    c1 = positions >> np.uint64(32)
+    c2 = np.full(count, low, dtype=np.uint64)
+    c3 = np.full(count, high, dtype=np.uint64)
+    out0, out1 = _philox4x32_numpy(np, c0, c1, c2, c3, worker_key)
+    seeds = (((out0 << np.uint64(32)) | out1) & np.uint64(SEED_MASK)) + np.uint64(1)
+    return seeds.tolist()
+
+
+def default_worker_id():
+    worker_id = os.environ.get("KAIGUAN_WORKER_ID")
+    if worker_id:
+        return worker_id
+    port = None
+    try:
+        from server import PromptServer
+        port = getattr(PromptServer.instance, "port", None)
+    except Exception:
+        pass
+    host = socket.gethostname()
+    return f"{host}:{port}" if port else host
+
+
+def default_journal_dir():
+    journal_dir = os.environ.get("KAIGUAN_SEED_JOURNAL_DIR")
+    if journal_dir:
+        return journal_dir
+    try:
+        import folder_paths
+        return folder_paths.get_user_directory()
+    except Exception:
+        pass
+    # 不在 ComfyUI 中运行时写入用户缓存目录，不写进插件目录（可能只读，或随插件更新被清除）
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    if not cache_dir:
+        home = os.path.expanduser("~")
+        cache_dir = os.path.join(home, ".cache") if home != "~" else tempfile.gettempdir()
+    return os.path.join(cache_dir, "comfyui-kaiguan")
+
+
+class SeedJournal:
+    """
+    内存映射的计数器表：流标识 -> 下一个位置
+    写入直接落在映射的页面上，进程崩溃后由系统写回文件；退出时再 flush 一次
+    文件无法使用时退化为内存计数（重启后从0开始），并输出警告
+    """
+    def __init__(self, path, slots=JOURNAL_SLOTS):
+        self.path = path
+        self.slots = slots
+        self._mm = None
+        self._offsets = {}
+        self._memory = {}
+        try:
+            self._open()
+        except (OSError, ValueError) as e:
+            logger.warning("🎲 种子流 journal 无法使用，计数只保存在内存中: %s (%s)", path, e)
+
+    def _open(self):
+        size = JOURNAL_HEADER.size + JOURNAL_SLOT.size * self.slots
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != size:
+                if os.fstat(fd).st_size:
+                    logger.warning("🎲 种子流 journal 大小不符，重新创建: %s", self.path)
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        magic, slots, _ = JOURNAL_HEADER.unpack_from(self._mm, 0)
+        if magic != JOURNAL_MAGIC or slots != self.slots:
+            self._mm[:] = bytes(size)
+            JOURNAL_HEADER.pack_into(self._mm, 0, JOURNAL_MAGIC, self.slots, 0)
+        atexit.register(self.flush)
+
+    def _slot_offset(self, key):
+        """线性探测找到 key 的槽位（必要时占用空槽）；表已满时返回 None"""
+        offset = self._offsets.get(key)
+        if offset is not None:
+            return offset
+        for probe in range(self.slots):
+            offset = JOURNAL_HEADER.size + JOURNAL_SLOT.size * ((key + probe) % self.slots)
+            stored, _ = JOURNAL_SLOT.unpack_from(self._mm, offset)
+            if stored == key or stored == 0:
+                if stored == 0:
+                    JOURNAL_SLOT.pack_into(self._mm, offset, key, 0)
+                self._offsets[key] = offset
+                return offset
+        return None
+
+    def advance(self, key, count):
+        """返回 key 当前的位置，并把位置前移 count（调用方负责加锁）"""
+        offset = self._slot_offset(key) if self._mm is not None else None
+        if offset is None:
+            start = self._memory.get(key, 0)
+            self._memory[key] = start + count
+            return start
+        _, start = JOURNAL_SLOT.unpack_from(self._mm, offset)
+        JOURNAL_SLOT.pack_into(self._mm, offset, key, start + count)
+        return start
+
+    def flush(self):
+        if self._mm is not None and not self._mm.closed:
+            self._mm.flush()
+
+
+class SeedStreams:
+    """一个 worker 的全部种子流"""
+    def __init__(self, worker_id=None, journal_dir=None):
+        self.worker_id = worker_id or default_worker_id()
+        worker_hash = _hash64(f"worker:{self.worker_id}")
+        self.key = _split64(worker_hash)
+        path = os.path.join(journal_dir or default_journal_dir(), f"kaiguan_seed_{worker_hash:016x}.journal")
+        self.journal = SeedJournal(path)
+        self._lock = threading.Lock()
+
+    def reserve(self, node_id, count=1):
+        """为节点预留 count 个位置，返回起始位置"""
+        with self._lock:
+            return self.journal.advance(stream_id(node_id), count)
+
+    def seeds_at(self, node_id, start, count=1):
+        return seeds_at(self.key, node_id, start, count)
+
+    def draw(self, node_id, count=1):
+        """预留并生成 count 个种子，返回 (起始位置, 种子列表)"""
+        start = self.reserve(node_id, count)
+        return start, self.seeds_at(node_id, start, count)
+
+
+_streams = None
+_streams_lock = threading.Lock()
+
+
+def seed_streams():
+    """当前进程的种子流（第一次使用时打开 journal）"""
+    global _streams
+    if _streams is None:
+        with _streams_lock:
+            if _streams is None:
+                _streams = SeedStreams()
+                logger.info("🎲 种子流已启用: worker=%s journal=%s", _streams.worker_id, _streams.journal.path)
+    return _streams
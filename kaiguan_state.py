@@ -0,0 +1,111 @@
+"""
+组状态通道：后端线程安全的组状态存储
+控制节点执行时记录动作，并立即通过 PromptServer.send_sync 推送给前端，
+前端直接使用消息中已解析好的组列表与条件结果，无需轮询或重新解析控件。
+"""
+import threading
+import time
+
+from .kaiguan_log import logger
+
+# 前端监听的事件名
+GROUP_STATE_EVENT = "kaiguan.group_state"
+
+# 组列表为空表示控制所有组，在状态表中使用该键记录
+ALL_GROUPS = "*"
+
+
+def _get_prompt_server():
+    try:
+        from server import PromptServer
+    except ImportError:
+        return None
+    return getattr(PromptServer, "instance", None)
+
+
+class GroupStateStore:
+    """
+    记录每个组最近一次被设置的动作
+    - publish: 控制节点执行后调用，计算变化并推送给前端
+    - publish_actions: 同上，一条消息携带同一节点的多个动作
+    - snapshot: 当前全部组状态
+    - subscribe: 登记监听函数，每次推送时以消息内容调用（如运行指标）
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+        self._version = 0
+        self._listeners = []
+
+    def subscribe(self, listener):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def publish(self, node_id, node_type, action, groups, condition_result=None):
+        """记录控制动作并推送消息，返回推送的消息内容"""
+        return self.publish_actions(node_id, node_type, [(action, groups)], condition_result)
+
+    def publish_actions(self, node_id, node_type, actions, condition_result=None):
+        """
+        一次推送同一节点的多个控制动作（如规则表合并后的动作列表）
+        消息的 actions 字段按顺序列出全部动作，前端在同一帧内依次应用；
+        action/groups 字段保留最后一个动作，兼容只读取单个动作的监听函数
+        """
+        actions = [(action, list(groups) if groups else []) for action, groups in actions]
+        timestamp = time.time()
+        with self._lock:
+            changes = {}
+            for action, groups in actions:
+                if action == "不变":
+                    continue
+                for key in groups or [ALL_GROUPS]:
+                    previous = self._states.get(key)
+                    if previous is None or previous["action"] != action:
+                        changes[key] = action
+                    self._states[key] = {"action": action, "node_id": node_id, "timestamp": timestamp}
+            self._version += 1
+            last_action, last_groups = actions[-1] if actions else ("不变", [])
+            message = {
+                "version": self._version,
+                "node_id": node_id,
+                "node_type": node_type,
+                "action": last_action,
+                "groups": last_groups,
+                "actions": [{"action": action, "groups": groups} for action, groups in actions],
+                "condition_result": condition_result,
+                "changes": changes,
+            }
+        self._send(message)
+        for listener in self._listeners:
+            try:
+                listener(message)
+            except Exception as e:
+                logger.warning("🌐 组状态监听函数出错: %s", e)
+        return message
+
+    def _send(self, message):
+        server = _get_prompt_server()
+        if server is None:
+            return
+        try:
+            server.send_sync(GROUP_STATE_EVENT, message)
+        except Exception as e:
+            logger.warning("🌐 组状态推送失败: %s", e)
+
+    def snapshot(self):
+        with self._lock:
+            return {group: dict(state) for group, state in self._states.items()}
+
+    def groups_with_action(self, action):
+        with self._lock:
+            return {group: dict(state) for group, state in self._states.items() if state["action"] == action}
+
+    def clear(self, action=None):
+        with self._lock:
+            if action is None:
+                self._states.clear()
+            else:
+                self._states = {group: state for group, state in self._states.items() if state["action"] != action}
+
+
+group_state = GroupStateStore()
@@ -0,0 +1,431 @@
+"""
+开关组合展开：把同一个工作流按多组开关设置（笛卡尔积）展开为多个提示词，按剪枝后的等效图去重
+- 轴可以是节点输入（如 BooleanSkipNode 的 condition、GlobalGroupConditionNode 的 comparison_value），
+  也可以是组的状态（enable / disable / bypass，与批量提交接口的组覆盖设置相同）
+- 每个组合先按后端组控制剪枝，再从输出节点向上计算每个节点的签名（节点类型 + 控件值 + 上游签名），
+  被跳过的分支不计入签名；输出节点签名相同的组合视为同一个图，只提交一次
+- 剪枝与签名都是增量的：以第一个组合为基准，之后的组合只处理轴所在的节点、禁用/屏蔽状态改变的节点及其下游
+- 靠近源头的轴变化最慢，相邻提交的提示词共用尽可能多的上游节点，ComfyUI 的缓存可以直接复用
+"""
+import hashlib
+import itertools
+import json
+
+from .kaiguan_core import is_link
+from .kaiguan_prune import (
+    ACTION_BYPASS, BypassResolver, WorkflowGroupIndex, group_modes, override_actions, pruned_node, resolve_actions,
+    split_modes,
+)
+
+# 单次展开的组合数上限
+# 每个组合只重新计算受轴影响的节点及其下游，耗时随这部分节点数增长（而不是整个工作流的节点数）
+MAX_COMBINATIONS = 4096
+
+# 第0个输出原样传递某个输入的控制节点：只有第0个输出被使用时，节点对结果没有影响
+PASSTHROUGH_INPUTS = {
+    "GlobalGroupConditionNode": "input_value",
+    "GroupRuleTableNode": "input_value",
+    "FlowBypassGroupNode": "flow_input",
+}
+
+SKIPPED = "<skipped>"
+
+
+class SweepError(ValueError):
+    """轴定义无效或组合数过多"""
+
+
+class Axis:
+    """一个展开维度：节点输入（node_id + input）或组状态（group）"""
+    __slots__ = ("node_id", "input", "group", "values")
+
+    def __init__(self, spec):
+        if not isinstance(spec, dict) or not isinstance(spec.get("values"), list) or not spec["values"]:
+            raise SweepError(f"轴定义无效（需要非空的 values 列表）: {spec!r}")
+        self.values = spec["values"]
+        self.group = spec.get("group")
+        self.node_id = str(spec["node"]) if "node" in spec else None
+        self.input = spec.get("input")
+        if self.group is None and (self.node_id is None or not self.input):
+            raise SweepError(f"轴需要 node + input，或 group: {spec!r}")
+
+    @property
+    def label(self):
+        return f"group:{self.group}" if self.group is not None else f"{self.node_id}.{self.input}"
+
+
+def _digest(*parts):
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(part.encode("utf-8", "surrogatepass"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def _value_text(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        # 控件值绝大多数是标量，repr 足以区分类型与取值
+        return repr(value)
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _node_depths(prompt):
+    """节点到源头的最长距离（源节点为0）；成环的连线不计入"""
+    depths = {}
+    visiting = set()
+    for start in prompt:
+        stack = [start]
+        while stack:
+            node_id = stack[-1]
+            if node_id in depths:
+                stack.pop()
+                continue
+            visiting.add(node_id)
+            sources = [v[0] for v in (prompt[node_id].get("inputs") or {}).values() if is_link(v) and v[0] in prompt]
+            pending = [source for source in sources if source not in depths and source not in visiting]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            visiting.discard(node_id)
+            depths[node_id] = 1 + max((depths[source] for source in sources if source in depths), default=-1)
+    return depths
+
+
+def order_axes(prompt, axes):
+    """靠近源头的节点轴排在前面（变化最慢），组状态轴排在最后"""
+    depths = _node_depths(prompt)
+    return sorted(axes, key=lambda axis: (axis.group is not None, depths.get(axis.node_id, 0)))
+
+
+class GraphSignature:
+    """计算剪枝后提示词中各节点的签名；签名相同的节点在 ComfyUI 中得到相同的输出"""
+
+    def __init__(self, prompt, signatures=None, entries=None):
+        # signatures / entries 可以传入已知不变的节点的结果（增量计算时沿用上一个图的结果）
+        self.prompt = prompt
+        self._signatures = signatures if signatures is not None else {}
+        self._entries = entries if entries is not None else {}
+
+    def _constant(self, node, name):
+        value = (node.get("inputs") or {}).get(name)
+        return None if is_link(value) else value
+
+    def _effective_link(self, link):
+        """
+        开关节点可以提前确定输出时，把对它的引用换成它实际传递的上游连线
+        返回 (连线或None, 常量签名或None)
+        """
+        seen = set()
+        while is_link(link) and link[0] in self.prompt and link[0] not in seen:
+            source_id, slot = link
+            seen.add(source_id)
+            node = self.prompt[source_id]
+            class_type = node.get("class_type")
+            inputs = node.get("inputs") or {}
+
+            if class_type in PASSTHROUGH_INPUTS and slot == 0:
+                passed = inputs.get(PASSTHROUGH_INPUTS[class_type])
+            elif class_type == "BooleanSkipNode" and slot == 0 and self._static_bool(node) is not None:
+                # 忽略组/禁用组/混合开关模式下第0个输出总是传递输入
+                if self._static_bool(node) or inputs.get("control_type") in ("忽略组", "禁用组", "混合开关"):
+                    passed = inputs.get("input")
+                else:
+                    return None, SKIPPED
+            elif class_type == "LogicSkipNode" and slot == 0 and self._static_logic(node) is not None:
+                if not self._static_logic(node):
+                    return None, SKIPPED
+                passed = inputs.get("input")
+            else:
+                return link, None
+
+            if not is_link(passed):
+                return None, "const:" + _value_text(passed)
+            link = passed
+        return link, None
+
+    def _static_bool(self, node):
+        condition = self._constant(node, "condition")
+        invert = self._constant(node, "invert")
+        if condition is None or invert is None:
+            return None
+        return bool(condition) != bool(invert)
+
+    def _static_logic(self, node):
+        """LogicSkipNode：条件为False时直接传递；输入为常量时可以提前比较"""
+        inputs = node.get("inputs") or {}
+        if any(is_link(inputs.get(name)) for name in ("condition", "comparison_type", "comparison_value")):
+            return None
+        if not inputs.get("condition", True):
+            return True
+        if is_link(inputs.get("input")) or "input" not in inputs:
+            return None
+        # 比较模块会导入 numpy/torch，只在需要时导入
+        from .kaiguan_compare import compile_comparison
+        try:
+            predicate = compile_comparison(inputs.get("comparison_type", "等于"), inputs.get("comparison_value", ""))
+            return bool(predicate(inputs["input"]))
+        except Exception:
+            return None
+
+    def _inputs_of(self, node_id):
+        """返回 [(输入名, 连线或None, 常量签名或None)]"""
+        entries = self._entries.get(node_id)
+        if entries is None:
+            entries = self._entries[node_id] = self._collect_inputs(node_id)
+        return entries
+
+    def _collect_inputs(self, node_id):
+        node = self.prompt[node_id]
+        class_type = node.get("class_type")
+        entries = []
+        for name, value in sorted((node.get("inputs") or {}).items()):
+            if is_link(value):
+                link, constant = self._effective_link(value)
+                entries.append((name, link, constant))
+            elif class_type == "BooleanSkipNode" and name in ("condition", "invert") \
+                    and self._static_bool(node) is not None:
+                # 条件与反转只以最终结果参与签名
+                entries.append((name, None, f"effective:{self._static_bool(node)}" if name == "condition" else ""))
+            else:
+                entries.append((name, None, _value_text(value)))
+        return entries
+
+    def node_signature(self, node_id):
+        """节点签名（迭代计算，深链不会超出递归深度）"""
+        signatures = self._signatures
+        visiting = set()
+        stack = [node_id]
+        while stack:
+            current = stack[-1]
+            if current in signatures:
+                stack.pop()
+                continue
+            visiting.add(current)
+            entries = self._inputs_of(current)
+            pending = [link[0] for _, link, _ in entries
+                       if link is not None and link[0] in self.prompt and link[0] not in signatures]
+            if any(source in visiting for source in pending):
+                # 成环的提示词无法执行，按节点id区分即可
+                signatures[current] = _digest("cycle", current)
+                continue
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            visiting.discard(current)
+            parts = [self.prompt[current].get("class_type") or ""]
+            for name, link, constant in entries:
+                if link is None:
+                    parts.append(f"{name}={constant}")
+                elif link[0] in signatures:
+                    parts.append(f"{name}=>{signatures[link[0]]}:{link[1]}")
+                else:
+                    # 指向不存在的节点（已被剪枝），与未连接相同
+                    parts.append(f"{name}=<missing>")
+            signatures[current] = _digest(*parts)
+        return signatures[node_id]
+
+    def reachable_signatures(self, output_ids):
+        """输出节点及其上游（跳过的分支除外）的签名集合"""
+        for output_id in output_ids:
+            self.node_signature(output_id)
+        reachable = set()
+        stack = list(output_ids)
+        while stack:
+            current = stack.pop()
+            if current in reachable:
+                continue
+            reachable.add(current)
+            stack.extend(link[0] for _, link, _ in self._inputs_of(current)
+                         if link is not None and link[0] in self._signatures)
+        return {self._signatures[node_id] for node_id in reachable}
+
+
+def output_nodes(prompt, node_types):
+    """输出节点id；缺少节点类信息时以没有下游的节点作为输出"""
+    outputs = [node_id for node_id, node in prompt.items()
+               if getattr(node_types.get(node.get("class_type")), "OUTPUT_NODE", False)]
+    if outputs:
+        return outputs
+    consumed = {value[0] for node in prompt.values() for value in (node.get("inputs") or {}).values()
+                if is_link(value)}
+    return [node_id for node_id in prompt if node_id not in consumed]
+
+
+def graph_hash(prompt, node_types):
+    """返回 (图签名, 可达节点签名集合)"""
+    signature = GraphSignature(prompt)
+    outputs = sorted(output_nodes(prompt, node_types))
+    parts = [f"{node_id}:{signature.node_signature(node_id)}" for node_id in outputs]
+    return _digest(*parts), signature.reachable_signatures(outputs)
+
+
+class _PrunedView:
+    """
+    剪枝后提示词的只读视图：nodes 中重新剪枝的节点优先，hidden 中的节点（已禁用/屏蔽）不可见，
+    其余节点取自基准（第一个组合剪枝后的提示词）
+    """
+    __slots__ = ("base", "nodes", "hidden")
+
+    def __init__(self, base, nodes, hidden):
+        self.base = base
+        self.nodes = nodes
+        self.hidden = hidden
+
+    def __contains__(self, node_id):
+        return node_id in self.nodes or (node_id in self.base and node_id not in self.hidden)
+
+    def __getitem__(self, node_id):
+        node = self.nodes.get(node_id)
+        if node is None:
+            if node_id in self.hidden:
+                raise KeyError(node_id)
+            node = self.base[node_id]
+        return node
+
+    def items(self):
+        for node_id, node in self.base.items():
+            if node_id not in self.nodes and node_id not in self.hidden:
+                yield node_id, node
+        yield from self.nodes.items()
+
+
+class SweepGraphs:
+    """
+    逐个组合计算剪枝后的图签名，只重新处理变化的部分
+    第一个组合完整剪枝并计算签名作为基准；之后的组合中，轴所在的节点、禁用/屏蔽状态与基准不同的节点
+    以及它们在原提示词中的全部下游节点重新剪枝、重新计算签名，其余节点的输入与上游都与基准相同，沿用基准的结果
+    """
+    def __init__(self, prompt, index, controller_classes, node_types, axes):
+        self.index = index
+        self.controller_classes = controller_classes
+        self.node_types = node_types
+        self.declared_outputs = sorted(node_id for node_id, node in prompt.items()
+                                       if getattr(node_types.get(node.get("class_type")), "OUTPUT_NODE", False))
+        self.axis_nodes = {axis.node_id for axis in axes if axis.group is None}
+        self.consumers = {}
+        for node_id, node in prompt.items():
+            for value in (node.get("inputs") or {}).values():
+                if is_link(value):
+                    self.consumers.setdefault(value[0], set()).add(node_id)
+        self._base = None
+
+    def _modes(self, prompt, overrides):
+        """{节点id: 禁用组/屏蔽组}"""
+        actions = resolve_actions(prompt, self.controller_classes, self.node_types) + override_actions(overrides)
+        modes, _ = group_modes(actions, self.index)
+        removed, bypassed = split_modes(prompt, modes)
+        return {node_id: modes[node_id] for node_id in removed | bypassed}
+
+    def _downstream(self, seeds):
+        dirty = set()
+        stack = list(seeds)
+        while stack:
+            node_id = stack.pop()
+            if node_id in dirty:
+                continue
+            dirty.add(node_id)
+            stack.extend(self.consumers.get(node_id, ()))
+        return dirty
+
+    def _outputs(self, view):
+        outputs = [node_id for node_id in self.declared_outputs if node_id in view]
+        if outputs:
+            return outputs
+        return sorted(output_nodes(dict(view.items()), self.node_types))
+
+    def signature(self, prompt, overrides):
+        """返回 (图签名, GraphSignature, 输出节点id)；prompt 为已应用轴设置的提示词"""
+        modes = self._modes(prompt, overrides)
+        bypassed = {node_id for node_id, action in modes.items() if action == ACTION_BYPASS}
+        removed = set(modes) - bypassed
+        resolver = BypassResolver(prompt, bypassed, self.node_types)
+
+        if self._base is None:
+            pruned = {node_id: pruned_node(prompt, node, resolver, removed) for node_id, node in prompt.items()
+                      if node_id not in modes}
+            graph = GraphSignature(pruned)
+            outputs = self._outputs(_PrunedView(pruned, {}, set()))
+            for node_id in outputs:
+                graph.node_signature(node_id)
+            self._base = (pruned, modes, graph)
+        else:
+            base_prompt, base_modes, base_graph = self._base
+            changed = {node_id for node_id in modes.keys() | base_modes.keys()
+                       if modes.get(node_id) != base_modes.get(node_id)}
+            dirty = self._downstream(self.axis_nodes | changed)
+            nodes = {node_id: pruned_node(prompt, prompt[node_id], resolver, removed) for node_id in dirty
+                     if node_id in prompt and node_id not in modes}
+            signatures = dict(base_graph._signatures)
+            entries = dict(base_graph._entries)
+            for node_id in dirty:
+                signatures.pop(node_id, None)
+                entries.pop(node_id, None)
+            view = _PrunedView(base_prompt, nodes, modes.keys())
+            graph = GraphSignature(view, signatures, entries)
+            outputs = self._outputs(view)
+
+        digest = _digest(*(f"{node_id}:{graph.node_signature(node_id)}" for node_id in outputs))
+        return digest, graph, outputs
+
+
+def _apply_settings(prompt, axes, combination):
+    """返回 (新提示词, 组覆盖设置, 设置描述)；只复制被修改的节点"""
+    result = dict(prompt)
+    overrides = {}
+    settings = {}
+    for axis, value in zip(axes, combination):
+        settings[axis.label] = value
+        if axis.group is not None:
+            overrides[axis.group] = value
+            continue
+        if axis.node_id not in result:
+            raise SweepError(f"提示词中没有节点 {axis.node_id}")
+        node = result[axis.node_id]
+        result[axis.node_id] = dict(node, inputs=dict(node.get("inputs") or {}, **{axis.input: value}))
+    return result, overrides, settings
+
+
+def expand_sweep(prompt, workflow, axis_specs, controller_classes, node_types=None, limit=MAX_COMBINATIONS):
+    """
+    展开全部组合并去重，返回 (unique, combinations)
+    - unique: 按提交顺序排列的 [{"prompt", "groups", "settings", "graph_hash", "reused_nodes", "duplicates"}]
+      reused_nodes 为与上一个提交共用的节点数（可直接命中 ComfyUI 缓存）
+    - combinations: 每个组合的 {"settings", "graph_hash", "job"}，job 为对应的 unique 下标
+    """
+    node_types = node_types or {}
+    axes = order_axes(prompt, [Axis(spec) for spec in axis_specs])
+    total = 1
+    for axis in axes:
+        total *= len(axis.values)
+    if total > limit:
+        raise SweepError(f"组合数 {total} 超过上限 {limit}")
+
+    graphs = SweepGraphs(prompt, WorkflowGroupIndex.from_workflow(workflow), controller_classes, node_types, axes)
+    unique = []
+    by_hash = {}
+    combinations = []
+    previous = set()
+    for combination in itertools.product(*(axis.values for axis in axes)):
+        combo_prompt, overrides, settings = _apply_settings(prompt, axes, combination)
+        digest, graph, outputs = graphs.signature(combo_prompt, overrides)
+
+        job = by_hash.get(digest)
+        if job is None:
+            # 可达节点的签名集合只在新任务上计算
+            signatures = graph.reachable_signatures(outputs)
+            job = by_hash[digest] = len(unique)
+            unique.append({
+                "prompt": combo_prompt,
+                "groups": overrides,
+                "settings": settings,
+                "graph_hash": digest,
+                "reused_nodes": len(signatures & previous),
+                "duplicates": 0,
+            })
+            previous = signatures
+        else:
+            unique[job]["duplicates"] += 1
+        combinations.append({"settings": settings, "graph_hash": digest, "job": job})
+    return unique, combinations
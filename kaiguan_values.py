@@ -0,0 +1,142 @@
+"""
+值类型识别：按类型快速分类节点输入，避免对张量、LATENT、CONDITIONING、模型等大对象做 str()/repr()
+- value_kind: 按类型分发（精确类型查表，失败再走 isinstance）
+- comparable_text: 比较用的字符串形式，大对象返回简短摘要
+- brief: 日志用的惰性截断表示，只有真正输出日志时才生成字符串
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+KIND_NONE = "none"
+KIND_SCALAR = "scalar"
+KIND_TEXT = "text"
+KIND_TENSOR = "tensor"
+KIND_LATENT = "latent"
+KIND_CONDITIONING = "conditioning"
+KIND_CONTEXT = "context"
+KIND_CONTAINER = "container"
+KIND_OBJECT = "object"
+
+# 非大对象的类型（str() 开销可控）
+LIGHT_KINDS = frozenset((KIND_NONE, KIND_SCALAR, KIND_TEXT, KIND_CONTAINER))
+
+# 日志中单个值的默认截断长度
+BRIEF_LIMIT = 120
+
+_KIND_BY_TYPE = {
+    type(None): KIND_NONE,
+    bool: KIND_SCALAR,
+    int: KIND_SCALAR,
+    float: KIND_SCALAR,
+    complex: KIND_SCALAR,
+    str: KIND_TEXT,
+    bytes: KIND_TEXT,
+}
+
+
+def _is_tensor(value):
+    if torch is not None and isinstance(value, torch.Tensor):
+        return True
+    return np is not None and isinstance(value, np.ndarray)
+
+
+def _is_light_item(value):
+    # 嵌套的列表/字典递归判断，只有含张量、模型等大对象时才整体视为大对象
+    return type(value) in _KIND_BY_TYPE or value_kind(value) in LIGHT_KINDS
+
+
+def _container_kind(value):
+    if isinstance(value, dict):
+        if "samples" in value and _is_tensor(value["samples"]):
+            return KIND_LATENT
+        if "model" in value and "clip" in value:
+            return KIND_CONTEXT
+        items = value.values()
+    else:
+        # CONDITIONING: [[tensor, dict], ...]
+        if value and isinstance(value[0], (list, tuple)) and value[0] and _is_tensor(value[0][0]):
+            return KIND_CONDITIONING
+        items = value
+    # 不限制元素个数：提示词列表等轻量容器无论多长都保留完整文本，"包含"等比较才能看到全部元素
+    if all(_is_light_item(item) for item in items):
+        return KIND_CONTAINER
+    return KIND_OBJECT
+
+
+def value_kind(value):
+    """返回值的类别（KIND_* 常量之一）"""
+    kind = _KIND_BY_TYPE.get(type(value))
+    if kind is not None:
+        return kind
+    if _is_tensor(value):
+        return KIND_TENSOR
+    if np is not None and isinstance(value, np.generic):
+        return KIND_SCALAR
+    if isinstance(value, (bool, int, float)):
+        return KIND_SCALAR
+    if isinstance(value, str):
+        return KIND_TEXT
+    if isinstance(value, (list, tuple, dict)):
+        return _container_kind(value)
+    return KIND_OBJECT
+
+
+def is_heavy(value):
+    """是否为不应转字符串的大对象"""
+    return value_kind(value) not in LIGHT_KINDS
+
+
+def summarize(value, kind=None):
+    """生成大对象的简短描述（不访问张量数据）"""
+    if kind is None:
+        kind = value_kind(value)
+    if kind == KIND_TENSOR:
+        return f"{type(value).__name__}(shape={tuple(value.shape)}, dtype={value.dtype})"
+    if kind == KIND_LATENT:
+        return f"LATENT({summarize(value['samples'], KIND_TENSOR)})"
+    if kind == KIND_CONDITIONING:
+        return f"CONDITIONING(len={len(value)})"
+    if kind == KIND_CONTEXT:
+        return f"CONTEXT(keys={len(value)})"
+    if isinstance(value, (list, tuple, dict)):
+        return f"{type(value).__name__}(len={len(value)})"
+    return f"<{type(value).__name__}>"
+
+
+def comparable_text(value):
+    """比较用的字符串形式：轻量值与原先 str() 一致，大对象返回摘要"""
+    if type(value) is str:
+        return value
+    kind = value_kind(value)
+    if kind in LIGHT_KINDS:
+        return str(value)
+    return summarize(value, kind)
+
+
+class _Brief:
+    """惰性截断表示：格式化时才生成字符串"""
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value, limit):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        text = comparable_text(self.value)
+        if len(text) > self.limit:
+            return f"{text[:self.limit]}...(共{len(text)}字符)"
+        return text
+
+    __repr__ = __str__
+
+
+def brief(value, limit=BRIEF_LIMIT):
+    """日志参数包装：只有日志级别允许输出时才会生成（截断后的）字符串"""
+    return _Brief(value, limit)
@@ -1,8 +1,11 @@
+from .kaiguan_core import cached_input_types
+
 class GroupSwitchNode:
     def __init__(self):
         pass
 
     @classmethod
+    @cached_input_types
     def INPUT_TYPES(cls):
         return {
             "required": {
@@ -1,20 +1,8 @@
-def is_context_empty(ctx):
-    return not ctx or all(v is None for v in ctx.values())
-
-def get_name(name):
-    return '{}'.format(name)
-
-class AnyType(str):
-    def __ne__(self, __value: object) -> bool:
-        return False
-
-any_type = AnyType("*")
-
-def is_none(value):
-    if value is not None:
-        if isinstance(value, dict) and 'model' in value and 'clip' in value:
-            return is_context_empty(value)
-    return value is None
+from .kaiguan_core import any_type, cached_input_types
+from .kaiguan_lazy import lazy_options
+from .kaiguan_lists import as_list, broadcast, first, list_outputs, partition
+from .kaiguan_log import logger
+from .kaiguan_release import release_dead_inputs
 
 class BooleanSkipNode:
     """
@@ -24,15 +12,17 @@ class BooleanSkipNode:
         pass
     
     @classmethod
+    @cached_input_types
     def INPUT_TYPES(cls):
         return {
             "required": {
                 "condition": ("BOOLEAN", {"default": True}),
-                "input": (any_type,),
+                "input": (any_type, lazy_options()),
                 "invert": ("BOOLEAN", {"default": False}),
                 "control_type": (["跳过节点", "忽略组", "禁用组", "混合开关"], {"default": "跳过节点"}),
             },
             "optional": {},
+            "hidden": {"prompt": "PROMPT", "unique_id": "UNIQUE_ID"},
         }
 
     RETURN_TYPES = (any_type, "*", "*", "*")
@@ -40,19 +30,29 @@ class BooleanSkipNode:
     FUNCTION = "execute"
     CATEGORY = "2🐕kaiguan"
 
-    def execute(self, condition, input, invert, control_type):
+    def check_lazy_status(self, condition, invert, control_type, input=None, prompt=None, unique_id=None):
+        # 跳过节点模式下条件为False时输出None，此时无需计算输入分支
+        if invert:
+            condition = not condition
+        if not condition and control_type not in ("忽略组", "禁用组", "混合开关"):
+            return []
+        return ["input"]
+
+    def execute(self, condition, input, invert, control_type, prompt=None, unique_id=None):
         # 如果invert为True，则反转条件
         if invert:
             condition = not condition
         
         # 打印调试信息
-        print(f"布尔跳过节点: 条件={condition}, 反转={invert}, 控制类型={control_type}")
+        logger.debug("布尔跳过节点: 条件=%s, 反转=%s, 控制类型=%s", condition, invert, control_type)
         
         # 根据控制类型和条件返回不同的输出
         if control_type == "跳过节点":
             if condition:
                 return (input, None, None, None)
             else:
+                # 输入分支未被计算，上游节点之前缓存的输出也不再需要
+                release_dead_inputs(prompt, unique_id, ("input",))
                 return (None, None, None, None)
         elif control_type == "忽略组":
             return (input, condition, None, None)
@@ -67,10 +67,62 @@ class BooleanSkipNode:
             else:
                 return (None, None, None, None)
 
+class BooleanSkipListNode:
+    """
+    列表布尔跳过节点：一次收到整个列表，condition 可以是单个布尔值，也可以是与输入等长的布尔列表（逐元素开关）
+    输出通过/跳过的元素列表及其在原列表中的序号；所有条件都为False时不计算输入分支
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    @cached_input_types
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "condition": ("BOOLEAN", {"default": True}),
+                "input": (any_type, lazy_options()),
+                "invert": ("BOOLEAN", {"default": False}),
+            },
+            "optional": {},
+            "hidden": {"prompt": "PROMPT", "unique_id": "UNIQUE_ID"},
+        }
+
+    INPUT_IS_LIST = True
+    RETURN_TYPES = (any_type, "INT", any_type, "INT", "INT")
+    RETURN_NAMES = ("输出", "通过序号", "跳过", "跳过序号", "通过数量")
+    OUTPUT_IS_LIST = (True, True, True, True, False)
+    FUNCTION = "execute"
+    CATEGORY = "2🐕kaiguan"
+
+    @staticmethod
+    def _conditions(condition, invert):
+        invert = bool(first(invert, False))
+        return [bool(flag) != invert for flag in as_list(condition)]
+
+    def check_lazy_status(self, condition, invert, input=None, prompt=None, unique_id=None):
+        # 所有元素的条件都为False时无需计算输入分支
+        return ["input"] if any(self._conditions(condition, invert)) else []
+
+    def execute(self, condition, input, invert, prompt=None, unique_id=None):
+        conditions = self._conditions(condition, invert)
+        if not any(conditions):
+            # 输入分支未被计算，上游节点之前缓存的输出也不再需要
+            release_dead_inputs(first(prompt), first(unique_id), ("input",))
+            return list_outputs([], [], [], [])
+
+        items = as_list(input)
+        mask = broadcast(conditions, len(items), False)
+        outputs = list_outputs(*partition(items, mask))
+        logger.debug("列表布尔跳过节点: 通过=%d/%d", outputs[4], len(items))
+        return outputs
+
 NODE_CLASS_MAPPINGS = {
-    "BooleanSkipNode": BooleanSkipNode
+    "BooleanSkipNode": BooleanSkipNode,
+    "BooleanSkipListNode": BooleanSkipListNode,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
-    "BooleanSkipNode": "逻辑开关🔄"
+    "BooleanSkipNode": "逻辑开关🔄",
+    "BooleanSkipListNode": "列表逻辑开关🔄",
 }
\ No newline at end of file
@@ -1,35 +1,6 @@
-def is_context_empty(ctx):
-    return not ctx or all(v is None for v in ctx.values())
-
-def get_name(name):
-    return '{}'.format(name)
-
-class AnyType(str):
-    def __ne__(self, __value: object) -> bool:
-        return False
-
-any_type = AnyType("*")
-
-def is_none(value):
-    if value is not None:
-        if isinstance(value, dict) and 'model' in value and 'clip' in value:
-            return is_context_empty(value)
-    return value is None
-
-def convert_to_int(value):
-    try:
-        return int(value)
-    except ValueError:
-        return None
-
-def convert_to_float(value):
-    try:
-        return float(value)
-    except ValueError:
-        return None
-
-def convert_to_str(value):
-    return str(value)
+from .kaiguan_core import any_type, cached_input_types
+from .kaiguan_empty import is_truthy
+from .kaiguan_log import logger
 
 class hulue:
 
@@ -37,6 +8,7 @@ class hulue:
         pass
     
     @classmethod
+    @cached_input_types
     def INPUT_TYPES(cls):
         return {
             "required": {"*": (any_type,)},
@@ -49,10 +21,11 @@ class hulue:
     CATEGORY = "2🐕kaiguan"
 
     def execute(self, any_type):
-        if any_type:
-            print("Switch is ON")
+        # 按类型判断真假，张量等大对象不会被整体求值
+        if is_truthy(any_type):
+            logger.debug("Switch is ON")
         else:
-            print("Switch is OFF")
+            logger.debug("Switch is OFF")
 
 NODE_CLASS_MAPPINGS = {
     "hulue": hulue
@@ -1,9 +1,11 @@
 import torch
 import random
 import json
+from .kaiguan_core import cached_input_types
 
 class EGRWGL:
     @classmethod
+    @cached_input_types
     def INPUT_TYPES(cls):
         return {
             "hidden": {
@@ -1,40 +1,119 @@
 import random
+import threading
 from datetime import datetime
+from .kaiguan_core import cached_input_types
+from .kaiguan_seed import seed_streams
 def category_type():
     return "utils"
 
 def node_name(name):
     return f"ergouzi {name}"
-initial_random_state = random.getstate()
-random.seed(datetime.now().timestamp())
-ergouziseed_random_state = random.getstate()
-random.setstate(initial_random_state)
+
+# 随机种子模式
+RANDOM_SEED_VALUES = (-1, -2, -3)
+SEED_MAX = 1125899906842624
+
+# 一次输出的种子个数上限
+BATCH_MAX = 4096
+
+# 独立的随机数生成器，不读写全局 random 状态
+_seed_random = random.Random(datetime.now().timestamp())
+_seed_lock = threading.Lock()
 
 
 def generate_unique_seed():
-    global ergouziseed_random_state
-    prev_random_state = random.getstate()
-    random.setstate(ergouziseed_random_state)
-    seed = random.randint(1, 1125899906842624)
-    ergouziseed_random_state = random.getstate()
-    random.setstate(prev_random_state)
+    with _seed_lock:
+        return _seed_random.randint(1, SEED_MAX)
+
+
+# IS_CHANGED 预留的种子：节点id -> (模式, 种子)
+# ComfyUI 调用 IS_CHANGED 时 PROMPT 是一个空字典，无法与执行时的 prompt 对应，
+# 因此只按节点id预留：同一节点的 IS_CHANGED 总在 main 之前调用，main 取出后即删除，只消耗一次随机数
+_reserved_seeds = {}
+
+
+def reserve_seed(unique_id, draw=generate_unique_seed, mode=None):
+    """预留一个随机值（默认为种子；种子流模式下为流的起始位置），mode 区分不同的取值方式"""
+    seed = draw()
+    if unique_id is not None:
+        with _seed_lock:
+            _reserved_seeds[str(unique_id)] = (mode, seed)
     return seed
 
 
+def take_reserved_seed(unique_id, mode=None):
+    """取出预留的值（只能取一次）；没有预留或取值方式不同时返回None"""
+    if unique_id is None:
+        return None
+    with _seed_lock:
+        entry = _reserved_seeds.pop(str(unique_id), None)
+    if entry is None or entry[0] != mode:
+        return None
+    return entry[1]
+
+
+# 工作流节点索引缓存：id(nodes列表) -> (nodes列表, 节点数, {节点id: 节点})
+WORKFLOW_INDEX_CACHE_SIZE = 8
+_workflow_index_cache = {}
+
+
+def workflow_node_index(nodes):
+    key = id(nodes)
+    entry = _workflow_index_cache.get(key)
+    if entry is not None and entry[0] is nodes and entry[1] == len(nodes):
+        return entry[2]
+    index = {}
+    for node in nodes:
+        if isinstance(node, dict) and 'id' in node:
+            index[str(node['id'])] = node
+    if len(_workflow_index_cache) >= WORKFLOW_INDEX_CACHE_SIZE:
+        _workflow_index_cache.pop(next(iter(_workflow_index_cache)))
+    _workflow_index_cache[key] = (nodes, len(nodes), index)
+    return index
+
+
+def find_workflow_node(extra_pnginfo, unique_id):
+    workflow = extra_pnginfo.get('workflow') if isinstance(extra_pnginfo, dict) else None
+    if not isinstance(workflow, dict) or not isinstance(workflow.get('nodes'), list):
+        return None
+    return workflow_node_index(workflow['nodes']).get(str(unique_id))
+
+
+def batch_seeds(seed, batch_size):
+    """非种子流模式的批量种子：seed 起连续 batch_size 个，超过 SEED_MAX 时从0开始循环"""
+    return [value if value <= SEED_MAX else value - SEED_MAX - 1 for value in range(seed, seed + batch_size)]
+
+
+def stream_draw(unique_id, batch_size):
+    """种子流模式：为节点预留 batch_size 个位置，返回起始位置"""
+    return lambda: seed_streams().reserve(unique_id, batch_size)
+
+
+def stream_seeds(unique_id, position, batch_size):
+    """种子流中 position 起的 batch_size 个种子"""
+    return seed_streams().seeds_at(unique_id, position, batch_size)
+
+
 class EGSEED:
     NAME = node_name('Seed')
     CATEGORY = category_type()
 
     @classmethod
+    @cached_input_types
     def INPUT_TYPES(cls):
         return {
             "required": {
                 "seed": ("INT", {
                     "default": -1,
-                    "min": -1125899906842624,
-                    "max": 1125899906842624
+                    "min": -SEED_MAX,
+                    "max": SEED_MAX
                 }),
             },
+            "optional": {
+                # 种子流模式：seed 为 -1/-2/-3 时从本节点的种子流中取新位置，否则 seed 即流位置（可复现）
+                "stream": ("BOOLEAN", {"default": False}),
+                "batch_size": ("INT", {"default": 1, "min": 1, "max": BATCH_MAX}),
+            },
             "hidden": {
                 "prompt": "PROMPT",
                 "extra_pnginfo": "EXTRA_PNGINFO",
@@ -42,30 +121,42 @@ class EGSEED:
             },
         }
 
-    RETURN_TYPES = ("INT",)
-    RETURN_NAMES = ("SEED",)
+    RETURN_TYPES = ("INT", "INT")
+    RETURN_NAMES = ("SEED", "SEEDS")
+    # SEEDS 为 batch_size 个种子的列表，下游节点按列表逐个执行
+    OUTPUT_IS_LIST = (False, True)
     FUNCTION = "main"
     CATEGORY = "2🐕kaiguan"
 
     @classmethod
-    def IS_CHANGED(cls, seed, prompt=None, extra_pnginfo=None, unique_id=None):
-        if seed in (-1, -2, -3):
-            return generate_unique_seed()
+    def IS_CHANGED(cls, seed, stream=False, batch_size=1, prompt=None, extra_pnginfo=None, unique_id=None):
+        # 随机种子模式每次运行都要产生新种子
+        if seed in RANDOM_SEED_VALUES:
+            if stream:
+                return reserve_seed(unique_id, stream_draw(unique_id, batch_size), ("stream", batch_size))
+            return reserve_seed(unique_id)
         return seed
 
-    def main(self, seed=0, prompt=None, extra_pnginfo=None, unique_id=None):
+    def main(self, seed=0, stream=False, batch_size=1, prompt=None, extra_pnginfo=None, unique_id=None):
         try:
             original_seed = seed
-            if seed in (-1, -2, -3):
-                seed = generate_unique_seed()
+            if stream:
+                # seed 写回为流位置：以相同 worker 重新运行时得到同一批种子
+                if seed in RANDOM_SEED_VALUES:
+                    reserved = take_reserved_seed(unique_id, ("stream", batch_size))
+                    seed = reserved if reserved is not None else stream_draw(unique_id, batch_size)()
+                seeds = stream_seeds(unique_id, abs(seed), batch_size)
+            else:
+                if seed in RANDOM_SEED_VALUES:
+                    seed = take_reserved_seed(unique_id) or generate_unique_seed()
+                seeds = batch_seeds(seed, batch_size)
             try:
-                if unique_id is not None:
-                    if extra_pnginfo is not None and 'workflow' in extra_pnginfo:
-                        workflow_node = next(
-                            (x for x in extra_pnginfo['workflow']['nodes'] if x['id'] == int(unique_id)), None)
+                if unique_id is not None and original_seed in RANDOM_SEED_VALUES:
+                    if extra_pnginfo is not None:
+                        workflow_node = find_workflow_node(extra_pnginfo, unique_id)
                         if workflow_node is not None and 'widgets_values' in workflow_node:
                             for index, widget_value in enumerate(workflow_node['widgets_values']):
-                                if widget_value in (-1, -2, -3) or widget_value == original_seed:
+                                if widget_value in RANDOM_SEED_VALUES or widget_value == original_seed:
                                     workflow_node['widgets_values'][index] = seed
                     if prompt is not None and str(unique_id) in prompt:
                         prompt_node = prompt.get(str(unique_id))
@@ -73,10 +164,10 @@ class EGSEED:
                             prompt_node['inputs']['seed'] = seed
             except Exception:
                 pass
-            
-            return (seed,)
+
+            return (seeds[0] if stream else seed, seeds)
         except Exception:
-            return (42,)
+            return (42, [42])
 NODE_CLASS_MAPPINGS = {
     "EGSEED": EGSEED
 }
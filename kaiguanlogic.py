@@ -1,35 +1,9 @@
-def is_context_empty(ctx):
-    return not ctx or all(v is None for v in ctx.values())
-
-def get_name(name):
-    return '{}'.format(name)
-
-class AnyType(str):
-    def __ne__(self, __value: object) -> bool:
-        return False
-
-any_type = AnyType("*")
-
-def is_none(value):
-    if value is not None:
-        if isinstance(value, dict) and 'model' in value and 'clip' in value:
-            return is_context_empty(value)
-    return value is None
-
-def convert_to_int(value):
-    try:
-        return int(value)
-    except ValueError:
-        return None
-
-def convert_to_float(value):
-    try:
-        return float(value)
-    except ValueError:
-        return None
-
-def convert_to_str(value):
-    return str(value)
+from .kaiguan_core import any_type, cached_input_types
+from .kaiguan_compare import COMPARISON_TYPES, compile_comparison, count_passed, full_mask, is_batch_value
+from .kaiguan_lists import as_list, first, list_outputs, partition
+from .kaiguan_log import logger
+from .kaiguan_release import release_dead_inputs
+from .kaiguan_values import brief
 
 class LogicSkipNode:
     """
@@ -39,112 +13,144 @@ class LogicSkipNode:
         pass
     
     @classmethod
+    @cached_input_types
     def INPUT_TYPES(cls):
         return {
             "required": {
                 "condition": ("BOOLEAN", {"default": True}),
                 "input": (any_type,),
-                "comparison_type": (["等于", "不等于", "大于", "小于", "大于等于", "小于等于", "包含", "不包含"], {"default": "等于"}),
+                "comparison_type": (COMPARISON_TYPES, {"default": "等于"}),
                 "comparison_value": ("STRING", {"default": ""}),
             },
             "optional": {},
+            "hidden": {"prompt": "PROMPT", "unique_id": "UNIQUE_ID"},
         }
 
     RETURN_TYPES = (any_type,)
     FUNCTION = "execute"
     CATEGORY = "2🐕kaiguan"
 
-    def execute(self, condition, input, comparison_type, comparison_value):
+    def execute(self, condition, input, comparison_type, comparison_value, prompt=None, unique_id=None):
         # 如果条件为False，直接返回输入，不进行逻辑判断
         if not condition:
             return (input,)
         
-        # 将输入值转换为可比较的格式
+        # 使用已编译（并缓存）的比较谓词进行判断
         input_value = input
-        if isinstance(input, str):
-            input_str = input
-            input_int = convert_to_int(input)
-            input_float = convert_to_float(input)
-        else:
-            input_str = convert_to_str(input)
-            input_int = convert_to_int(input_str) if input is not None else None
-            input_float = convert_to_float(input_str) if input is not None else None
-        
-        # 将比较值转换为可比较的格式
-        comp_str = comparison_value
-        comp_int = convert_to_int(comparison_value)
-        comp_float = convert_to_float(comparison_value)
-        
-        # 根据比较类型进行判断
-        result = False
-        
-        if comparison_type == "等于":
-            if comp_int is not None and input_int is not None:
-                result = input_int == comp_int
-            elif comp_float is not None and input_float is not None:
-                result = input_float == comp_float
-            else:
-                result = input_str == comp_str
-        
-        elif comparison_type == "不等于":
-            if comp_int is not None and input_int is not None:
-                result = input_int != comp_int
-            elif comp_float is not None and input_float is not None:
-                result = input_float != comp_float
-            else:
-                result = input_str != comp_str
-        
-        elif comparison_type == "大于":
-            if comp_int is not None and input_int is not None:
-                result = input_int > comp_int
-            elif comp_float is not None and input_float is not None:
-                result = input_float > comp_float
-            else:
-                result = input_str > comp_str
-        
-        elif comparison_type == "小于":
-            if comp_int is not None and input_int is not None:
-                result = input_int < comp_int
-            elif comp_float is not None and input_float is not None:
-                result = input_float < comp_float
-            else:
-                result = input_str < comp_str
-        
-        elif comparison_type == "大于等于":
-            if comp_int is not None and input_int is not None:
-                result = input_int >= comp_int
-            elif comp_float is not None and input_float is not None:
-                result = input_float >= comp_float
-            else:
-                result = input_str >= comp_str
-        
-        elif comparison_type == "小于等于":
-            if comp_int is not None and input_int is not None:
-                result = input_int <= comp_int
-            elif comp_float is not None and input_float is not None:
-                result = input_float <= comp_float
-            else:
-                result = input_str <= comp_str
-        
-        elif comparison_type == "包含":
-            result = comp_str in input_str
-        
-        elif comparison_type == "不包含":
-            result = comp_str not in input_str
+        result = compile_comparison(comparison_type, comparison_value)(input)
         
         # 打印调试信息
-        print(f"逻辑跳过节点: 输入值={input_value}, 比较类型={comparison_type}, 比较值={comparison_value}, 结果={result}")
+        logger.debug("逻辑跳过节点: 输入值=%s, 比较类型=%s, 比较值=%s, 结果=%s", brief(input_value), comparison_type, brief(comparison_value), result)
         
         # 根据结果返回输入或None
         if result:
             return (input,)
         else:
+            # 输入分支已被丢弃，提前释放只供该分支使用的上游输出
+            release_dead_inputs(prompt, unique_id, ("input",))
             return (None,)
 
+class LogicBatchSkipNode:
+    """
+    批量逻辑跳过节点：对列表/NumPy数组/张量逐元素进行比较，一次调用完成整批筛选
+    输出通过的子集、布尔掩码以及通过数量
+    """
+    def __init__(self):
+        pass
+    
+    @classmethod
+    @cached_input_types
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "condition": ("BOOLEAN", {"default": True}),
+                "input": (any_type,),
+                "comparison_type": (COMPARISON_TYPES, {"default": "等于"}),
+                "comparison_value": ("STRING", {"default": ""}),
+            },
+            "optional": {},
+        }
+
+    RETURN_TYPES = (any_type, any_type, "INT")
+    RETURN_NAMES = ("通过", "掩码", "通过数量")
+    FUNCTION = "execute"
+    CATEGORY = "2🐕kaiguan"
+
+    def execute(self, condition, input, comparison_type, comparison_value):
+        predicate = compile_comparison(comparison_type, comparison_value)
+        
+        # 非批量输入按标量处理，掩码为单元素列表
+        if not is_batch_value(input):
+            passed = (not condition) or predicate(input)
+            return (input if passed else None, [passed], int(passed))
+        
+        # 如果条件为False，整批直接通过
+        if not condition:
+            mask = full_mask(input)
+            return (input, mask, count_passed(mask))
+        
+        mask, passed_values = predicate.batch(input)
+        passed_count = count_passed(mask)
+        
+        logger.debug("批量逻辑跳过节点: 比较类型=%s, 比较值=%s, 通过=%d", comparison_type, brief(comparison_value), passed_count)
+        
+        # 没有元素通过时返回None，与逻辑跳过节点的跳过语义一致
+        if passed_count == 0:
+            return (None, mask, 0)
+        return (passed_values, mask, passed_count)
+
+class LogicSkipListNode:
+    """
+    列表逻辑跳过节点：一次收到整个列表（如1000条提示词），一次调用完成全部元素的比较
+    输出通过/未通过的元素列表及其在原列表中的序号，下游节点按列表逐个执行
+    """
+    def __init__(self):
+        pass
+
+    @classmethod
+    @cached_input_types
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "condition": ("BOOLEAN", {"default": True}),
+                "input": (any_type,),
+                "comparison_type": (COMPARISON_TYPES, {"default": "等于"}),
+                "comparison_value": ("STRING", {"default": ""}),
+            },
+            "optional": {},
+        }
+
+    INPUT_IS_LIST = True
+    RETURN_TYPES = (any_type, "INT", any_type, "INT", "INT")
+    RETURN_NAMES = ("通过", "通过序号", "未通过", "未通过序号", "通过数量")
+    OUTPUT_IS_LIST = (True, True, True, True, False)
+    FUNCTION = "execute"
+    CATEGORY = "2🐕kaiguan"
+
+    def execute(self, condition, input, comparison_type, comparison_value):
+        items = as_list(input)
+        comparison_type = first(comparison_type, "等于")
+        comparison_value = first(comparison_value, "")
+
+        # 如果条件为False，整个列表直接通过
+        if not first(condition, True):
+            mask = [True] * len(items)
+        else:
+            mask, _ = compile_comparison(comparison_type, comparison_value).batch(items)
+
+        outputs = list_outputs(*partition(items, mask))
+        logger.debug("列表逻辑跳过节点: 比较类型=%s, 比较值=%s, 通过=%d/%d",
+                     comparison_type, brief(comparison_value), outputs[4], len(items))
+        return outputs
+
 NODE_CLASS_MAPPINGS = {
-    "LogicSkipNode": LogicSkipNode
+    "LogicSkipNode": LogicSkipNode,
+    "LogicBatchSkipNode": LogicBatchSkipNode,
+    "LogicSkipListNode": LogicSkipListNode,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
-    "LogicSkipNode": "逻辑跳过🔀"
+    "LogicSkipNode": "逻辑跳过🔀",
+    "LogicBatchSkipNode": "批量逻辑跳过🔀",
+    "LogicSkipListNode": "列表逻辑跳过🔀",
 }
\ No newline at end of file
@@ -1,12 +1,232 @@
 import { app } from "/scripts/app.js";
+import { api } from "/scripts/api.js";
 import { ComfyWidgets } from "/scripts/widgets.js";
 
+// 控制节点类型判断：与原先的子串规则相同，每种类型只判断一次
+function matchesControlType(type) {
+    return type.includes('GlobalGroupCondition') ||
+        type.includes('SmartGroupSwitch') ||
+        type.includes('Switch') ||
+        type.includes('kaiguan') ||
+        type.toLowerCase().includes('hulue') ||
+        type.toLowerCase().includes('jinyong');
+}
+
+const controlNodeTypes = new Set();   // 属于控制节点的类型
+const checkedNodeTypes = new Set();   // 已判断过的类型
+
+function isControlNodeType(type) {
+    if (!type) return false;
+    if (!checkedNodeTypes.has(type)) {
+        checkedNodeTypes.add(type);
+        if (matchesControlType(type)) controlNodeTypes.add(type);
+    }
+    return controlNodeTypes.has(type);
+}
+
+// 预先判断所有已注册的节点类型
+function precomputeControlNodeTypes() {
+    Object.keys(LiteGraph.registered_node_types || {}).forEach(isControlNodeType);
+}
+
+// 组成员索引：维护 组 -> 组内节点、标题 -> 组 的映射
+// 组与节点（按中心点）都登记到均匀网格；节点增删、移动、调整尺寸时只重新计算该节点所属的组，
+// 组移动或调整大小时只重新计算新旧范围内的节点，查询时不再扫描全部节点
+// 节点中心（含标题栏）落在组内即视为组内节点
+class GroupMembershipIndex {
+    constructor(cellSize = 512) {
+        this.cellSize = cellSize;
+        this.graph = null;
+        this.groups = [];
+        this.groupBounds = new Map();  // 组 -> 登记时的包围盒与标题
+        this.titleMap = new Map();     // 标题 -> [组]
+        this.grid = new Map();         // 网格单元 -> [组]
+        this.nodeGrid = new Map();     // 网格单元 -> Set(节点id)
+        this.groupNodes = new Map();   // 组 -> Set(节点)
+        this.nodeEntries = new Map();  // 节点id -> { node, rect, groups, cell }
+        this.dirtyNodes = new Set();   // 事件标记的待更新节点
+    }
+    
+    static boundingOf(group) {
+        return group._bounding ?? group.bounding;
+    }
+    
+    static nodeRect(node) {
+        const titleHeight = LiteGraph.NODE_TITLE_HEIGHT ?? 30;
+        return [node.pos[0], node.pos[1] - titleHeight, node.size[0], node.size[1] + titleHeight];
+    }
+    
+    cellKey(cx, cy) {
+        return `${cx},${cy}`;
+    }
+    
+    // 包围盒覆盖的网格单元
+    *cellsOf([x, y, w, h]) {
+        const size = this.cellSize;
+        for (let cx = Math.floor(x / size); cx <= Math.floor((x + w) / size); cx++) {
+            for (let cy = Math.floor(y / size); cy <= Math.floor((y + h) / size); cy++) {
+                yield this.cellKey(cx, cy);
+            }
+        }
+    }
+    
+    // 清空索引（切换或清空画布时），之后由节点添加事件重新登记
+    reset(graph = null) {
+        this.graph = graph;
+        this.groups = [];
+        this.groupBounds.clear();
+        this.titleMap.clear();
+        this.grid.clear();
+        this.nodeGrid.clear();
+        this.groupNodes.clear();
+        this.nodeEntries.clear();
+        this.dirtyNodes.clear();
+        // 初次同步时登记画布上已有的节点（只发生一次）
+        if (graph) (graph._nodes || []).forEach(node => this.dirtyNodes.add(node));
+    }
+    
+    // 比对组的标题与包围盒：有变化时重建组网格，并把变化的组新旧范围内的节点标记为待更新
+    syncGroups(groups) {
+        const changedRects = [];
+        let changed = groups.length !== this.groupBounds.size;
+        const seen = new Set();
+        for (const group of groups) {
+            seen.add(group);
+            const b = GroupMembershipIndex.boundingOf(group);
+            const previous = this.groupBounds.get(group);
+            if (previous && previous.title === group.title && previous.rect[0] === b[0] &&
+                previous.rect[1] === b[1] && previous.rect[2] === b[2] && previous.rect[3] === b[3]) {
+                continue;
+            }
+            changed = true;
+            if (previous) changedRects.push(previous.rect);
+            changedRects.push([b[0], b[1], b[2], b[3]]);
+        }
+        for (const [group, previous] of this.groupBounds) {
+            if (!seen.has(group)) {
+                changed = true;
+                changedRects.push(previous.rect);
+            }
+        }
+        if (!changed) return;
+        
+        this.groups = groups.slice();
+        this.titleMap.clear();
+        this.grid.clear();
+        const groupNodes = new Map();
+        const groupBounds = new Map();
+        for (const group of this.groups) {
+            const b = GroupMembershipIndex.boundingOf(group);
+            groupBounds.set(group, { title: group.title, rect: [b[0], b[1], b[2], b[3]] });
+            groupNodes.set(group, this.groupNodes.get(group) ?? new Set());
+            if (!this.titleMap.has(group.title)) this.titleMap.set(group.title, []);
+            this.titleMap.get(group.title).push(group);
+            for (const key of this.cellsOf(b)) {
+                if (!this.grid.has(key)) this.grid.set(key, []);
+                this.grid.get(key).push(group);
+            }
+        }
+        this.groupBounds = groupBounds;
+        this.groupNodes = groupNodes;
+        
+        for (const rect of changedRects) {
+            for (const key of this.cellsOf(rect)) {
+                this.nodeGrid.get(key)?.forEach(nodeId => this.dirtyNodes.add(this.nodeEntries.get(nodeId).node));
+            }
+        }
+    }
+    
+    groupsAt(x, y) {
+        const candidates = this.grid.get(this.cellKey(Math.floor(x / this.cellSize), Math.floor(y / this.cellSize)));
+        if (!candidates) return [];
+        return candidates.filter(group => {
+            const [gx, gy, gw, gh] = GroupMembershipIndex.boundingOf(group);
+            return x >= gx && x <= gx + gw && y >= gy && y <= gy + gh;
+        });
+    }
+    
+    removeNode(nodeId) {
+        const entry = this.nodeEntries.get(nodeId);
+        if (!entry) return;
+        entry.groups.forEach(group => this.groupNodes.get(group)?.delete(entry.node));
+        const cellNodes = this.nodeGrid.get(entry.cell);
+        cellNodes?.delete(nodeId);
+        if (cellNodes?.size === 0) this.nodeGrid.delete(entry.cell);
+        this.nodeEntries.delete(nodeId);
+    }
+    
+    updateNode(node) {
+        this.removeNode(node.id);
+        const rect = GroupMembershipIndex.nodeRect(node);
+        const x = rect[0] + rect[2] / 2;
+        const y = rect[1] + rect[3] / 2;
+        const groups = this.groupsAt(x, y);
+        groups.forEach(group => this.groupNodes.get(group).add(node));
+        const cell = this.cellKey(Math.floor(x / this.cellSize), Math.floor(y / this.cellSize));
+        if (!this.nodeGrid.has(cell)) this.nodeGrid.set(cell, new Set());
+        this.nodeGrid.get(cell).add(node.id);
+        this.nodeEntries.set(node.id, { node, rect, groups, cell });
+    }
+    
+    // 事件回调：标记节点待更新，下次查询时处理
+    markNode(node) {
+        if (node) this.dirtyNodes.add(node);
+    }
+    
+    // 组移动时组内节点随之移动，标记这些节点
+    markGroupChildren(group) {
+        for (const child of [...(group._nodes ?? []), ...(group._children ?? [])]) {
+            if (child?.id !== undefined && child.pos && child.size) this.dirtyNodes.add(child);
+        }
+    }
+    
+    // 查询前同步：只处理事件标记的节点与变化的组
+    sync() {
+        const graph = app.graph;
+        if (graph !== this.graph) this.reset(graph);
+        this.syncGroups(graph._groups || []);
+        
+        for (const node of this.dirtyNodes) {
+            if (node.graph === graph) {
+                this.updateNode(node);
+            } else if (this.nodeEntries.get(node.id)?.node === node) {
+                this.removeNode(node.id);
+            }
+        }
+        this.dirtyNodes.clear();
+    }
+    
+    groupsByTitle(title) {
+        return this.titleMap.get(title) ?? [];
+    }
+    
+    nodesOf(group) {
+        return this.groupNodes.get(group) ?? new Set();
+    }
+}
+
+const membershipIndex = new GroupMembershipIndex();
+
+// 控制动作对应的节点模式
+const ACTION_MODES = {
+    "启用组": LiteGraph.ALWAYS,   // 0 - 正常执行
+    "禁用组": LiteGraph.NEVER,    // 2 - 禁用（完全关闭）
+    "屏蔽组": 4                   // 4 - 屏蔽（跳过但传递数据）
+};
+
+// 手动操作（控制面板）的请求者标识
+const MANUAL_REQUESTER = "manual";
+
 // 全局组控制状态管理器
 class GroupControlManager {
     constructor() {
         this.activeControllers = new Map(); // 活跃的控制节点
         this.groupStates = new Map();       // 组状态记录
         this.originalStates = new Map();    // 原始状态备份
+        this.pendingActions = new Map();    // 本帧待应用的控制请求
+        this.pendingHandlers = new Map();   // 本帧待执行的控件处理函数
+        this.requestSeq = 0;
+        this.frameRequested = false;
     }
     
     // 注册控制节点
@@ -18,79 +238,138 @@ class GroupControlManager {
     // 注销控制节点
     unregisterController(nodeId) {
         this.activeControllers.delete(nodeId);
+        this.pendingActions.delete(nodeId);
+        this.pendingHandlers.delete(nodeId);
         console.log(`🌐 注销组控制器: ${nodeId}`);
     }
     
-    // 执行组控制
-    executeGroupControl(action, targetGroups) {
-        const allGroups = app.graph._groups || [];
-        
-        // 确定要控制的组
-        const groupsToControl = targetGroups.length === 0 ? 
-            allGroups : 
-            allGroups.filter(group => targetGroups.includes(group.title));
-        
-        if (groupsToControl.length === 0) {
-            console.warn('🌐 没有找到要控制的组');
-            return;
+    // 注销已不在画布上的控制器（例如加载新工作流后残留的后端控制器）
+    pruneControllers() {
+        for (const nodeId of [...this.activeControllers.keys()]) {
+            if (!app.graph.getNodeById(nodeId)) {
+                this.unregisterController(nodeId);
+            }
         }
-        
-        console.log(`🌐 执行组控制: ${action} -> [${groupsToControl.map(g => g.title).join(', ')}]`);
-        
-        groupsToControl.forEach(group => {
-            this.controlGroup(group, action);
+    }
+    
+    // 执行组控制：请求先进入队列，同一帧内所有控制器的请求合并后统一应用
+    // requester 为发起请求的控制节点id；同一请求者在一帧内以最后一次请求为准
+    executeGroupControl(action, targetGroups, requester = MANUAL_REQUESTER) {
+        this.executeGroupActions([{ action, targetGroups }], requester);
+    }
+    
+    // 同一请求者一次提交多个动作（如规则表合并后的动作列表），应用时按顺序执行
+    executeGroupActions(actions, requester = MANUAL_REQUESTER) {
+        this.pendingActions.delete(requester);
+        this.pendingActions.set(requester, {
+            actions: actions,
+            seq: this.requestSeq++
         });
-        
-        // 刷新画布
-        app.graph.setDirtyCanvas(true, true);
+        this.requestFrame();
     }
     
-    // 控制单个组
-    controlGroup(group, action) {
-        // 备份原始状态（如果还没有备份的话）
-        if (!this.originalStates.has(group.title)) {
-            this.backupGroupState(group);
-        }
+    // 控件变化时排队处理函数，在下一帧读取控件值（替代原先的 setTimeout 延迟）
+    scheduleHandler(node, handler) {
+        this.pendingHandlers.set(node.id, () => handler(node));
+        this.requestFrame();
+    }
+    
+    requestFrame() {
+        if (this.frameRequested) return;
+        this.frameRequested = true;
+        const schedule = window.requestAnimationFrame?.bind(window) ?? (callback => setTimeout(callback, 16));
+        schedule(() => this.flush());
+    }
+    
+    // 请求排序：控制节点按id升序（与后端组控制一致，后执行的覆盖先执行的），手动操作排在最后
+    static compareRequests([keyA, a], [keyB, b]) {
+        const idA = Number(keyA);
+        const idB = Number(keyB);
+        const numericA = Number.isFinite(idA);
+        const numericB = Number.isFinite(idB);
+        if (numericA && numericB && idA !== idB) return idA - idB;
+        if (numericA !== numericB) return numericA ? -1 : 1;
+        return a.seq - b.seq;
+    }
+    
+    resolveGroups(targetGroups) {
+        // 确定要控制的组（按标题查表）
+        return targetGroups.length === 0 ? 
+            membershipIndex.groups : 
+            [...new Set(targetGroups)].flatMap(title => membershipIndex.groupsByTitle(title));
+    }
+    
+    // 应用本帧收集到的所有请求：先算出每个节点的目标模式，只写入模式有变化的节点，最后刷新一次画布
+    flush() {
+        this.frameRequested = false;
+        
+        const handlers = [...this.pendingHandlers.values()];
+        this.pendingHandlers.clear();
+        handlers.forEach(handler => handler());
         
-        // 重新计算组内节点
-        group.recomputeInsideNodes();
+        const requests = [...this.pendingActions.entries()].sort(GroupControlManager.compareRequests);
+        this.pendingActions.clear();
+        if (requests.length === 0) return;
         
-        // 应用控制动作
-        group._nodes.forEach(node => {
-            if (!node) return;
+        membershipIndex.sync();
+        
+        const targetModes = new Map();    // 节点 -> 目标模式
+        const groupActions = new Map();   // 组 -> 动作
+        const actions = requests.flatMap(([, request]) => request.actions);
+        for (const { action, targetGroups } of actions) {
+            if (action === "不变") continue;
             
-            // 跳过控制节点自身，避免控制冲突
-            if (this.isControlNode(node)) {
-                return;
+            const mode = ACTION_MODES[action];
+            if (mode === undefined) {
+                console.warn(`🌐 未知控制动作: ${action}`);
+                continue;
             }
             
-            // 应用节点状态
-            switch (action) {
-                case "启用组":
-                    node.mode = LiteGraph.ALWAYS;  // 0 - 正常执行
-                    break;
-                case "禁用组":
-                    node.mode = LiteGraph.NEVER;   // 1 - 禁用（完全关闭）
-                    break;
-                case "屏蔽组":
-                    node.mode = 4;                 // 4 - 屏蔽（跳过但传递数据）
-                    break;
-                case "不变":
-                    // 不做任何改变
-                    break;
-                default:
-                    console.warn(`🌐 未知控制动作: ${action}`);
+            const groupsToControl = this.resolveGroups(targetGroups);
+            if (groupsToControl.length === 0) {
+                console.warn('🌐 没有找到要控制的组');
+                continue;
+            }
+            
+            console.log(`🌐 执行组控制: ${action} -> [${groupsToControl.map(g => g.title).join(', ')}]`);
+            
+            groupsToControl.forEach(group => {
+                groupActions.set(group, action);
+                membershipIndex.nodesOf(group).forEach(node => {
+                    // 跳过控制节点自身，避免控制冲突
+                    if (node && !this.isControlNode(node)) {
+                        targetModes.set(node, mode);
+                    }
+                });
+            });
+        }
+        
+        // 备份原始状态（如果还没有备份的话），再记录组状态
+        groupActions.forEach((action, group) => {
+            if (!this.originalStates.has(group.title)) {
+                this.backupGroupState(group);
+            }
+            this.groupStates.set(group.title, action);
+        });
+        
+        let changed = 0;
+        targetModes.forEach((mode, node) => {
+            if (node.mode !== mode) {
+                node.mode = mode;
+                changed++;
             }
         });
         
-        // 记录组状态
-        this.groupStates.set(group.title, action);
+        // 有节点变化时才刷新画布
+        if (changed > 0) {
+            app.graph.setDirtyCanvas(true, true);
+        }
     }
     
     // 备份组的原始状态
     backupGroupState(group) {
         const backup = [];
-        group._nodes.forEach(node => {
+        membershipIndex.nodesOf(group).forEach(node => {
             if (node) {
                 backup.push({
                     nodeId: node.id,
@@ -132,14 +411,7 @@ class GroupControlManager {
     
     // 判断是否为控制节点
     isControlNode(node) {
-        return node.type && (
-            node.type.includes('GlobalGroupCondition') ||
-            node.type.includes('SmartGroupSwitch') ||
-            node.type.includes('Switch') ||
-            node.type.includes('kaiguan') ||
-            node.type.toLowerCase().includes('hulue') ||
-            node.type.toLowerCase().includes('jinyong')
-        );
+        return isControlNodeType(node.type);
     }
     
     // 获取状态信息
@@ -164,6 +436,8 @@ function parseTargetGroups(groupsText) {
     
     const groups = [];
     const lines = groupsText.split('\n');
+    // 只有整个输入没有任何分隔符时才按空格分割，有分隔符时组名中的空格原样保留
+    const hasSeparators = /[\n,;|]/.test(groupsText.trim());
     
     for (const line of lines) {
         const trimmedLine = line.trim();
@@ -182,7 +456,7 @@ function parseTargetGroups(groupsText) {
             // 竖线分割
             const parts = trimmedLine.split('|').map(p => p.trim()).filter(p => p);
             groups.push(...parts);
-        } else if (trimmedLine.includes(' ') && trimmedLine.split(' ').length > 1) {
+        } else if (!hasSeparators && trimmedLine.includes(' ') && trimmedLine.split(' ').length > 1) {
             // 空格分割（但要注意组名本身可能包含空格）
             const words = trimmedLine.split(/\s+/).filter(w => w);
             if (words.length > 1 && words.every(w => w.length > 2)) {
@@ -236,7 +510,7 @@ function handleGroupConditionControl(node) {
     
     // 执行控制
     if (action !== "不变") {
-        groupManager.executeGroupControl(action, targetGroupList);
+        groupManager.executeGroupControl(action, targetGroupList, node.id);
     }
 }
 
@@ -284,7 +558,7 @@ function handleSmartGroupSwitch(node) {
     });
     
     // 执行控制
-    groupManager.executeGroupControl(action, targetGroups);
+    groupManager.executeGroupControl(action, targetGroups, node.id);
 }
 
 // 处理流程屏蔽组节点
@@ -310,7 +584,7 @@ function handleFlowBypassGroup(node) {
     });
     
     // 执行屏蔽操作
-    groupManager.executeGroupControl("屏蔽组", targetGroups);
+    groupManager.executeGroupControl("屏蔽组", targetGroups, node.id);
     
     console.log(`🚫 流程屏蔽组执行: ${targetGroups.join(', ')}`);
 }
@@ -364,7 +638,7 @@ function handleAdvancedGroupSwitch(node) {
     });
     
     // 执行控制
-    groupManager.executeGroupControl(action, targetGroups);
+    groupManager.executeGroupControl(action, targetGroups, node.id);
 }
 
 // 创建控制面板
@@ -571,6 +845,64 @@ LGraphCanvas.prototype.getNodeMenuOptions = function(node) {
 app.registerExtension({
     name: "Comfy.GlobalGroupControl",
     
+    // 监听节点增删、移动与组的移动，增量维护组成员索引
+    async setup() {
+        precomputeControlNodeTypes();
+        
+        const graph = app.graph;
+        const onNodeAdded = graph.onNodeAdded;
+        graph.onNodeAdded = function(node) {
+            membershipIndex.markNode(node);
+            return onNodeAdded?.apply(this, arguments);
+        };
+        const onNodeRemoved = graph.onNodeRemoved;
+        graph.onNodeRemoved = function(node) {
+            membershipIndex.markNode(node);
+            // 控制节点被删除时立即注销
+            if (groupManager.activeControllers.has(node.id)) {
+                groupManager.unregisterController(node.id);
+            }
+            return onNodeRemoved?.apply(this, arguments);
+        };
+        
+        // 加载工作流前会清空画布：索引随之清空，之后由节点添加事件重新登记
+        const clear = graph.clear;
+        graph.clear = function() {
+            const result = clear.apply(this, arguments);
+            membershipIndex.reset(this);
+            return result;
+        };
+        
+        const canvas = app.canvas;
+        if (canvas) {
+            const onNodeMoved = canvas.onNodeMoved;
+            canvas.onNodeMoved = function(node) {
+                membershipIndex.markNode(node);
+                return onNodeMoved?.apply(this, arguments);
+            };
+        }
+        
+        // 拖动组时组内节点随组移动，不会触发 onNodeMoved
+        const groupPrototype = (window.LGraphGroup ?? LiteGraph.LGraphGroup)?.prototype;
+        if (groupPrototype?.move) {
+            const move = groupPrototype.move;
+            groupPrototype.move = function() {
+                const result = move.apply(this, arguments);
+                membershipIndex.markGroupChildren(this);
+                return result;
+            };
+        }
+    },
+    
+    // 节点调整尺寸时中心点变化，可能进出组
+    nodeCreated(node) {
+        const onResize = node.onResize;
+        node.onResize = function() {
+            membershipIndex.markNode(this);
+            return onResize?.apply(this, arguments);
+        };
+    },
+    
     async beforeRegisterNodeDef(nodeType, nodeData, app) {
         // 全局组条件控制节点
         if (nodeData.name === "GlobalGroupConditionNode") {
@@ -587,10 +919,8 @@ app.registerExtension({
                         widget.callback = (value) => {
                             if (originalCallback) originalCallback(value);
                             
-                            // 延迟执行，确保所有参数都已更新
-                            setTimeout(() => {
-                                handleGroupConditionControl(this);
-                            }, 50);
+                            // 下一帧统一处理，同一帧内的多次修改只应用一次
+                            groupManager.scheduleHandler(this, handleGroupConditionControl);
                         };
                     });
                 }, 100);
@@ -621,9 +951,8 @@ app.registerExtension({
                         widget.callback = (value) => {
                             if (originalCallback) originalCallback(value);
                             
-                            setTimeout(() => {
-                                handleSmartGroupSwitch(this);
-                            }, 50);
+                            // 下一帧统一处理，同一帧内的多次修改只应用一次
+                            groupManager.scheduleHandler(this, handleSmartGroupSwitch);
                         };
                     });
                 }, 100);
@@ -645,9 +974,8 @@ app.registerExtension({
                         widget.callback = (value) => {
                             if (originalCallback) originalCallback(value);
                             
-                            setTimeout(() => {
-                                handleAdvancedGroupSwitch(this);
-                            }, 50);
+                            // 下一帧统一处理，同一帧内的多次修改只应用一次
+                            groupManager.scheduleHandler(this, handleAdvancedGroupSwitch);
                         };
                     });
                 }, 100);
@@ -669,55 +997,13 @@ app.registerExtension({
                         widget.callback = (value) => {
                             if (originalCallback) originalCallback(value);
                             
-                            setTimeout(() => {
-                                handleFlowBypassGroup(this);
-                            }, 50);
+                            // 下一帧统一处理，同一帧内的多次修改只应用一次
+                            groupManager.scheduleHandler(this, handleFlowBypassGroup);
                         };
                     });
                 }, 100);
             };
             
-            // 重要：在流程执行时也要确保屏蔽逻辑被触发
-            // 通过重写onExecuted来捕获节点执行后的时机
-            nodeType.prototype.onExecuted = function(message) {
-                // 记录执行时间
-                this.properties = this.properties || {};
-                this.properties.lastExecuted = Date.now();
-                
-                // 执行屏蔽逻辑
-                setTimeout(() => {
-                    console.log('🚫 节点执行完成，触发屏蔽逻辑');
-                    handleFlowBypassGroup(this);
-                    
-                    // 同时检查是否有来自后端的屏蔽指令
-                    this.checkBackendBypassInstructions();
-                }, 10);
-            };
-            
-            // 添加检查后端屏蔽指令的方法
-            nodeType.prototype.checkBackendBypassInstructions = function() {
-                const widgets = this.widgets;
-                if (!widgets) return;
-                
-                const groupsToBypass = widgets.find(w => w.name === "groups_to_bypass")?.value ?? "";
-                const targetGroups = parseTargetGroups(groupsToBypass);
-                
-                if (targetGroups.length > 0) {
-                    console.log('🚫 检测到后端屏蔽指令，执行屏蔽:', targetGroups);
-                    
-                    // 强制执行屏蔽操作
-                    groupManager.executeGroupControl("屏蔽组", targetGroups);
-                    
-                    // 注册控制器
-                    groupManager.registerController(this.id, {
-                        action: "屏蔽组",
-                        targetGroups: targetGroups,
-                        nodeType: "FlowBypass",
-                        fromBackend: true
-                    });
-                }
-            };
-            
             nodeType.prototype.onRemoved = function() {
                 groupManager.unregisterController(this.id);
             };
@@ -725,38 +1011,41 @@ app.registerExtension({
     }
 });
 
-// 添加后端屏蔽状态检查功能
-function checkBackendBypassState() {
-    // 检查是否有流程屏蔽组节点
-    const bypassNodes = app.graph._nodes.filter(node => node.type === "FlowBypassGroupNode");
-    
-    if (bypassNodes.length > 0) {
-        bypassNodes.forEach(node => {
-            // 如果节点刚执行过，确保屏蔽逻辑生效
-            if (node.properties && node.properties.lastExecuted) {
-                const timeSinceExecution = Date.now() - node.properties.lastExecuted;
-                if (timeSinceExecution < 5000) { // 5秒内执行过
-                    handleFlowBypassGroup(node);
-                }
-            }
-        });
+// 处理后端推送的组状态消息（控制节点执行时由后端发送）
+// 消息中已包含解析好的组列表与条件结果，无需再读取和解析控件
+function handleGroupStateMessage(message) {
+    if (!message) return;
+    
+    const node = app.graph.getNodeById(Number(message.node_id)) ?? app.graph.getNodeById(message.node_id);
+    const controllerId = node ? node.id : message.node_id;
+    
+    if (node && message.condition_result !== null && message.condition_result !== undefined) {
+        node.properties = node.properties || {};
+        node.properties.lastConditionResult = message.condition_result;
+    }
+    
+    groupManager.registerController(controllerId, {
+        action: message.action,
+        targetGroups: message.groups,
+        actions: message.actions,
+        conditionResult: message.condition_result,
+        nodeType: message.node_type,
+        fromBackend: true
+    });
+    
+    // 规则表等节点在一条消息中携带多个动作，全部按顺序应用
+    const actions = (message.actions ?? [{ action: message.action, groups: message.groups }])
+        .filter(entry => entry.action !== "不变")
+        .map(entry => ({ action: entry.action, targetGroups: entry.groups }));
+    if (actions.length > 0) {
+        groupManager.executeGroupActions(actions, controllerId);
     }
 }
 
-// 定期清理无效节点引用 + 检查后端屏蔽状态
-setInterval(() => {
-    const validNodeIds = new Set(app.graph._nodes.map(node => node.id));
-    
-    // 清理已删除的控制节点
-    for (const [nodeId] of groupManager.activeControllers) {
-        if (!validNodeIds.has(nodeId)) {
-            groupManager.unregisterController(nodeId);
-        }
-    }
-    
-    // 检查后端屏蔽状态
-    checkBackendBypassState();
-}, 2000); // 缩短检查间隔到2秒
+api.addEventListener("kaiguan.group_state", ({ detail }) => handleGroupStateMessage(detail));
+
+// 每次执行开始时核对已注册的控制器（只检查控制器本身，不扫描整个画布）
+api.addEventListener("execution_start", () => groupManager.pruneControllers());
 
 console.log("🌐 全局组条件控制扩展已加载完成！");
 console.log("   支持功能:");
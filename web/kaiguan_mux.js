@@ -0,0 +1,58 @@
+import { app } from "/scripts/app.js";
+
+// 与后端 MUX_MAX_INPUTS 保持一致
+const MUX_MAX_INPUTS = 64;
+const MUX_INPUT_PATTERN = /^input(\d+)$/;
+
+// 按 input_count 显示 input1..inputN，超出数量且未连接的输入端口隐藏
+function syncMuxInputs(node) {
+    const countWidget = node.widgets?.find(widget => widget.name === "input_count");
+    if (!countWidget || !node.inputs) return;
+    const count = Math.max(2, Math.min(MUX_MAX_INPUTS, countWidget.value));
+
+    for (let i = node.inputs.length - 1; i >= 0; i--) {
+        const match = MUX_INPUT_PATTERN.exec(node.inputs[i].name);
+        if (match && Number(match[1]) > count && node.inputs[i].link == null) {
+            node.removeInput(i);
+        }
+    }
+    for (let i = 1; i <= count; i++) {
+        if (!node.inputs.some(input => input.name === `input${i}`)) {
+            node.addInput(`input${i}`, "*");
+        }
+    }
+
+    const size = node.computeSize();
+    node.setSize([Math.max(node.size[0], size[0]), size[1]]);
+    app.graph.setDirtyCanvas(true, true);
+}
+
+app.registerExtension({
+    name: "Comfy.EGDLXZNode",
+
+    async beforeRegisterNodeDef(nodeType, nodeData, app) {
+        if (nodeData.name !== "EGDLXZNode") return;
+
+        const onNodeCreated = nodeType.prototype.onNodeCreated;
+        nodeType.prototype.onNodeCreated = function() {
+            onNodeCreated?.apply(this, arguments);
+
+            const countWidget = this.widgets?.find(widget => widget.name === "input_count");
+            if (countWidget) {
+                const originalCallback = countWidget.callback;
+                countWidget.callback = (value) => {
+                    originalCallback?.call(countWidget, value);
+                    syncMuxInputs(this);
+                };
+            }
+            syncMuxInputs(this);
+        };
+
+        // 加载工作流时连线恢复之后再同步，避免移除已连接的输入
+        const onConfigure = nodeType.prototype.onConfigure;
+        nodeType.prototype.onConfigure = function() {
+            onConfigure?.apply(this, arguments);
+            syncMuxInputs(this);
+        };
+    }
+});
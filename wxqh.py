@@ -1,35 +1,52 @@
-def is_context_empty(ctx):
-    return not ctx or all(v is None for v in ctx.values())
+import functools
+import re
+
+from .kaiguan_core import any_type, get_name, cached_input_types
+from .kaiguan_empty import is_empty
+from .kaiguan_lazy import lazy_options, next_lazy_input, reset_lazy_probe
+from .kaiguan_lists import EMPTY_INDICES, EMPTY_ITEMS, as_list, first, is_unevaluated
+
+# 多路选择节点的最大输入数量
+MUX_MAX_INPUTS = 64
+MUX_MODES = ["序号选择", "第一个非空", "优先级列表"]
+
+PRIORITY_SEPARATOR_PATTERN = re.compile(r"[\s,;|，；]+")
+
 
 def get_category(sub_dirs=None):
     return "Switch" if sub_dirs is None else "{}/utils".format("Switch")
 
-def get_name(name):
-    return '{}'.format(name)
 
-class AnyType(str):
+def ordered_input_names(declared, inputs):
+    """声明的输入在前，前端动态添加的输入按连接顺序排在后面"""
+    extra = tuple(name for name in inputs if name not in declared)
+    return declared + extra if extra else declared
 
-    def __ne__(self, __value: object) -> bool:
-        return False
 
-any_type = AnyType("*")
+@functools.lru_cache(maxsize=256)
+def parse_priority(text, count=MUX_MAX_INPUTS):
+    """解析优先级列表，如 "3,1,2"；返回去重后的输入序号元组（从1开始），忽略无效序号"""
+    order = []
+    for token in PRIORITY_SEPARATOR_PATTERN.split(text or ""):
+        if token.isdigit() and 1 <= int(token) <= count:
+            order.append(int(token))
+    return tuple(dict.fromkeys(order))
 
-def is_none(value):
-    if value is not None:
-        if isinstance(value, dict) and 'model' in value and 'clip' in value:
-            return is_context_empty(value)
-    return value is None
 
 class EGRYDZQHNode:
 
     NAME = get_name("Any Switch")
     CATEGORY = get_category()
 
+    INPUT_NAMES = tuple(f"input{i}" for i in range(1, 3))
+
     @classmethod
+    @cached_input_types
     def INPUT_TYPES(cls):
         return {
             "required": {},
-            "optional": {f"input{i}": (any_type,) for i in range(1, 3)},
+            "optional": {name: (any_type, lazy_options()) for name in cls.INPUT_NAMES},
+            "hidden": {"prompt": "PROMPT"},
         }
 
     RETURN_TYPES = (any_type,)
@@ -37,17 +54,150 @@ class EGRYDZQHNode:
     FUNCTION = "switch"
     CATEGORY = "2🐕kaiguan"
 
-    def switch(self, **inputs):
-        for input_name, value in inputs.items():
-            if not is_none(value):
+    def check_lazy_status(self, prompt=None, **inputs):
+        # 按顺序逐个计算输入，找到第一个非空值后不再计算后面的分支
+        return next_lazy_input(self, prompt, ordered_input_names(self.INPUT_NAMES, inputs), inputs, is_empty)
+
+    def switch(self, prompt=None, **inputs):
+        reset_lazy_probe(self)
+        for input_name in ordered_input_names(self.INPUT_NAMES, inputs):
+            value = inputs.get(input_name)
+            if not is_empty(value):
                 return (value,)
         return (None,)
 
+
+class EGRYDZQHListNode:
+    """
+    列表版任意切换：一次收到各路输入的整个列表，逐个序号取第一个非空的输入
+    输出选中的元素、其原始序号、来自第几路，以及所有输入都为空的序号
+    只有前面的输入存在空元素时才计算后面的输入
+    """
+    NAME = get_name("Any Switch List")
+    CATEGORY = get_category()
+
+    INPUT_NAMES = EGRYDZQHNode.INPUT_NAMES
+
+    @classmethod
+    @cached_input_types
+    def INPUT_TYPES(cls):
+        return {
+            "required": {},
+            "optional": {name: (any_type, lazy_options()) for name in cls.INPUT_NAMES},
+            "hidden": {"prompt": "PROMPT"},
+        }
+
+    INPUT_IS_LIST = True
+    RETURN_TYPES = (any_type, "INT", "INT", "INT")
+    RETURN_NAMES = ("output", "index", "source", "empty_index")
+    OUTPUT_IS_LIST = (True, True, True, True)
+    FUNCTION = "switch"
+    CATEGORY = "2🐕kaiguan"
+
+    def check_lazy_status(self, prompt=None, **inputs):
+        # next_lazy_input 按顺序检查各路输入：累计已覆盖的序号，全部覆盖后不再计算后面的分支
+        # 未计算的输入视为需要计算；计算后仍为空的输入由 next_lazy_input 记住，不会重复请求
+        covered = set()
+        length = 0
+
+        def has_gaps(values):
+            nonlocal length
+            if is_unevaluated(values):
+                return True
+            items = as_list(values)
+            length = max(length, len(items))
+            covered.update(index for index, item in enumerate(items) if not is_empty(item))
+            return len(covered) < length
+
+        names = ordered_input_names(self.INPUT_NAMES, inputs)
+        return next_lazy_input(self, first(prompt), names, inputs, has_gaps)
+
+    def switch(self, prompt=None, **inputs):
+        reset_lazy_probe(self)
+        columns = [(int(name[len("input"):]), as_list(inputs.get(name)))
+                   for name in ordered_input_names(self.INPUT_NAMES, inputs) if name in inputs]
+        length = max((len(items) for _, items in columns), default=0)
+
+        values, indices, sources, empty_indices = [], [], [], []
+        for index in range(length):
+            for source, items in columns:
+                if index < len(items) and not is_empty(items[index]):
+                    values.append(items[index])
+                    indices.append(index)
+                    sources.append(source)
+                    break
+            else:
+                empty_indices.append(index)
+        return (values or list(EMPTY_ITEMS), indices or list(EMPTY_INDICES),
+                sources or [0], empty_indices or list(EMPTY_INDICES))
+
+
+class EGDLXZNode:
+    """
+    多路选择：最多64路输入，只计算被选中的输入
+    - 序号选择：直接取第 index 路输入
+    - 第一个非空：按序号顺序取第一个非空输入
+    - 优先级列表：按列表给出的序号顺序取第一个非空输入
+    """
+    NAME = get_name("Multiplexer")
+    CATEGORY = get_category()
+
+    INPUT_NAMES = tuple(f"input{i}" for i in range(1, MUX_MAX_INPUTS + 1))
+
+    @classmethod
+    @cached_input_types
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "mode": (MUX_MODES, {"default": "序号选择"}),
+                "index": ("INT", {"default": 1, "min": 1, "max": MUX_MAX_INPUTS}),
+                "priority": ("STRING", {"default": ""}),
+                "input_count": ("INT", {"default": 4, "min": 2, "max": MUX_MAX_INPUTS}),
+            },
+            "optional": {name: (any_type, lazy_options()) for name in cls.INPUT_NAMES},
+            "hidden": {"prompt": "PROMPT"},
+        }
+
+    RETURN_TYPES = (any_type, "INT")
+    RETURN_NAMES = ("output", "selected_index")
+    FUNCTION = "select"
+    CATEGORY = "2🐕kaiguan"
+
+    def _candidates(self, mode, priority, input_count):
+        count = max(2, min(input_count, MUX_MAX_INPUTS))
+        if mode == "优先级列表":
+            return tuple(self.INPUT_NAMES[i - 1] for i in parse_priority(priority, count))
+        return self.INPUT_NAMES[:count]
+
+    def check_lazy_status(self, mode, index, priority, input_count, prompt=None, **inputs):
+        if mode == "序号选择":
+            name = self.INPUT_NAMES[index - 1] if 1 <= index <= MUX_MAX_INPUTS else None
+            # 只请求被选中的一路，重复请求已计算的输入不会触发重新计算
+            return [name] if name in inputs and inputs[name] is None else []
+        return next_lazy_input(self, prompt, self._candidates(mode, priority, input_count), inputs, is_empty)
+
+    def select(self, mode, index, priority, input_count, prompt=None, **inputs):
+        reset_lazy_probe(self)
+        if mode == "序号选择":
+            name = self.INPUT_NAMES[index - 1] if 1 <= index <= MUX_MAX_INPUTS else None
+            value = inputs.get(name)
+            return (value, index) if name in inputs else (None, 0)
+
+        for name in self._candidates(mode, priority, input_count):
+            value = inputs.get(name)
+            if not is_empty(value):
+                return (value, int(name[len("input"):]))
+        return (None, 0)
+
+
 NODE_CLASS_MAPPINGS = {
-    "EGRYDZQHNode": EGRYDZQHNode
+    "EGRYDZQHNode": EGRYDZQHNode,
+    "EGRYDZQHListNode": EGRYDZQHListNode,
+    "EGDLXZNode": EGDLXZNode,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
-    "EGRYDZQHNode": "Recursive switching🔀"
+    "EGRYDZQHNode": "Recursive switching🔀",
+    "EGRYDZQHListNode": "Recursive switching (list)🔀",
+    "EGDLXZNode": "多路选择🔀",
 }
-